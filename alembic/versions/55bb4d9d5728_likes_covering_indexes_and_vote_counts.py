@@ -0,0 +1,58 @@
+"""likes covering index and vote counts
+
+Revision ID: 55bb4d9d5728
+Revises:
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "55bb4d9d5728"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# The tables themselves predate migrations and are created by the application at startup, which may also have
+# created `recipe_vote_counts` (empty) before this revision ran.
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("recipe_vote_counts"):
+        op.create_table(
+            "recipe_vote_counts",
+            sa.Column("recipe_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "likes", sa.Integer(), server_default=sa.text("0"), nullable=False
+            ),
+            sa.Column(
+                "dislikes", sa.Integer(), server_default=sa.text("0"), nullable=False
+            ),
+            sa.PrimaryKeyConstraint("recipe_id"),
+        )
+    op.execute(
+        """
+        INSERT INTO recipe_vote_counts (recipe_id, likes, dislikes)
+        SELECT recipe_id,
+               count(*) FILTER (WHERE direction = 'LIKE'),
+               count(*) FILTER (WHERE direction = 'DISLIKE')
+        FROM likes
+        GROUP BY recipe_id
+        ON CONFLICT (recipe_id) DO UPDATE
+        SET likes = excluded.likes, dislikes = excluded.dislikes
+        """
+    )
+
+    # Built concurrently so votes are not blocked while a large `likes` table is indexed.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_likes_recipe_id_direction "
+            "ON likes (recipe_id, direction) INCLUDE (user_id)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_likes_recipe_id_direction")
+    op.drop_table("recipe_vote_counts")
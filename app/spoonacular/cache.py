@@ -0,0 +1,421 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+import orjson
+from app.spoonderful.config import settings
+
+
+def canonicalize_ingredients(ingredients: Optional[str]) -> str:
+    """
+    Normalizes a comma-separated ingredient list so that equivalent pantries share a cache key,
+    e.g. "Eggs, bacon" and "bacon,eggs" both become "bacon,eggs".
+    """
+    names = {name.strip().lower() for name in (ingredients or "").split(",")}
+    names.discard("")
+
+    return ",".join(sorted(names))
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters reported by a cache backend. Hits and misses are counted per process.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Entries dropped to stay within the size limits.
+    expirations: int = 0  # Entries dropped because their TTL passed.
+    errors: int = 0  # Backend failures treated as misses.
+    entries: int = 0
+    size_bytes: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class CacheBackend(ABC):
+    """
+    Abstract base class for caches of upstream JSON data. Keys are strings and values must be JSON serializable.
+    Backends that do disk or network I/O are `blocking`, and async callers run them in the threadpool.
+    """
+
+    blocking = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[object]:
+        """
+        Returns the cached value for `key`, or None if it is missing or expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: object, ttl_seconds: float) -> None:
+        """
+        Stores `value` under `key` for `ttl_seconds`.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """
+        Returns a snapshot of the cache counters.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Releases any connection held by the backend.
+        """
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Thread-safe, in-process LRU cache whose entries expire after their TTL. Memory is bounded by both the number of
+    entries and their approximate size, measured as the length of the serialized JSON value.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, int, object]] = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+
+            return value
+
+    def set(self, key: str, value: object, ttl_seconds: float) -> None:
+        """
+        Stores `value` under `key`, evicting the least recently used entries if a limit is exceeded.
+        Values larger than `max_bytes` are not cached.
+        """
+        size = len(orjson.dumps(value))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + ttl_seconds, size, value)
+            self._stats.size_bytes += size
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._stats.size_bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.size_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            self._stats.entries = len(self._entries)
+            return CacheStats(**self._stats.to_dict())
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._stats.size_bytes -= size
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk cache stored in a SQLite database, so it survives restarts and is shared by every worker on the host.
+    Values are serialized with orjson. The least recently read entries are evicted when a limit is exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        # Write-ahead logging lets several worker processes read while one writes.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[object]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at <= now:
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._connection.commit()
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+            self._stats.hits += 1
+
+        return orjson.loads(value)
+
+    def set(self, key: str, value: object, ttl_seconds: float) -> None:
+        serialized = orjson.dumps(value)
+        size = len(serialized)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, size, now + ttl_seconds, now),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+            self._connection.commit()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries, size_bytes = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+            self._stats.entries = entries
+            self._stats.size_bytes = size_bytes
+            return CacheStats(**self._stats.to_dict())
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self) -> None:
+        """
+        Drops expired entries, then the least recently read entries until both limits are met.
+        """
+        cursor = self._connection.execute(
+            "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+        )
+        self._stats.expirations += max(cursor.rowcount, 0)
+
+        entries, size_bytes = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()
+        while entries > self.max_entries or size_bytes > self.max_bytes:
+            key, size = self._connection.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._stats.evictions += 1
+            entries -= 1
+            size_bytes -= size
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache stored in Redis (or any server speaking the Redis protocol) so that it is shared by every worker and host.
+    Expiry is delegated to Redis and memory limits to the server's `maxmemory` policy. Pass `client` to use an existing
+    connection (e.g. `fakeredis.FakeRedis()`); otherwise the optional `redis` package is required. Connection errors
+    and timeouts are counted and treated as misses, so an unavailable Redis only disables caching.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_bytes: int,
+        prefix: str = "spoonderful:",
+        client=None,
+        timeout_seconds: Optional[float] = None,
+    ):
+        try:
+            import redis
+        except ImportError as error:
+            if client is None:
+                raise ImportError(
+                    "The redis cache backend requires the `redis` package."
+                ) from error
+            self._errors = (ConnectionError, TimeoutError)
+        else:
+            self._errors = (
+                redis.exceptions.ConnectionError,
+                redis.exceptions.TimeoutError,
+            )
+        if client is None:
+            client = redis.Redis.from_url(
+                url,
+                socket_timeout=timeout_seconds,
+                socket_connect_timeout=timeout_seconds,
+            )
+
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self._client = client
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[object]:
+        try:
+            value = self._client.get(f"{self.prefix}{key}")
+        except self._errors:
+            value = None
+            self._count_error()
+        with self._lock:
+            if value is None:
+                self._stats.misses += 1
+                return None
+            self._stats.hits += 1
+
+        return orjson.loads(value)
+
+    def set(self, key: str, value: object, ttl_seconds: float) -> None:
+        serialized = orjson.dumps(value)
+        if len(serialized) > self.max_bytes:
+            return
+
+        try:
+            self._client.set(
+                f"{self.prefix}{key}", serialized, ex=max(int(ttl_seconds), 1)
+            )
+        except self._errors:
+            self._count_error()
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(f"{self.prefix}{key}")
+        except self._errors:
+            self._count_error()
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+            if keys:
+                self._client.delete(*keys)
+        except self._errors:
+            self._count_error()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**self._stats.to_dict())
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self._stats.errors += 1
+
+
+def make_cache_backend(backend: str = settings.cache_backend) -> CacheBackend:
+    """
+    Builds the cache backend named in settings: "memory", "sqlite" or "redis".
+    """
+    if backend == "memory":
+        return MemoryCacheBackend(settings.cache_max_entries, settings.cache_max_bytes)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(
+            settings.cache_sqlite_path,
+            settings.cache_max_entries,
+            settings.cache_max_bytes,
+        )
+    if backend == "redis":
+        return RedisCacheBackend(
+            settings.cache_redis_url,
+            settings.cache_max_bytes,
+            timeout_seconds=settings.cache_redis_timeout_seconds,
+        )
+
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    """
+    Returns the process-wide cache backend for upstream data, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = make_cache_backend()
+
+    return _cache
+
+
+def close_cache() -> None:
+    """
+    Closes the cache backend. Called when the application shuts down.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
@@ -0,0 +1,289 @@
+import bisect
+import fcntl
+import os
+import shutil
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Optional
+import numpy as np
+from .columnar import ColumnarRecipeStore
+from app.spoonderful.config import settings
+
+# Spoonacular's `ignorePantry` ignores typical pantry items when counting missing ingredients.
+PANTRY_INGREDIENTS = frozenset({"water", "salt", "flour", "sugar", "ice"})
+# A saved catalog is a directory of versions, each a `ColumnarRecipeStore`, and a file naming the published one.
+CURRENT_VERSION_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+# Unpublished versions left behind by a worker that died while saving are deleted once they are this old.
+STALE_VERSION_SECONDS = 3600
+
+
+def ingredient_key(name: str) -> str:
+    """
+    Normalizes an ingredient name for the inverted index: lower case, single spaces and a naive singular form,
+    so that "Eggs" and "egg" share a key.
+    """
+    key = " ".join(name.lower().split())
+    if key.endswith("s") and not key.endswith("ss") and len(key) > 3:
+        key = key[:-1]
+
+    return key
+
+
+class RecipeCatalog:
+    """
+    Local catalog of recipes fetched through complexSearch, with an inverted index from ingredient to recipe. Answers
+    the "min-missing-ingredients" search locally so repeat pantries do not need the API.
+
+    Recipes are held in `ColumnarRecipeStore` segments: the store saved by a previous run is memory-mapped, and newly
+    ingested recipes are compacted into a new in-memory segment every `segment_size` recipes. Only the recipes since
+    the last compaction are kept as JSON.
+    """
+
+    def __init__(self, max_recipes: int, segment_size: int):
+        self.max_recipes = max_recipes
+        self.segment_size = segment_size
+        self._segments: list[ColumnarRecipeStore] = []
+        self._segment_starts: list[int] = []  # First ordinal of each segment.
+        self._pending: list[dict] = []  # Recipes ingested since the last compaction.
+        self._pending_keys: list[set[str]] = []
+        self._size = 0
+        self._ordinals: dict[int, int] = {}  # Recipe id -> ordinal.
+        self._ingredient_counts = array("i")  # Non-pantry ingredients per ordinal.
+        self._postings: dict[str, array] = {}  # Ingredient key -> ordinals.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._ordinals
+
+    def recipe_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._ordinals)
+
+    def get(self, recipe_id: int) -> Optional[dict]:
+        """
+        Returns the stored JSON of a recipe, or None if it is not in the catalog.
+        """
+        with self._lock:
+            ordinal = self._ordinals.get(recipe_id)
+
+            return None if ordinal is None else self._recipe(ordinal)
+
+    def ingest(self, results: list[dict]) -> int:
+        """
+        Adds complexSearch results (requested with `addRecipeNutrition`) to the catalog. Recipes already present or
+        without an ingredient list are skipped. Returns the number of recipes added.
+        """
+        added = 0
+        with self._lock:
+            for recipe in results:
+                recipe_id = recipe.get("id")
+                ingredients = (recipe.get("nutrition") or {}).get("ingredients")
+                if recipe_id in self._ordinals or not ingredients:
+                    continue
+                if self._size >= self.max_recipes:
+                    break
+
+                keys = {
+                    ingredient_key(ingredient["name"]) for ingredient in ingredients
+                }
+                keys -= PANTRY_INGREDIENTS
+                self._index(recipe_id, keys)
+                self._pending.append(recipe)
+                self._pending_keys.append(keys)
+                added += 1
+
+            if len(self._pending) >= self.segment_size:
+                self._compact()
+
+        return added
+
+    def search(self, ingredients: str, number: int, max_missing: int) -> list[dict]:
+        """
+        Returns up to `number` recipes using at least one of the comma-separated `ingredients` and missing at most
+        `max_missing` others, sorted by fewest missing then most used ingredients. Candidates are the union of the
+        ingredients' posting lists, and used ingredients are counted per recipe with a single `bincount`.
+        """
+        keys = {ingredient_key(name) for name in ingredients.split(",") if name.strip()}
+        with self._lock:
+            postings = [self._postings[key] for key in keys if key in self._postings]
+            if not postings:
+                return []
+
+            used = np.bincount(
+                np.concatenate(
+                    [np.frombuffer(ordinals, dtype=np.int32) for ordinals in postings]
+                ),
+                minlength=self._size,
+            )
+            missing = np.frombuffer(self._ingredient_counts, dtype=np.int32) - used
+            candidates = np.flatnonzero((used > 0) & (missing <= max_missing))
+            # lexsort sorts by the last key first.
+            order = np.lexsort((-used[candidates], missing[candidates]))[:number]
+
+            return [
+                {
+                    **self._recipe(ordinal),
+                    "usedIngredientCount": int(used[ordinal]),
+                    "missedIngredientCount": int(missing[ordinal]),
+                }
+                for ordinal in candidates[order]
+            ]
+
+    def save(self, path: str) -> None:
+        """
+        Writes the whole catalog as a new version in the directory at `path`, publishes it by replacing the
+        `CURRENT` file atomically and deletes the older versions. Workers that memory-mapped an older version keep
+        reading it through their open mappings. A failed save is logged and leaves the published version in place.
+        """
+        with self._lock:
+            if not self._size:
+                return
+            recipes = [self._recipe(ordinal) for ordinal in range(self._size)]
+            keys = [set(self._keys(ordinal)) for ordinal in range(self._size)]
+
+        version = f"{time.time_ns()}.{os.getpid()}"
+        temporary_path = os.path.join(path, f"{version}.tmp")
+        try:
+            os.makedirs(path, exist_ok=True)
+            ColumnarRecipeStore.from_recipes(recipes, keys).save(temporary_path)
+            with _locked(path, fcntl.LOCK_EX):
+                os.replace(temporary_path, os.path.join(path, version))
+                pointer_path = os.path.join(
+                    path, f"{CURRENT_VERSION_FILE}.{version}.tmp"
+                )
+                with open(pointer_path, "w") as file:
+                    file.write(version)
+                os.replace(pointer_path, os.path.join(path, CURRENT_VERSION_FILE))
+                _remove_old_versions(path, version)
+        except OSError as error:
+            print(f"Could not save the recipe catalog to {path}: {error}")
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+    def load(self, path: str) -> int:
+        """
+        Memory-maps the version published in the directory at `path` into the catalog. Returns the number of recipes
+        loaded.
+        """
+        try:
+            store = load_published_store(path)
+        except FileNotFoundError:
+            return 0
+
+        with self._lock:
+            self._compact()
+            start = self._size
+            for row, recipe_id in enumerate(store.ids.tolist()):
+                self._index(recipe_id, store.ingredient_keys(row))
+            self._add_segment(store, start)
+
+        return len(store)
+
+    def _index(self, recipe_id: int, keys) -> None:
+        ordinal = self._size
+        self._ordinals[recipe_id] = ordinal
+        self._ingredient_counts.append(len(keys))
+        for key in keys:
+            self._postings.setdefault(key, array("i")).append(ordinal)
+        self._size += 1
+
+    def _compact(self) -> None:
+        """
+        Moves the pending recipes into a new columnar segment.
+        """
+        if not self._pending:
+            return
+
+        start = self._size - len(self._pending)
+        store = ColumnarRecipeStore.from_recipes(self._pending, self._pending_keys)
+        self._pending, self._pending_keys = [], []
+        self._add_segment(store, start)
+
+    def _add_segment(self, store: ColumnarRecipeStore, start: int) -> None:
+        self._segments.append(store)
+        self._segment_starts.append(start)
+
+    def _locate(self, ordinal: int) -> tuple[int, int]:
+        """
+        Returns the segment index and row of a recipe stored in a segment.
+        """
+        segment = bisect.bisect_right(self._segment_starts, ordinal) - 1
+
+        return segment, ordinal - self._segment_starts[segment]
+
+    def _recipe(self, ordinal: int) -> dict:
+        pending_start = self._size - len(self._pending)
+        if ordinal >= pending_start:
+            return self._pending[ordinal - pending_start]
+
+        segment, row = self._locate(ordinal)
+
+        return self._segments[segment].recipe(row)
+
+    def _keys(self, ordinal: int) -> list[str]:
+        pending_start = self._size - len(self._pending)
+        if ordinal >= pending_start:
+            return list(self._pending_keys[ordinal - pending_start])
+
+        segment, row = self._locate(ordinal)
+
+        return self._segments[segment].ingredient_keys(row)
+
+
+def load_published_store(path: str) -> ColumnarRecipeStore:
+    """
+    Memory-maps the version published by `RecipeCatalog.save` in the directory at `path`. Raises
+    `FileNotFoundError` if no catalog was saved there.
+    """
+    # Holding the lock keeps a concurrent save from deleting the version before it is mapped.
+    with _locked(path, fcntl.LOCK_SH):
+        try:
+            with open(os.path.join(path, CURRENT_VERSION_FILE), "r") as file:
+                version = file.read().strip()
+        except FileNotFoundError:
+            version = ""  # Saved directly in `path` by an earlier release.
+
+        return ColumnarRecipeStore.load(os.path.join(path, version))
+
+
+@contextmanager
+def _locked(path: str, operation: int):
+    """
+    Holds an advisory lock on the catalog directory at `path` across processes.
+    """
+    with open(os.path.join(path, LOCK_FILE), "a") as file:
+        fcntl.flock(file, operation)
+        yield
+
+
+def _remove_old_versions(path: str, current: str) -> None:
+    """
+    Deletes everything in the catalog directory at `path` except the `current` version and versions still being
+    written. Called with the lock held.
+    """
+    for entry in os.scandir(path):
+        if entry.name in (current, CURRENT_VERSION_FILE, LOCK_FILE):
+            continue
+        try:
+            age = time.time() - entry.stat(follow_symlinks=False).st_mtime
+            if entry.name.endswith(".tmp") and age < STALE_VERSION_SECONDS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+        except OSError as error:
+            print(
+                f"Could not delete the old recipe catalog version {entry.path}: {error}"
+            )
+
+
+catalog = RecipeCatalog(
+    max_recipes=settings.catalog_max_recipes,
+    segment_size=settings.catalog_segment_size,
+)
@@ -0,0 +1,111 @@
+import threading
+from typing import Optional
+import httpx
+import requests as rq
+from requests.adapters import HTTPAdapter
+from app.spoonderful.config import settings
+
+# (connect, read) timeouts in seconds applied to every upstream request.
+REQUEST_TIMEOUT = (
+    settings.spoonacular_connect_timeout,
+    settings.spoonacular_read_timeout,
+)
+
+_session: Optional[rq.Session] = None
+_session_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _make_session() -> rq.Session:
+    """
+    Builds a `requests.Session` with a connection pool sized from settings. Connections are kept alive
+    between requests, so repeat calls to the same host skip the TCP and TLS handshakes.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=settings.spoonacular_pool_connections,
+        pool_maxsize=settings.spoonacular_pool_maxsize,
+        pool_block=settings.spoonacular_pool_block,
+    )
+    session = rq.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_session() -> rq.Session:
+    """
+    Returns the process-wide session used for Spoonacular requests, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _make_session()
+
+    return _session
+
+
+def close_session() -> None:
+    """
+    Closes the shared session and its pooled connections. Called when the application shuts down.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide asyncio client used by `AsyncSpoonacularResponse`, creating it on first use.
+    Must be called from within the running event loop.
+    """
+    global _async_client
+    if _async_client is None:
+        limits = httpx.Limits(
+            max_connections=settings.spoonacular_async_max_connections,
+            max_keepalive_connections=settings.spoonacular_pool_maxsize,
+        )
+        timeout = httpx.Timeout(
+            settings.spoonacular_read_timeout,
+            connect=settings.spoonacular_connect_timeout,
+        )
+        _async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    return _async_client
+
+
+class AsyncResponseStream:
+    """
+    File-like view of a streamed `httpx.Response` body with an async `read`, as expected by ijson.
+    """
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = bytearray()
+
+    async def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                break
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+
+        return data
+
+
+async def close_async_client() -> None:
+    """
+    Closes the shared asyncio client and its pooled connections. Called when the application shuts down.
+    """
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
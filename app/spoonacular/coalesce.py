@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+
+
+def request_key(url: str, parameters: dict[str, object]) -> tuple:
+    """
+    Identifies an upstream request by its URL and query parameters, regardless of parameter order.
+    """
+    return (
+        url,
+        tuple(sorted((name, str(value)) for name, value in parameters.items())),
+    )
+
+
+class _Call:
+    """
+    An in-flight call shared by the threads waiting on it.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls made from different threads. While a call for a key is in flight, other callers
+    with the same key wait for it and share its result (or exception) instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of `SingleFlight`. The shared call runs as its own task, so a caller that is cancelled
+    (e.g. because its client disconnected) does not cancel the request for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[..., Awaitable[T]], *args, **kwargs
+    ) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(task)
+
+
+class AsyncMicroBatcher:
+    """
+    Collects the keys submitted by concurrent coroutines for up to `max_delay` seconds, or until `max_size` keys are
+    waiting, and resolves them with one call to `resolve`, which returns a result per key. Keys already waiting share
+    the pending result. Must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        resolve: Callable[[list[K]], Awaitable[dict[K, T]]],
+        max_delay: float,
+        max_size: int,
+    ):
+        self.resolve = resolve
+        self.max_delay = max_delay
+        self.max_size = max_size
+        self._pending: dict[K, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, key: K) -> T:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._resolve_batch(batch))
+            # Keep a reference until the batch is resolved.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve_batch(self, batch: dict[K, asyncio.Future]) -> None:
+        try:
+            results = await self.resolve(list(batch))
+        except Exception as error:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
@@ -0,0 +1,254 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import orjson
+
+# Recipe fields stored column by column. Scalars are float32 (NaN when missing) and flags are booleans.
+SCALAR_FIELDS = (
+    "readyInMinutes",
+    "spoonacularScore",
+    "aggregateLikes",
+    "healthScore",
+    "pricePerServing",
+    "servings",
+)
+INTEGER_FIELDS = frozenset({"readyInMinutes", "aggregateLikes", "servings"})
+FLAG_FIELDS = ("vegetarian", "vegan", "glutenFree", "dairyFree")
+CALORIC_FIELDS = ("percentProtein", "percentFat", "percentCarbs")
+STRING_FIELDS = ("title", "image", "instructions")
+# Separates the steps of a recipe's instructions in the `instructions` string column.
+STEP_SEPARATOR = "\x1e"
+
+
+@dataclass
+class StringColumn:
+    """
+    Variable-length strings stored as one UTF-8 buffer and the offsets of each string in it.
+    """
+
+    data: np.ndarray  # uint8
+    offsets: np.ndarray  # int64, one more than the number of strings.
+
+    @classmethod
+    def from_strings(cls, strings: list[str]) -> "StringColumn":
+        encoded = [string.encode() for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(string) for string in encoded], dtype=np.int64)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        return cls(data, offsets)
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+
+        return self.data[start:end].tobytes().decode()
+
+
+@dataclass
+class ColumnarRecipeStore:
+    """
+    Immutable, columnar store of complexSearch recipes with fixed dtypes: numeric features in float32 matrices, titles,
+    images and instructions in string columns, and each recipe's ingredient keys as a CSR list of vocabulary codes.
+    Saved as `.npy` files so that `load` can memory-map them and every worker shares one page-cached copy.
+    """
+
+    ids: np.ndarray  # int64 (n,)
+    scalars: np.ndarray  # float32 (n, len(SCALAR_FIELDS))
+    flags: np.ndarray  # bool (n, len(FLAG_FIELDS))
+    caloric_breakdown: np.ndarray  # float32 (n, len(CALORIC_FIELDS))
+    nutrients: np.ndarray  # float32 (n, len(nutrient_names)) percent of daily needs, NaN when absent.
+    nutrient_names: list[str]
+    strings: dict[str, StringColumn]
+    ingredient_offsets: np.ndarray  # int64 (n + 1,)
+    ingredient_codes: np.ndarray  # int32 codes into `ingredient_vocabulary`.
+    ingredient_vocabulary: list[str]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_recipes(
+        cls, recipes: list[dict], ingredient_keys: list[set[str]]
+    ) -> "ColumnarRecipeStore":
+        """
+        Builds a store from complexSearch recipe JSON and the ingredient keys of each recipe.
+        """
+        size = len(recipes)
+        nutrient_index: dict[str, int] = {}
+        for recipe in recipes:
+            for nutrient in _nutrition(recipe).get("nutrients") or []:
+                nutrient_index.setdefault(nutrient["name"], len(nutrient_index))
+
+        scalars = np.full((size, len(SCALAR_FIELDS)), np.nan, dtype=np.float32)
+        flags = np.zeros((size, len(FLAG_FIELDS)), dtype=bool)
+        caloric_breakdown = np.full(
+            (size, len(CALORIC_FIELDS)), np.nan, dtype=np.float32
+        )
+        nutrients = np.full((size, len(nutrient_index)), np.nan, dtype=np.float32)
+        strings = {field: [] for field in STRING_FIELDS}
+        for row, recipe in enumerate(recipes):
+            for column, field in enumerate(SCALAR_FIELDS):
+                if recipe.get(field) is not None:
+                    scalars[row, column] = recipe[field]
+            for column, field in enumerate(FLAG_FIELDS):
+                flags[row, column] = bool(recipe.get(field))
+            nutrition = _nutrition(recipe)
+            breakdown = nutrition.get("caloricBreakdown") or {}
+            for column, field in enumerate(CALORIC_FIELDS):
+                if breakdown.get(field) is not None:
+                    caloric_breakdown[row, column] = breakdown[field]
+            for nutrient in nutrition.get("nutrients") or []:
+                nutrients[row, nutrient_index[nutrient["name"]]] = nutrient[
+                    "percentOfDailyNeeds"
+                ]
+            strings["title"].append(recipe.get("title") or "")
+            strings["image"].append(recipe.get("image") or "")
+            strings["instructions"].append(_join_steps(recipe))
+
+        vocabulary = sorted(set().union(*ingredient_keys)) if ingredient_keys else []
+        codes = {key: code for code, key in enumerate(vocabulary)}
+        ingredient_offsets = np.zeros(size + 1, dtype=np.int64)
+        ingredient_offsets[1:] = np.cumsum(
+            [len(keys) for keys in ingredient_keys], dtype=np.int64
+        )
+        ingredient_codes = np.fromiter(
+            (codes[key] for keys in ingredient_keys for key in sorted(keys)),
+            dtype=np.int32,
+            count=int(ingredient_offsets[-1]),
+        )
+
+        return cls(
+            ids=np.array([recipe["id"] for recipe in recipes], dtype=np.int64),
+            scalars=scalars,
+            flags=flags,
+            caloric_breakdown=caloric_breakdown,
+            nutrients=nutrients,
+            nutrient_names=list(nutrient_index),
+            strings={
+                field: StringColumn.from_strings(values)
+                for field, values in strings.items()
+            },
+            ingredient_offsets=ingredient_offsets,
+            ingredient_codes=ingredient_codes,
+            ingredient_vocabulary=vocabulary,
+        )
+
+    def recipe(self, row: int) -> dict:
+        """
+        Rebuilds the complexSearch JSON consumed by `ComplexRetrievalStrategy` and the tabulators for one recipe.
+        """
+        recipe = {"id": int(self.ids[row])}
+        for column, field in enumerate(SCALAR_FIELDS):
+            value = float(self.scalars[row, column])
+            if np.isnan(value):
+                recipe[field] = None
+            else:
+                recipe[field] = int(value) if field in INTEGER_FIELDS else value
+        for column, field in enumerate(FLAG_FIELDS):
+            recipe[field] = bool(self.flags[row, column])
+
+        recipe["title"] = self.strings["title"][row]
+        recipe["image"] = self.strings["image"][row]
+        steps = self.strings["instructions"][row].split(STEP_SEPARATOR)
+        recipe["analyzedInstructions"] = [
+            {
+                "steps": [
+                    {"number": number, "step": step}
+                    for number, step in enumerate(steps, start=1)
+                ]
+            }
+        ]
+        nutrients = self.nutrients[row]
+        recipe["nutrition"] = {
+            "caloricBreakdown": {
+                field: float(self.caloric_breakdown[row, column])
+                for column, field in enumerate(CALORIC_FIELDS)
+                if not np.isnan(self.caloric_breakdown[row, column])
+            },
+            "nutrients": [
+                {"name": name, "percentOfDailyNeeds": float(nutrients[column])}
+                for column, name in enumerate(self.nutrient_names)
+                if not np.isnan(nutrients[column])
+            ],
+        }
+
+        return recipe
+
+    def ingredient_keys(self, row: int) -> list[str]:
+        start, end = self.ingredient_offsets[row], self.ingredient_offsets[row + 1]
+
+        return [
+            self.ingredient_vocabulary[code]
+            for code in self.ingredient_codes[start:end]
+        ]
+
+    def save(self, path: str) -> None:
+        """
+        Writes the store to the directory at `path` as `.npy` arrays plus a JSON manifest of column names.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "ids": self.ids,
+            "scalars": self.scalars,
+            "flags": self.flags,
+            "caloric_breakdown": self.caloric_breakdown,
+            "nutrients": self.nutrients,
+            "ingredient_offsets": self.ingredient_offsets,
+            "ingredient_codes": self.ingredient_codes,
+        }
+        for field, column in self.strings.items():
+            arrays[f"{field}_data"] = column.data
+            arrays[f"{field}_offsets"] = column.offsets
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+
+        manifest = {
+            "nutrient_names": self.nutrient_names,
+            "ingredient_vocabulary": self.ingredient_vocabulary,
+        }
+        with open(os.path.join(path, "manifest.json"), "wb") as file:
+            file.write(orjson.dumps(manifest))
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "ColumnarRecipeStore":
+        """
+        Opens a store written by `save`. Arrays are memory-mapped read-only by default.
+        """
+
+        def array(name: str) -> np.ndarray:
+            file_path = os.path.join(path, f"{name}.npy")
+            try:
+                return np.load(file_path, mmap_mode=mmap_mode)
+            except ValueError:  # Empty arrays cannot be memory-mapped.
+                return np.load(file_path)
+
+        with open(os.path.join(path, "manifest.json"), "rb") as file:
+            manifest = orjson.loads(file.read())
+
+        return cls(
+            ids=array("ids"),
+            scalars=array("scalars"),
+            flags=array("flags"),
+            caloric_breakdown=array("caloric_breakdown"),
+            nutrients=array("nutrients"),
+            nutrient_names=manifest["nutrient_names"],
+            strings={
+                field: StringColumn(array(f"{field}_data"), array(f"{field}_offsets"))
+                for field in STRING_FIELDS
+            },
+            ingredient_offsets=array("ingredient_offsets"),
+            ingredient_codes=array("ingredient_codes"),
+            ingredient_vocabulary=manifest["ingredient_vocabulary"],
+        )
+
+
+def _nutrition(recipe: dict) -> dict:
+    return recipe.get("nutrition") or {}
+
+
+def _join_steps(recipe: dict) -> str:
+    instructions = recipe.get("analyzedInstructions") or [{}]
+    steps = instructions[0].get("steps") or []
+
+    return STEP_SEPARATOR.join(step["step"] for step in steps)
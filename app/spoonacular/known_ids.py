@@ -0,0 +1,120 @@
+import math
+import os
+import struct
+import threading
+from typing import Iterable
+import numpy as np
+from app.spoonderful.config import settings
+
+# File header: magic, size in bits and number of hashes.
+_HEADER = struct.Struct("<4sQI")
+_MAGIC = b"BLM1"
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """
+    The SplitMix64 finalizer, used to hash recipe ids. Arithmetic wraps modulo 2**64.
+    """
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+
+    return values ^ (values >> np.uint64(31))
+
+
+class BloomFilter:
+    """
+    Thread-safe Bloom filter of recipe ids sized for `capacity` ids at a false positive rate of `error_rate`. Saved
+    files are merged with what is already on disk, so workers sharing a path pool what they learnt.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._lock = threading.Lock()
+
+    def __contains__(self, recipe_id: int) -> bool:
+        positions = self._positions(np.array([recipe_id]))[0]
+
+        return bool(np.all(self._bits[positions >> 3] & (1 << (positions & 7))))
+
+    def add(self, recipe_ids: Iterable[int]) -> None:
+        ids = np.fromiter(recipe_ids, dtype=np.int64)
+        if not len(ids):
+            return
+
+        positions = self._positions(ids).ravel()
+        with self._lock:
+            np.bitwise_or.at(
+                self._bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8)
+            )
+
+    def save(self, path: str) -> None:
+        """
+        Writes the filter to `path`, merged with a compatible filter already saved there.
+        """
+        with self._lock:
+            bits = self._bits.copy()
+        try:
+            with open(path, "rb") as file:
+                saved = self._read_bits(file)
+            if saved is not None:
+                bits |= saved
+        except OSError:
+            pass
+
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, self.size, self.hash_count))
+            file.write(bits.tobytes())
+        os.replace(temporary_path, path)
+
+    def load(self, path: str) -> bool:
+        """
+        Adds the ids of the filter saved at `path`. Returns False if there is none or it was sized differently.
+        """
+        try:
+            with open(path, "rb") as file:
+                saved = self._read_bits(file)
+        except OSError:
+            return False
+        if saved is None:
+            return False
+
+        with self._lock:
+            self._bits |= saved
+
+        return True
+
+    def _read_bits(self, file):
+        header = file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            return None
+        magic, size, hash_count = _HEADER.unpack(header)
+        if (magic, size, hash_count) != (_MAGIC, self.size, self.hash_count):
+            return None
+        bits = np.frombuffer(file.read(), dtype=np.uint8)
+
+        return bits if len(bits) == len(self._bits) else None
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the bit positions of each id, shaped (n, hash_count), by double hashing.
+        """
+        first = _splitmix64(ids.astype(np.uint64))
+        second = _splitmix64(first) | np.uint64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        positions = (first[:, np.newaxis] + steps * second[:, np.newaxis]) % np.uint64(
+            self.size
+        )
+
+        return positions.astype(np.int64)
+
+
+# Recipe ids known to exist on Spoonacular: served in recommendations, ingested into the catalog, voted on or
+# validated. A vote on one of these skips upstream validation.
+known_recipe_ids = BloomFilter(
+    capacity=settings.known_recipe_ids_capacity,
+    error_rate=settings.known_recipe_ids_error_rate,
+)
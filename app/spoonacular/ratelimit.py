@@ -0,0 +1,137 @@
+import threading
+import time
+from dataclasses import dataclass, asdict
+from http import HTTPStatus
+from typing import Mapping, Optional
+from .resilience import UpstreamError
+from app.spoonderful.config import settings
+
+# RapidAPI reports a quota per bucket. Every endpoint the app calls draws on "requests", so only it is tracked; the
+# others are still exported by the `spoonacular_ratelimit` metric.
+BUCKETS = ("requests",)
+
+
+class QuotaExhaustedError(UpstreamError):
+    """
+    Raised instead of calling RapidAPI when the request quota is spent. `retry_after` is the number of seconds
+    until the quota is expected to reset (or until the next probe request is allowed).
+    """
+
+    http_status = HTTPStatus.SERVICE_UNAVAILABLE
+
+    def __init__(self, bucket: str, retry_after: float):
+        super().__init__(f"RapidAPI {bucket} quota exhausted.", retry_after)
+        self.bucket = bucket
+
+
+@dataclass
+class QuotaBucket:
+    """
+    Latest known state of one RapidAPI quota bucket.
+    """
+
+    name: str
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    # Unix times at which the quota resets (if reported) and of the response the values came from.
+    reset_at: Optional[float] = None
+    updated_at: Optional[float] = None
+
+
+class QuotaTracker:
+    """
+    Tracks the RapidAPI quota from the `X-Ratelimit-*` response headers so that work can be downgraded while the
+    budget is low and shed once it is spent, rather than failing upstream.
+    """
+
+    def __init__(self, low_fraction: float, reserve: int, probe_interval: float):
+        self.low_fraction = low_fraction
+        self.reserve = reserve
+        self.probe_interval = probe_interval
+        self._buckets = {name: QuotaBucket(name) for name in BUCKETS}
+        self._lock = threading.Lock()
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Records the quota reported by a RapidAPI response.
+        """
+        now = time.time()
+        with self._lock:
+            for name, bucket in self._buckets.items():
+                prefix = f"X-Ratelimit-{name.capitalize()}"
+                limit = _parse_int(headers.get(f"{prefix}-Limit"))
+                remaining = _parse_int(headers.get(f"{prefix}-Remaining"))
+                if remaining is None:
+                    continue
+
+                reset = _parse_int(headers.get(f"{prefix}-Reset"))
+                bucket.limit = limit if limit is not None else bucket.limit
+                bucket.remaining = remaining
+                bucket.reset_at = now + reset if reset is not None else None
+                bucket.updated_at = now
+
+    def is_low(self, bucket: str = "requests") -> bool:
+        """
+        True when the remaining budget is at or below `low_fraction` of the limit.
+        """
+        with self._lock:
+            state = self._buckets[bucket]
+            if state.remaining is None or state.limit is None:
+                return False
+
+            return state.remaining <= max(self.reserve, self.low_fraction * state.limit)
+
+    def check(self, bucket: str = "requests") -> None:
+        """
+        Raises `QuotaExhaustedError` when the remaining budget is at or below the reserve. Once the reported reset
+        time (or `probe_interval` without one) has passed, a request is let through to refresh the quota.
+        """
+        now = time.time()
+        with self._lock:
+            state = self._buckets[bucket]
+            if state.remaining is None or state.remaining > self.reserve:
+                return
+
+            retry_at = state.reset_at or state.updated_at + self.probe_interval
+            if now >= retry_at:
+                # Let one request probe the quota; later ones wait for its headers.
+                state.updated_at = now
+                state.reset_at = None
+                return
+
+            raise QuotaExhaustedError(bucket, retry_at - now)
+
+    def recipe_quantity(self, requested: int) -> int:
+        """
+        Returns the number of recipes to request, reduced to `quota_degraded_recipe_quantity` while quota is low.
+        """
+        if self.is_low():
+            return min(requested, settings.quota_degraded_recipe_quantity)
+
+        return requested
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Returns the state of every bucket, keyed by bucket name.
+        """
+        with self._lock:
+            buckets = {name: asdict(state) for name, state in self._buckets.items()}
+
+        for name, state in buckets.items():
+            state["low"] = self.is_low(name)
+
+        return buckets
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+quota = QuotaTracker(
+    low_fraction=settings.quota_low_fraction,
+    reserve=settings.quota_reserve,
+    probe_interval=settings.quota_probe_interval_seconds,
+)
@@ -0,0 +1,277 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+from app.spoonderful.config import settings
+
+R = TypeVar("R")
+
+
+class UpstreamError(Exception):
+    """
+    Base class for errors raised when Spoonacular cannot be used. `http_status` is the status the API responds with
+    and `retry_after` (seconds), when known, is passed to clients in a `Retry-After` header.
+    """
+
+    http_status = HTTPStatus.BAD_GATEWAY
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailableError(UpstreamError):
+    """
+    Raised when an upstream request still fails after the allowed retries.
+    """
+
+    http_status = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class CircuitOpenError(UpstreamError):
+    """
+    Raised without contacting upstream while its circuit breaker is open.
+    """
+
+    http_status = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a `Retry-After` header given either in seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Bounded retries with "decorrelated jitter" backoff: each delay is drawn uniformly between `base_delay` and three
+    times the previous delay, capped at `max_delay`. A `Retry-After` longer than `max_delay` is not waited out.
+    """
+
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+    retry_statuses: frozenset = frozenset({429, 500, 502, 503, 504})
+    # Statuses that count towards opening the circuit breaker (rate limiting does not).
+    failure_statuses: frozenset = frozenset({500, 502, 503, 504})
+
+    def next_delay(self, previous_delay: float) -> float:
+        return min(self.max_delay, random.uniform(self.base_delay, previous_delay * 3))
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker. After `failure_threshold` consecutive failures the circuit opens and calls fail fast
+    with `CircuitOpenError` for `recovery_timeout` seconds. A single trial call is then let through (half-open); its
+    success closes the circuit and its failure opens it again, while a trial without a verdict lets the next call try.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            retry_after = self.opened_at + self.recovery_timeout - time.monotonic()
+            if self.state == self.OPEN and retry_after <= 0:
+                self.state = self.HALF_OPEN
+                return
+
+            raise CircuitOpenError(
+                f"Circuit for {self.name} is open.", max(retry_after, 0.0)
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release_trial(self) -> None:
+        """
+        Ends a half-open trial call that says nothing about upstream's health, so the next call is the trial.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class ResilientCaller:
+    """
+    Sends upstream requests through a `RetryPolicy` and a per-host `CircuitBreaker`. `send` performs one attempt and
+    returns a response object with `status_code` and `headers`; `transport_errors` are the client's connection and
+    timeout exceptions, which are retried like retryable statuses. Any other exception raised by `send`, such as a
+    cancellation, is not retried and does not count for or against upstream.
+    """
+
+    def __init__(
+        self, policy: RetryPolicy, failure_threshold: int, recovery_timeout: float
+    ):
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(
+                    host, self.failure_threshold, self.recovery_timeout
+                )
+            return self._breakers[host]
+
+    def breakers(self) -> dict[str, dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+    def call(self, url: str, send: Callable[[], R], transport_errors: tuple) -> R:
+        breaker = self.breaker(url)
+        delay = self.policy.base_delay
+        for attempt in range(1, self.policy.max_attempts + 1):
+            breaker.before_call()
+            try:
+                response = send()
+            except transport_errors as error:
+                wait = self._handle_failure(breaker, attempt, delay, error=error)
+            except BaseException:
+                # Any other error, including cancellation, still ends a half-open trial call.
+                breaker.release_trial()
+                raise
+            else:
+                wait = self._handle_response(breaker, attempt, delay, response)
+            if wait is None:
+                return response
+            time.sleep(wait)
+            delay = wait
+
+    async def call_async(
+        self, url: str, send: Callable[[], Awaitable[R]], transport_errors: tuple
+    ) -> R:
+        breaker = self.breaker(url)
+        delay = self.policy.base_delay
+        for attempt in range(1, self.policy.max_attempts + 1):
+            breaker.before_call()
+            try:
+                response = await send()
+            except transport_errors as error:
+                wait = self._handle_failure(breaker, attempt, delay, error=error)
+            except BaseException:
+                # Any other error, including cancellation, still ends a half-open trial call.
+                breaker.release_trial()
+                raise
+            else:
+                wait = self._handle_response(breaker, attempt, delay, response)
+            if wait is None:
+                return response
+            await asyncio.sleep(wait)
+            delay = wait
+
+    def _handle_response(
+        self, breaker: CircuitBreaker, attempt: int, delay: float, response
+    ) -> Optional[float]:
+        """
+        Returns None when `response` should be returned, or the number of seconds to wait before retrying.
+        """
+        if response.status_code in self.policy.failure_statuses:
+            breaker.record_failure()
+        elif response.status_code in self.policy.retry_statuses:
+            # Rate limiting neither proves upstream healthy nor unhealthy.
+            breaker.release_trial()
+        else:
+            breaker.record_success()
+
+        if response.status_code not in self.policy.retry_statuses:
+            return None
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        return self._next_wait(
+            attempt, delay, f"status {response.status_code}", retry_after
+        )
+
+    def _handle_failure(
+        self, breaker: CircuitBreaker, attempt: int, delay: float, error: Exception
+    ) -> float:
+        breaker.record_failure()
+        try:
+            return self._next_wait(attempt, delay, type(error).__name__)
+        except UpstreamUnavailableError as unavailable:
+            raise unavailable from error
+
+    def _next_wait(
+        self,
+        attempt: int,
+        delay: float,
+        reason: str,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """
+        Raises `UpstreamUnavailableError` when no attempts are left or upstream asks us to wait longer than the
+        backoff cap; otherwise returns the jittered delay, extended to honour `retry_after`.
+        """
+        if attempt >= self.policy.max_attempts or (
+            retry_after is not None and retry_after > self.policy.max_delay
+        ):
+            raise UpstreamUnavailableError(
+                f"Spoonacular request failed after {attempt} attempt(s): {reason}.",
+                retry_after,
+            )
+
+        wait = self.policy.next_delay(delay)
+        if retry_after is not None:
+            wait = max(wait, retry_after)
+
+        return wait
+
+
+upstream = ResilientCaller(
+    RetryPolicy(
+        max_attempts=settings.upstream_max_attempts,
+        base_delay=settings.upstream_backoff_base_seconds,
+        max_delay=settings.upstream_backoff_max_seconds,
+    ),
+    failure_threshold=settings.upstream_breaker_failure_threshold,
+    recovery_timeout=settings.upstream_breaker_recovery_seconds,
+)
@@ -1,9 +1,36 @@
 from __future__ import annotations
 import requests as rq
+import httpx
+import orjson
 import os
+import re
+import time
+from urllib.parse import urlsplit
+from starlette.concurrency import run_in_threadpool
 from .retrieval import DataRetrievalStrategy  # . needed because modules not packaged
-from typing import Optional
+from .retrieval import ComplexRetrievalStrategy
+from .client import get_session, get_async_client, AsyncResponseStream, REQUEST_TIMEOUT
+from .cache import canonicalize_ingredients, get_cache
+from .coalesce import SingleFlight, AsyncSingleFlight, AsyncMicroBatcher, request_key
+from .ratelimit import QuotaExhaustedError, quota
+from .resilience import (
+    CircuitOpenError,
+    UpstreamError,
+    UpstreamUnavailableError,
+    upstream,
+)
+from .catalog import catalog
+from .known_ids import known_recipe_ids
+from typing import Optional, Union
 from app.spoonderful.config import settings
+from app.spoonderful import metrics
+
+# Path segments that are recipe ids, replaced so that metrics have one endpoint label per route.
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+# In-flight upstream requests shared by concurrent callers.
+_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
 
 
 class SpoonacularResponse:
@@ -13,67 +40,271 @@ class SpoonacularResponse:
 
     RAPID_API_KEY = settings.spoonacular_key
     # RapidAPI's Spoonacular entry point.
-    ENTRY_POINT = "https://spoonacular-recipe-food-nutrition-v1.p.rapidapi.com/"
+    ENTRY_POINT = settings.spoonacular_entry_point
     HEADERS = {
         "x-rapidapi-host": "spoonacular-recipe-food-nutrition-v1.p.rapidapi.com",
         "x-rapidapi-key": RAPID_API_KEY,
     }
 
     # Use the classmethods to instantiate based on the desired endpoint.
-    def __init__(self, response: rq.Response = None, data: dict = None):
+    def __init__(
+        self, response: Union[rq.Response, httpx.Response] = None, data: dict = None
+    ):
         self.response = response
         self.data = data
 
+    @property
+    def status_code(self) -> Optional[int]:
+        """
+        The upstream status code. Responses served from the cache report 200.
+        """
+        if self.response is None:
+            return 200 if self.data is not None else None
+
+        return self.response.status_code
+
     @staticmethod
-    def _check_response(response: rq.Response) -> rq.Response.status_code:
+    def _check_response(
+        response: Union[rq.Response, httpx.Response], elapsed: Optional[float] = None
+    ) -> rq.Response.status_code:
         """
-        Reports on the response status code and how many daily requests are remaining.
-        Used internally by `_make_request_and_check_response`.
+        Counts the response by endpoint and status code, records its latency (`elapsed` seconds) and the rate limit
+        headers, and feeds the remaining quota to the `quota` tracker. Used internally by
+        `_make_request_and_check_response`.
         """
-        MDN_HTTP_STATUS = "https://developer.mozilla.org/en-US/docs/Web/HTTP/Status/"
         status_code = response.status_code
-        info = f"{MDN_HTTP_STATUS}{status_code}"
-        print(info)
-
-        _ratelimit_headers = [
-            "X-Ratelimit-Classifications-Limit",
-            "X-Ratelimit-Classifications-Remaining",
-            "X-Ratelimit-Requests-Limit",
-            "X-Ratelimit-Requests-Remaining",
-            "X-Ratelimit-Tinyrequests-Limit",
-            "X-Ratelimit-Tinyrequests-Remaining",
-        ]
-        for header in _ratelimit_headers:
-            value = response.headers.get(header)
-            if value:
-                print(f"{header}: {value}")
+        _count_upstream_call(str(response.url), status_code, elapsed)
+        quota.update(response.headers)
+
+        for bucket in ("Classifications", "Requests", "Tinyrequests"):
+            for kind in ("Limit", "Remaining"):
+                value = response.headers.get(f"X-Ratelimit-{bucket}-{kind}")
+                try:
+                    metrics.UPSTREAM_RATELIMIT.set(
+                        float(value), bucket=bucket.lower(), kind=kind.lower()
+                    )
+                except (TypeError, ValueError):
+                    pass
 
         return status_code
 
     @classmethod
     def _make_request_and_check_response(
-        cls, url: str, parameters: str, headers: Optional[str] = None
+        cls,
+        url: str,
+        parameters: str,
+        headers: Optional[str] = None,
+        parser: Optional[DataRetrievalStrategy] = None,
     ) -> SpoonacularResponse:
         """
-        Used internally by classmethods to complete and check requests.
+        Used internally by classmethods to complete and check requests. Concurrent calls for the same URL and
+        parameters are coalesced into a single upstream request whose parsed JSON is shared. With a `parser`, the
+        body is streamed into its `parse_stream` instead of being parsed whole.
         """
-        response = rq.get(
+        response, data = _flights.do(
+            request_key(url, parameters),
+            cls._send_request,
             url,
-            params=parameters,
-            headers=headers,
+            parameters,
+            headers,
+            parser,
         )
 
-        if cls._check_response(response):
-            return cls(response, response.json())
+        return cls(response, data)
+
+    @classmethod
+    def _send_request(
+        cls,
+        url: str,
+        parameters: str,
+        headers: Optional[str] = None,
+        parser: Optional[DataRetrievalStrategy] = None,
+    ) -> tuple[rq.Response, Optional[dict]]:
+        """
+        Used internally by `_make_request_and_check_response` to send one request. Requests share a pooled session
+        and are bounded by `REQUEST_TIMEOUT`. RapidAPI requests are shed while the quota is exhausted, and 429s, 5xxs,
+        timeouts and connection errors are retried with backoff behind a circuit breaker. JSON is only parsed for
+        successful responses. Calls that get no response are counted by why.
+        """
+        if url.startswith(cls.ENTRY_POINT):
+            _check_quota(url)
+
+        stream = parser is not None
+
+        def send() -> rq.Response:
+            started = time.perf_counter()
+            try:
+                response = get_session().get(
+                    url,
+                    params=parameters,
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT,
+                    stream=stream,
+                )
+            except (rq.ConnectionError, rq.Timeout) as error:
+                failure = (
+                    "timeout" if isinstance(error, rq.Timeout) else "connection_error"
+                )
+                _count_upstream_call(url, failure, time.perf_counter() - started)
+                raise
+            cls._check_response(response, time.perf_counter() - started)
+            if stream and not response.ok:
+                # Release the connection of a body that will not be read.
+                response.close()
+            return response
+
+        try:
+            response = upstream.call(url, send, (rq.ConnectionError, rq.Timeout))
+        except CircuitOpenError:
+            _count_upstream_call(url, "circuit_open")
+            raise
 
-        return cls(response)
+        if not response.ok:
+            return response, None
+        # Streamed bodies are read while parsing, so that span includes the download.
+        with metrics.span("parse_json"):
+            if stream:
+                with response:
+                    response.raw.decode_content = True
+                    return response, parser.parse_stream(response.raw)
+
+            return response, orjson.loads(response.content)
 
     @classmethod
-    def get_recipes_from_ingredients(cls, ingredients: str) -> SpoonacularResponse:
+    def _from_cache(cls, key: str) -> Optional[SpoonacularResponse]:
         """
-        Get recipies from Spoonacular's API using a list of ingredients formatted as a comma-seperated string.
-        See: https://spoonacular.com/food-api/docs#Search-Recipes-by-Ingredients
+        Used internally to build a response from cached data. Returns None on a cache miss.
+        """
+        data = get_cache().get(key)
+        if data is None:
+            return None
+
+        return cls(data=data)
+
+    @staticmethod
+    def _store_in_cache(
+        key: str, spoonacular_response: SpoonacularResponse, ttl_seconds: float
+    ) -> None:
+        """
+        Used internally to cache successful responses. Error payloads are never cached.
+        """
+        if spoonacular_response.status_code == 200:
+            get_cache().set(key, spoonacular_response.data, ttl_seconds)
+
+    @staticmethod
+    def _complex_search_key(ingredients: str, number: int) -> str:
+        return f"complexSearch:{number}:{ingredients}"
+
+    @staticmethod
+    def _information_key(recipe_id: int) -> str:
+        return f"information:{recipe_id}"
+
+    @classmethod
+    def _cached_information(cls, recipe_ids: list[int]) -> tuple[list[dict], list[int]]:
+        """
+        Used internally by `get_recipes_from_ids` to split `recipe_ids` into the cached recipe information and the
+        ids that still have to be requested.
+        """
+        found, missing = [], []
+        for recipe_id in dict.fromkeys(recipe_ids):
+            cached = get_cache().get(cls._information_key(recipe_id))
+            if cached is None:
+                missing.append(recipe_id)
+            else:
+                found.append(cached)
+
+        return found, missing
+
+    @classmethod
+    def _store_information_bulk(cls, spoonacular_response: SpoonacularResponse) -> None:
+        """
+        Used internally to cache each recipe of a successful informationBulk response under its single-recipe key.
+        """
+        if spoonacular_response.status_code != 200:
+            return
+
+        for recipe in spoonacular_response.data:
+            get_cache().set(
+                cls._information_key(recipe["id"]),
+                recipe,
+                settings.recipe_information_ttl_seconds,
+            )
+
+    @classmethod
+    def _search_locally(
+        cls, key: str, ingredients: str, number: int
+    ) -> Optional[SpoonacularResponse]:
+        """
+        Used internally by `get_recipes` to answer a complexSearch from the response cache or, failing that and with
+        `catalog_search_enabled`, from the local recipe catalog. Returns None if neither can answer it.
+        """
+        cached_response = cls._from_cache(key)
+        if cached_response is not None or not settings.catalog_search_enabled:
+            return cached_response
+
+        return cls._from_catalog(
+            ingredients, number, min(number, settings.catalog_min_results)
+        )
+
+    @classmethod
+    def _from_catalog(
+        cls, ingredients: str, number: int, min_results: int
+    ) -> Optional[SpoonacularResponse]:
+        """
+        Used internally to build a complexSearch-shaped response from the local catalog. Returns None if the catalog
+        is disabled or finds fewer than `min_results` recipes.
+        """
+        if not settings.catalog_enabled:
+            return None
+
+        results = catalog.search(ingredients, number, settings.catalog_max_missing)
+        if len(results) < max(min_results, 1):
+            return None
+
+        return cls(data={"results": results})
+
+    @classmethod
+    def _store_search(cls, key: str, spoonacular_response: SpoonacularResponse) -> None:
+        """
+        Used internally to cache a successful complexSearch and add its recipes to the local catalog and the known
+        recipe ids.
         """
+        cls._store_in_cache(
+            key, spoonacular_response, settings.recipe_cache_ttl_seconds
+        )
+        if spoonacular_response.status_code != 200:
+            return
+
+        results = spoonacular_response.data.get("results", [])
+        known_recipe_ids.add(recipe["id"] for recipe in results)
+        if settings.catalog_enabled:
+            catalog.ingest(results)
+
+    @classmethod
+    def _cached_search_fallback(
+        cls, ingredients: str, number: int, error: QuotaExhaustedError
+    ) -> SpoonacularResponse:
+        """
+        Used internally when the quota is exhausted to serve a cached complexSearch for the same ingredients with a
+        different `number`, or whatever the local catalog has. Re-raises `error` if neither has anything.
+        """
+        for cached_number in settings.quota_fallback_quantities:
+            cached_response = cls._from_cache(
+                cls._complex_search_key(ingredients, cached_number)
+            )
+            if cached_response is not None:
+                return cached_response
+
+        catalog_response = cls._from_catalog(ingredients, number, min_results=1)
+        if catalog_response is not None:
+            return catalog_response
+
+        raise error
+
+    # The `_*_request` classmethods describe each endpoint call as keyword arguments for
+    # `_make_request_and_check_response` so the sync and async clients build identical requests.
+    @classmethod
+    def _ingredients_request(cls, ingredients: str) -> dict[str, object]:
         ENDPOINT = "recipes/findByIngredients"
         URL = f"{cls.ENTRY_POINT}{ENDPOINT}"
         parameters = {
@@ -82,42 +313,25 @@ class SpoonacularResponse:
             "ignorePantry": True,  # Assume that all available ingredients are in the list.
         }
 
-        spoonacular_response = cls._make_request_and_check_response(
-            url=URL,
-            parameters=parameters,
-            headers=cls.HEADERS,
-        )
-
-        return spoonacular_response
+        return {"url": URL, "parameters": parameters, "headers": cls.HEADERS}
 
     @classmethod
-    def get_taste_from_recipe_id(cls, recipe_id: int) -> SpoonacularResponse:
-        """
-        Get a taste vector associated with a recipe id.
-        See: https://spoonacular.com/food-api/docs#Taste-by-ID
-        """
+    def _taste_request(cls, recipe_id: int) -> dict[str, object]:
         ENDPOINT = f"recipes/{recipe_id}/tasteWidget.json"
         # This functionality does not appear to exist on RapidAPI.
         SPOONACULAR_KEY = os.getenv("spoon_key")
-        URL = f"https://api.spoonacular.com/{ENDPOINT}"
+        URL = f"{settings.spoonacular_api_entry_point}{ENDPOINT}"
         parameters = {
             "apiKey": SPOONACULAR_KEY,
             "id": recipe_id,
         }
 
-        spoonacular_response = cls._make_request_and_check_response(
-            url=URL,
-            parameters=parameters,
-        )
-
-        return spoonacular_response
+        return {"url": URL, "parameters": parameters}
 
     @classmethod
-    def get_recipes(cls, ingredients: str, number: int) -> SpoonacularResponse:
-        """
-        Query recipes using Spoonacular's complex search.
-        See: https://spoonacular.com/food-api/docs#Search-Recipes-Complex
-        """
+    def _complex_search_request(
+        cls, ingredients: str, number: int
+    ) -> dict[str, object]:
         ENDPOINT = "recipes/complexSearch"
         URL = f"{cls.ENTRY_POINT}{ENDPOINT}"
         parameters = {
@@ -129,37 +343,395 @@ class SpoonacularResponse:
             "ignorePantry": True,
             "number": number,  # The number of recipes to return.
         }
+        parser = (
+            ComplexRetrievalStrategy() if settings.spoonacular_stream_parsing else None
+        )
+
+        return {
+            "url": URL,
+            "parameters": parameters,
+            "headers": cls.HEADERS,
+            "parser": parser,
+        }
 
+    @classmethod
+    def _information_request(cls, recipe_id: int) -> dict[str, object]:
+        ENDPOINT = f"recipes/{recipe_id}/information"
+        URL = f"{cls.ENTRY_POINT}{ENDPOINT}"
+        parameters = {"id": recipe_id, "includeNutrition": False}
+
+        return {"url": URL, "parameters": parameters, "headers": cls.HEADERS}
+
+    @classmethod
+    def _information_bulk_request(cls, recipe_ids: list[int]) -> dict[str, object]:
+        ENDPOINT = "recipes/informationBulk"
+        URL = f"{cls.ENTRY_POINT}{ENDPOINT}"
+        parameters = {
+            "ids": ",".join(str(recipe_id) for recipe_id in recipe_ids),
+            "includeNutrition": False,
+        }
+
+        return {"url": URL, "parameters": parameters, "headers": cls.HEADERS}
+
+    @classmethod
+    def get_recipes_from_ingredients(cls, ingredients: str) -> SpoonacularResponse:
+        """
+        Get recipies from Spoonacular's API using a list of ingredients formatted as a comma-seperated string.
+        See: https://spoonacular.com/food-api/docs#Search-Recipes-by-Ingredients
+        """
+        spoonacular_response = cls._make_request_and_check_response(
+            **cls._ingredients_request(ingredients)
+        )
+
+        return spoonacular_response
+
+    @classmethod
+    def get_taste_from_recipe_id(cls, recipe_id: int) -> SpoonacularResponse:
+        """
+        Get a taste vector associated with a recipe id.
+        See: https://spoonacular.com/food-api/docs#Taste-by-ID
+        """
         spoonacular_response = cls._make_request_and_check_response(
-            url=URL,
-            parameters=parameters,
-            headers=cls.HEADERS,
+            **cls._taste_request(recipe_id)
         )
 
         return spoonacular_response
 
+    @classmethod
+    def get_recipes(cls, ingredients: str, number: int) -> SpoonacularResponse:
+        """
+        Query recipes using Spoonacular's complex search. Responses are cached by the canonical ingredient set and
+        `number`, so the same pantry in a different order or case is only requested once per TTL. Searches the local
+        recipe catalog next and only calls Spoonacular if it has too few matches; fetched recipes are added to the
+        catalog. Once the quota is exhausted, a cached search with a different `number` is served if one exists.
+        See: https://spoonacular.com/food-api/docs#Search-Recipes-Complex
+        """
+        ingredients = canonicalize_ingredients(ingredients)
+        key = cls._complex_search_key(ingredients, number)
+        local_response = cls._search_locally(key, ingredients, number)
+        if local_response is not None:
+            return local_response
+
+        try:
+            spoonacular_response = cls._make_request_and_check_response(
+                **cls._complex_search_request(ingredients, number)
+            )
+        except QuotaExhaustedError as error:
+            return cls._cached_search_fallback(ingredients, number, error)
+        cls._store_search(key, spoonacular_response)
+
+        return spoonacular_response
+
     @classmethod
     def get_recipe_from_id(cls, recipe_id: int) -> SpoonacularResponse:
         """
-        Gets information about a recipe id. Can be used to validate recipes that users vote on.
+        Gets information about a recipe id. Can be used to validate recipes that users vote on. Recipe information
+        is cached for `recipe_information_ttl_seconds` since it almost never changes.
         See: https://spoonacular.com/food-api/docs#Get-Recipe-Information
         """
-        ENDPOINT = f"recipes/{recipe_id}/information"
-        URL = f"{cls.ENTRY_POINT}{ENDPOINT}"
-        parameters = {"id": recipe_id, "includeNutrition": False}
+        key = cls._information_key(recipe_id)
+        cached_response = cls._from_cache(key)
+        if cached_response is not None:
+            return cached_response
 
         spoonacular_response = cls._make_request_and_check_response(
-            url=URL,
-            parameters=parameters,
-            headers=cls.HEADERS,
+            **cls._information_request(recipe_id)
+        )
+        cls._store_in_cache(
+            key, spoonacular_response, settings.recipe_information_ttl_seconds
         )
 
         return spoonacular_response
 
+    @classmethod
+    def get_recipes_from_ids(cls, recipe_ids: list[int]) -> SpoonacularResponse:
+        """
+        Gets information about several recipes with one request. Recipes are cached individually, shared with
+        `get_recipe_from_id`, and only the uncached ids are requested. The data is a list of recipes; unknown ids
+        are missing from it.
+        See: https://spoonacular.com/food-api/docs#Get-Recipe-Information-Bulk
+        """
+        found, missing = cls._cached_information(recipe_ids)
+        if not missing:
+            return cls(data=found)
+
+        spoonacular_response = cls._make_request_and_check_response(
+            **cls._information_bulk_request(missing)
+        )
+        cls._store_information_bulk(spoonacular_response)
+        if spoonacular_response.data is None:
+            return spoonacular_response
+
+        return cls(spoonacular_response.response, found + spoonacular_response.data)
+
     def get_data(self, retrieval_strategy: DataRetrievalStrategy) -> dict[str, object]:
         """
         Returns response data based on a concrete retrieval_strategy object that inherits from the DataRetrievalStrategy abstract base class.
+        Raises `UpstreamError` if Spoonacular did not return any data.
         """
+        if self.data is None:
+            raise UpstreamError(
+                f"Spoonacular responded with status {self.status_code}."
+            )
+
         retrieved_data = retrieval_strategy.retrieve_data(self.data)
 
         return retrieved_data
+
+
+class AsyncSpoonacularResponse(SpoonacularResponse):
+    """
+    asyncio-native variant of `SpoonacularResponse`. The classmethods mirror the sync ones but are coroutines
+    backed by a shared `httpx.AsyncClient`, so awaiting routes do not hold a threadpool worker for the upstream
+    round trip.
+    """
+
+    @classmethod
+    async def _make_request_and_check_response(
+        cls,
+        url: str,
+        parameters: str,
+        headers: Optional[str] = None,
+        parser: Optional[DataRetrievalStrategy] = None,
+    ) -> AsyncSpoonacularResponse:
+        """
+        Used internally by classmethods to complete and check requests on the shared async client. Concurrent
+        calls for the same URL and parameters are coalesced into a single upstream request.
+        """
+        response, data = await _async_flights.do(
+            request_key(url, parameters),
+            cls._send_request,
+            url,
+            parameters,
+            headers,
+            parser,
+        )
+
+        return cls(response, data)
+
+    @classmethod
+    async def _send_request(
+        cls,
+        url: str,
+        parameters: str,
+        headers: Optional[str] = None,
+        parser: Optional[DataRetrievalStrategy] = None,
+    ) -> tuple[httpx.Response, Optional[dict]]:
+        """
+        Used internally by `_make_request_and_check_response` to send one request with the same quota, retry,
+        circuit breaker and streaming handling as `SpoonacularResponse._send_request`.
+        """
+        if url.startswith(cls.ENTRY_POINT):
+            _check_quota(url)
+
+        stream = parser is not None
+
+        async def send() -> httpx.Response:
+            client = get_async_client()
+            request = client.build_request(
+                "GET", url, params=parameters, headers=headers
+            )
+            started = time.perf_counter()
+            try:
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError as error:
+                failure = (
+                    "timeout"
+                    if isinstance(error, httpx.TimeoutException)
+                    else "connection_error"
+                )
+                _count_upstream_call(url, failure, time.perf_counter() - started)
+                raise
+            cls._check_response(response, time.perf_counter() - started)
+            if stream and not response.is_success:
+                # Release the connection of a body that will not be read.
+                await response.aclose()
+            return response
+
+        try:
+            response = await upstream.call_async(url, send, (httpx.TransportError,))
+        except CircuitOpenError:
+            _count_upstream_call(url, "circuit_open")
+            raise
+
+        if not response.is_success:
+            return response, None
+        with metrics.span("parse_json"):
+            if stream:
+                try:
+                    return response, await parser.parse_stream_async(
+                        AsyncResponseStream(response)
+                    )
+                finally:
+                    await response.aclose()
+
+            return response, orjson.loads(response.content)
+
+    @classmethod
+    async def get_recipes_from_ingredients(
+        cls, ingredients: str
+    ) -> AsyncSpoonacularResponse:
+        """
+        Async `SpoonacularResponse.get_recipes_from_ingredients`.
+        """
+        spoonacular_response = await cls._make_request_and_check_response(
+            **cls._ingredients_request(ingredients)
+        )
+
+        return spoonacular_response
+
+    @classmethod
+    async def get_taste_from_recipe_id(cls, recipe_id: int) -> AsyncSpoonacularResponse:
+        """
+        Async `SpoonacularResponse.get_taste_from_recipe_id`.
+        """
+        spoonacular_response = await cls._make_request_and_check_response(
+            **cls._taste_request(recipe_id)
+        )
+
+        return spoonacular_response
+
+    @classmethod
+    async def get_recipes(
+        cls, ingredients: str, number: int
+    ) -> AsyncSpoonacularResponse:
+        """
+        Async `SpoonacularResponse.get_recipes`. Shares the response cache and recipe catalog with the sync client.
+        """
+        ingredients = canonicalize_ingredients(ingredients)
+        key = cls._complex_search_key(ingredients, number)
+        local_response = await _run_cache_io(
+            cls._search_locally, key, ingredients, number
+        )
+        if local_response is not None:
+            return local_response
+
+        try:
+            spoonacular_response = await cls._make_request_and_check_response(
+                **cls._complex_search_request(ingredients, number)
+            )
+        except QuotaExhaustedError as error:
+            return await _run_cache_io(
+                cls._cached_search_fallback, ingredients, number, error
+            )
+        await _run_cache_io(cls._store_search, key, spoonacular_response)
+
+        return spoonacular_response
+
+    @classmethod
+    async def get_recipe_from_id(cls, recipe_id: int) -> AsyncSpoonacularResponse:
+        """
+        Async `SpoonacularResponse.get_recipe_from_id`. Shares the response cache with the sync client.
+        """
+        key = cls._information_key(recipe_id)
+        cached_response = await _run_cache_io(cls._from_cache, key)
+        if cached_response is not None:
+            return cached_response
+
+        spoonacular_response = await cls._make_request_and_check_response(
+            **cls._information_request(recipe_id)
+        )
+        await _run_cache_io(
+            cls._store_in_cache,
+            key,
+            spoonacular_response,
+            settings.recipe_information_ttl_seconds,
+        )
+
+        return spoonacular_response
+
+    @classmethod
+    async def get_recipes_from_ids(
+        cls, recipe_ids: list[int]
+    ) -> AsyncSpoonacularResponse:
+        """
+        Async `SpoonacularResponse.get_recipes_from_ids`.
+        """
+        found, missing = await _run_cache_io(cls._cached_information, recipe_ids)
+        if not missing:
+            return cls(data=found)
+
+        spoonacular_response = await cls._make_request_and_check_response(
+            **cls._information_bulk_request(missing)
+        )
+        await _run_cache_io(cls._store_information_bulk, spoonacular_response)
+        if spoonacular_response.data is None:
+            return spoonacular_response
+
+        return cls(spoonacular_response.response, found + spoonacular_response.data)
+
+    @classmethod
+    async def recipe_exists(cls, recipe_id: int) -> bool:
+        """
+        Checks that a recipe id exists. Ids checked by concurrent callers within `information_batch_window_seconds`
+        (or until `information_batch_max_ids` are waiting) are resolved together with one informationBulk request.
+        """
+        return await _recipe_checks.submit(recipe_id)
+
+    @classmethod
+    async def _recipes_exist(cls, recipe_ids: list[int]) -> dict[int, bool]:
+        """
+        Used internally by `recipe_exists` to check a batch of recipe ids. Raises `UpstreamUnavailableError` for the
+        whole batch if the informationBulk request fails.
+        """
+        spoonacular_response = await cls.get_recipes_from_ids(recipe_ids)
+        if spoonacular_response.data is None:
+            # Checking the ids one by one instead would multiply requests just when Spoonacular is struggling.
+            raise UpstreamUnavailableError(
+                f"Spoonacular responded with status {spoonacular_response.status_code}."
+            )
+
+        found = {recipe["id"] for recipe in spoonacular_response.data}
+        known_recipe_ids.add(found)
+
+        return {recipe_id: recipe_id in found for recipe_id in recipe_ids}
+
+
+# Recipe ids checked by concurrent votes, resolved in batches.
+_recipe_checks = AsyncMicroBatcher(
+    AsyncSpoonacularResponse._recipes_exist,
+    max_delay=settings.information_batch_window_seconds,
+    max_size=settings.information_batch_max_ids,
+)
+
+
+async def _run_cache_io(function, *args):
+    """
+    Runs a helper that reads or writes the response cache, in the threadpool when the cache backend does blocking
+    I/O (sqlite or redis) so that the event loop is not held up.
+    """
+    if get_cache().blocking:
+        return await run_in_threadpool(function, *args)
+
+    return function(*args)
+
+
+def _check_quota(url: str) -> None:
+    """
+    `quota.check`, counting the calls it sheds.
+    """
+    try:
+        quota.check()
+    except QuotaExhaustedError:
+        _count_upstream_call(url, "quota_exhausted")
+        raise
+
+
+def _count_upstream_call(
+    url: str, status: Union[int, str], elapsed: Optional[float] = None
+) -> None:
+    """
+    Counts an upstream call by endpoint and outcome, the status code or why there was no response, and records its
+    latency (`elapsed` seconds) when it was sent.
+    """
+    endpoint = _endpoint_name(url)
+    metrics.UPSTREAM_RESPONSES.inc(endpoint=endpoint, status=status)
+    if elapsed is not None:
+        metrics.UPSTREAM_SECONDS.observe(elapsed, endpoint=endpoint)
+
+
+def _endpoint_name(url: str) -> str:
+    """
+    The endpoint of an upstream URL for metric labels, e.g. "recipes/{id}/information".
+    """
+    return _ID_SEGMENT.sub("/{id}", urlsplit(url).path).lstrip("/")
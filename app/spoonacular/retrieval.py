@@ -1,6 +1,8 @@
 # I could also use protocols, the __call__ method, or functions here too, but I think this annotation is less ambiguous than the alternatives.
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+import ijson
+import orjson
 
 
 class DataRetrievalStrategy(ABC):
@@ -15,6 +17,19 @@ class DataRetrievalStrategy(ABC):
         """
         pass
 
+    def parse_stream(self, stream) -> dict[str, object]:
+        """
+        Parses a response body from a file-like `stream` into the JSON passed to `retrieve_data`. Strategies that can
+        discard data while parsing override this so the full response is never built.
+        """
+        return orjson.loads(stream.read())
+
+    async def parse_stream_async(self, stream) -> dict[str, object]:
+        """
+        `parse_stream` for a stream with an async `read`.
+        """
+        return orjson.loads(await stream.read())
+
 
 @dataclass
 class SimpleRetrievalStrategy(DataRetrievalStrategy):
@@ -82,6 +97,9 @@ class ComplexRetrievalStrategy(DataRetrievalStrategy):
         "glutenFree",
         "dairyFree",
     )
+    # Nested `nutrition` fields kept when parsing a stream: the tabulated nutrients and the ingredients the recipe
+    # catalog indexes.
+    nutrition_fields: tuple = ("nutrients", "caloricBreakdown", "ingredients")
 
     def retrieve_data(self, json_data: list[dict]) -> list[dict]:
         """
@@ -91,9 +109,51 @@ class ComplexRetrievalStrategy(DataRetrievalStrategy):
         recipe_data = [
             {field: recipe.get(field) for field in self.fields}
             for recipe in json_data.get("results")
-            if (
-                recipe.get("missedIngredientCount") <= 2
-            )  # initially 0 tolerance (i.e. `== 0` rather than `<= 2`), but this performed poorly when ingredient lists were short.
+            if self._keep(recipe)
         ]
 
         return recipe_data
+
+    def parse_stream(self, stream) -> dict[str, object]:
+        """
+        Parses the `results` of a complexSearch body one recipe at a time, dropping and projecting recipes as in
+        `retrieve_data` as soon as each is parsed. `missedIngredientCount` is kept so that the result can still be
+        cached and passed through `retrieve_data`.
+        """
+        results = [
+            self._project(recipe)
+            for recipe in ijson.items(stream, "results.item", use_float=True)
+            if self._keep(recipe)
+        ]
+
+        return {"results": results}
+
+    async def parse_stream_async(self, stream) -> dict[str, object]:
+        """
+        `parse_stream` for a stream with an async `read`.
+        """
+        results = [
+            self._project(recipe)
+            async for recipe in ijson.items(stream, "results.item", use_float=True)
+            if self._keep(recipe)
+        ]
+
+        return {"results": results}
+
+    @staticmethod
+    def _keep(recipe: dict) -> bool:
+        # initially 0 tolerance (i.e. `== 0` rather than `<= 2`), but this performed poorly when ingredient lists were short.
+        return recipe.get("missedIngredientCount") <= 2
+
+    def _project(self, recipe: dict) -> dict:
+        projected = {field: recipe.get(field) for field in self.fields}
+        projected["missedIngredientCount"] = recipe.get("missedIngredientCount")
+        nutrition = recipe.get("nutrition")
+        if nutrition is not None:
+            projected["nutrition"] = {
+                field: nutrition[field]
+                for field in self.nutrition_fields
+                if field in nutrition
+            }
+
+        return projected
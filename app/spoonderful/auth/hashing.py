@@ -0,0 +1,119 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Callable, Optional, TypeVar
+from fastapi import HTTPException, status
+from app.spoonderful.config import settings
+from . import utils
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated pool of `workers`, processes by default so hashing holds neither the GIL nor the
+    threadpool used by other handlers. At most `max_pending` hashes may be running or queued; callers beyond that
+    get a 503 instead of waiting behind a login storm. A pool broken by a dying worker is replaced.
+    """
+
+    def __init__(self, workers: int, max_pending: int, use_processes: bool):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._pending = 0  # Only changed on the event loop.
+
+    async def hash(self, plain_text: str) -> str:
+        return await self._submit(utils.hash_password, plain_text)
+
+    async def verify_and_update(
+        self, plain_text: str, hashed: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Checks a password against its stored hash. Also returns a new hash when the stored one was made with another
+        cost, or None.
+        """
+        return await self._submit(utils.verify_and_update_password, plain_text, hashed)
+
+    async def _submit(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            raise _unavailable("Too many sign-ins right now. Please try again shortly.")
+
+        call = functools.partial(func, *args)
+        for _ in range(2):
+            executor = self._get_executor()
+            try:
+                return await self._run(executor, call)
+            except BrokenExecutor:
+                # A worker died, e.g. killed for memory, and the pool accepts no more work. Retry once on a new one.
+                self._discard(executor)
+
+        raise _unavailable(
+            "Sign-in is unavailable right now. Please try again shortly."
+        )
+
+    async def _run(self, executor: Executor, call: Callable[[], T]) -> T:
+        """
+        Runs `call` on `executor`. Its slot is released when the call finishes rather than when the caller stops
+        waiting, so cancelled requests cannot queue more work than `max_pending`.
+        """
+        loop = asyncio.get_running_loop()
+        future = executor.submit(call)
+        self._pending += 1
+
+        def release(_: Future) -> None:
+            loop.call_soon_threadsafe(self._release)
+
+        future.add_done_callback(release)
+
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def _discard(self, executor: Executor) -> None:
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                # Workers are spawned rather than forked from a process already running threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hashing"
+                )
+
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _unavailable(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": "1"},
+    )
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hashing_workers,
+    max_pending=settings.password_hashing_max_pending,
+    use_processes=settings.password_hashing_executor == "process",
+)
@@ -1,17 +1,31 @@
+import time
 from jose import JWTError, jwt  # JSON Web Token handling
 from datetime import datetime, timedelta
 from app.spoonderful.data import schemas, database, models
 from fastapi import Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.spoonderful.config import settings
+from app.spoonacular.cache import MemoryCacheBackend
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+# Same scheme for routes that also serve anonymous users: a missing token gives None instead of a 401.
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
 
 SECRET_KEY = settings.secret_key
 SIGNING_ALGORITHM = settings.signing_algorithm
 ACCESS_TOKEN_DURATION = settings.access_token_duration_minutes
 
+# Verified tokens (token -> user id) and the principals of their users, so that most authenticated requests skip
+# both the signature check and the user lookup.
+_verified_tokens = MemoryCacheBackend(
+    settings.auth_cache_max_entries, settings.auth_cache_max_bytes
+)
+_principals = MemoryCacheBackend(
+    settings.auth_cache_max_entries, settings.auth_cache_max_bytes
+)
+
 
 def create_access_token(data: dict):
     """
@@ -31,8 +45,13 @@ def create_access_token(data: dict):
 def _verify_access_token(token: str, credentials_exception: HTTPException):
     """
     Function used internally by `get_current_user` to verify the user's access token. Raises an exception
-    if the user does not exist or if the token cannot be verified.
+    if the user does not exist or if the token cannot be verified. Verified tokens are cached until they expire, or
+    for `auth_token_cache_ttl_seconds` at most.
     """
+    user_id = _verified_tokens.get(token)
+    if user_id is not None:
+        return schemas.TokenData.construct(id=user_id)
+
     try:
         data = jwt.decode(token, SECRET_KEY, algorithms=[SIGNING_ALGORITHM])
         user_id = data.get("user_id")
@@ -42,23 +61,104 @@ def _verify_access_token(token: str, credentials_exception: HTTPException):
     except JWTError:
         raise credentials_exception
 
+    if "exp" in data:
+        ttl = min(data["exp"] - time.time(), settings.auth_token_cache_ttl_seconds)
+        if ttl > 0:
+            _verified_tokens.set(token, token_data.id, ttl)
+
     return token_data
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
-):
+def _cached_principal(user_id: str) -> Optional[schemas.UserOut]:
+    principal = _principals.get(str(user_id))
+
+    return None if principal is None else schemas.UserOut.construct(**principal)
+
+
+def _remember_principal(
+    user: Optional[models.User], credentials_exception: HTTPException
+) -> schemas.UserOut:
     """
-    Check the current user's id using access token verification.
+    Function used internally by `get_current_user` to cache the principal of a freshly loaded user. Tokens of users
+    that no longer exist are rejected.
     """
-    credentials_exception = HTTPException(
+    if user is None:
+        raise credentials_exception
+
+    principal = schemas.UserOut.from_orm(user)
+    _principals.set(
+        str(principal.id), principal.dict(), settings.auth_principal_ttl_seconds
+    )
+
+    return principal
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail=f"Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
+):
+    """
+    Check the current user's id using access token verification. Returns the user's principal (`schemas.UserOut`),
+    cached for `auth_principal_ttl_seconds`.
+    """
+    credentials_exception = _credentials_exception()
     token = _verify_access_token(token, credentials_exception)
 
-    user = db.query(models.User).filter(models.User.id == token.id).first()
+    principal = _cached_principal(token.id)
+    if principal is None:
+        user = db.query(models.User).filter(models.User.id == token.id).first()
+        principal = _remember_principal(user, credentials_exception)
+
+    return principal
+
+
+def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(database.get_db),
+):
+    """
+    `get_current_user` for routes that also serve anonymous users. Returns None when no token is sent; an invalid
+    token is still rejected.
+    """
+    if token is None:
+        return None
+
+    return get_current_user(token, db)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+):
+    """
+    `get_current_user` for async routes, loading the user through `database.get_async_db`.
+    """
+    credentials_exception = _credentials_exception()
+    token = _verify_access_token(token, credentials_exception)
+
+    principal = _cached_principal(token.id)
+    if principal is None:
+        user = await db.get(models.User, int(token.id))
+        principal = _remember_principal(user, credentials_exception)
+
+    return principal
+
+
+async def get_optional_user_async(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+):
+    """
+    `get_optional_user` for async routes.
+    """
+    if token is None:
+        return None
 
-    return user
+    return await get_current_user_async(token, db)
@@ -1,6 +1,16 @@
 from passlib.context import CryptContext
+from typing import Optional
+from app.spoonderful.config import settings
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning the minimum and maximum rounds to the configured cost makes `needs_update` flag hashes made with any other
+# cost, so they are rehashed on the next login.
+password_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.password_bcrypt_rounds,
+    bcrypt__min_rounds=settings.password_bcrypt_rounds,
+    bcrypt__max_rounds=settings.password_bcrypt_rounds,
+)
 
 
 def hash_password(plain_text: str) -> str:
@@ -15,3 +25,11 @@ def verify_password(plain_text, hashed) -> bool:
     Hashes the provided plain text password and compares it to the stored hash for the user.
     """
     return password_context.verify(plain_text, hashed)
+
+
+def verify_and_update_password(plain_text, hashed) -> tuple[bool, Optional[str]]:
+    """
+    `verify_password` that also returns a new hash when the stored one needs updating (e.g. the cost changed), or
+    None if it does not.
+    """
+    return password_context.verify_and_update(plain_text, hashed)
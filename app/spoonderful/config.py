@@ -1,4 +1,5 @@
 from pydantic import BaseSettings
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -12,6 +13,119 @@ class Settings(BaseSettings):
     access_token_duration_minutes: int
     spoonacular_key: str
     rdbms: str
+    # Verified access tokens are cached until they expire (at most `auth_token_cache_ttl_seconds`) and the signed-in
+    # user's principal for `auth_principal_ttl_seconds`, so authenticated requests skip the JWT check and user lookup.
+    # Principals are not invalidated, so a changed or deleted user may be served from the cache (and a deleted user's
+    # tokens still accepted) for up to `auth_principal_ttl_seconds`.
+    auth_cache_max_entries: int = 10_000
+    auth_cache_max_bytes: int = 4 * 1024 * 1024
+    auth_token_cache_ttl_seconds: float = 300.0
+    auth_principal_ttl_seconds: float = 30.0
+    # bcrypt runs on its own pool ("process" or "thread") so logins cannot starve other handlers. Sign-ins beyond
+    # `password_hashing_max_pending` running or queued hashes get a 503. Hashes with another cost are redone on login.
+    password_bcrypt_rounds: int = 12
+    password_hashing_executor: str = "process"
+    password_hashing_workers: int = 2
+    password_hashing_max_pending: int = 16
+    # Database connection pool, used by both engines. Requests wait up to `database_pool_timeout_seconds` for a
+    # connection once `database_pool_size + database_max_overflow` are checked out. A statement timeout of 0 is none.
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout_seconds: float = 10.0
+    database_pool_pre_ping: bool = True
+    database_pool_recycle_seconds: int = 1800
+    database_statement_timeout_ms: int = 0
+    # Serve the async routes from an async engine (asyncpg) instead of sync sessions in the threadpool.
+    # `async_database_url` overrides the URL. PostgreSQL only, for both engines: the vote routes rely on its
+    # `ON CONFLICT` upserts, `RETURNING` and `xmax`.
+    database_async: bool = False
+    async_rdbms: str = "postgresql+asyncpg"
+    async_database_url: Optional[str] = None
+    # Create missing tables from the ORM models at startup. Turn off where the schema is managed with Alembic only.
+    database_create_tables: bool = True
+    # Override the entry points to point the app at a local stub server.
+    spoonacular_entry_point: str = (
+        "https://spoonacular-recipe-food-nutrition-v1.p.rapidapi.com/"
+    )
+    spoonacular_api_entry_point: str = "https://api.spoonacular.com/"
+    # Shared HTTP connection pool used for every Spoonacular request.
+    spoonacular_pool_connections: int = 4  # Number of per-host pools to keep.
+    spoonacular_pool_maxsize: int = 32  # Keep-alive connections per host.
+    spoonacular_pool_block: bool = False
+    spoonacular_connect_timeout: float = 3.05
+    spoonacular_read_timeout: float = 15.0
+    # In-flight connection limit for the async client.
+    spoonacular_async_max_connections: int = 256
+    # Parse complexSearch bodies incrementally, keeping only the recipes and fields that are used. Lowers peak memory
+    # for large searches at some CPU cost, since ijson parses slower than orjson.
+    spoonacular_stream_parsing: bool = False
+    # Upstream response cache: "memory", "sqlite" or "redis" (requires the `redis` package).
+    cache_backend: str = "memory"
+    cache_sqlite_path: str = "spoonderful_cache.sqlite3"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    # Redis calls slower than this are treated as misses, so an outage degrades to uncached requests.
+    cache_redis_timeout_seconds: float = 0.5
+    cache_max_entries: int = 10_000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    recipe_cache_ttl_seconds: int = 3600  # complexSearch results.
+    # Recipe information rarely changes, so it is kept for longer.
+    recipe_information_ttl_seconds: int = 7 * 24 * 3600
+    # Recipe ids validated by concurrent votes are sent together in one informationBulk request.
+    information_batch_window_seconds: float = 0.01
+    information_batch_max_ids: int = 50
+    # Bloom filter of recipe ids known to exist, so votes on them skip upstream validation.
+    known_recipe_ids_path: str = "spoonderful_known_recipe_ids.bloom"
+    known_recipe_ids_capacity: int = 1_000_000
+    known_recipe_ids_error_rate: float = 1e-4
+    # Retries with decorrelated-jitter backoff and a per-host circuit breaker for upstream calls.
+    upstream_max_attempts: int = 3
+    upstream_backoff_base_seconds: float = 0.1
+    upstream_backoff_max_seconds: float = 2.0
+    upstream_breaker_failure_threshold: int = 5
+    upstream_breaker_recovery_seconds: float = 30.0
+    # RapidAPI quota handling. Work is downgraded once the remaining fraction of a quota drops to
+    # `quota_low_fraction`, and requests are shed while no more than `quota_reserve` remain.
+    quota_low_fraction: float = 0.1
+    quota_reserve: int = 0
+    quota_probe_interval_seconds: int = 60
+    quota_degraded_recipe_quantity: int = 20
+    # Cached complexSearch sizes that may be served instead once the quota is spent.
+    quota_fallback_quantities: list[int] = [100, 20, 5]
+    # Local recipe catalog built from fetched complexSearch results. It feeds known recipe ids, personalization and
+    # `scripts/fit_feature_space.py`, and answers searches once the quota is exhausted. With `catalog_search_enabled`
+    # it also answers searches that find at least min(number, catalog_min_results) recipes missing no more than
+    # `catalog_max_missing` ingredients. Off by default: the local search only approximates Spoonacular's ranking
+    # (any recipe using one of the ingredients, a fixed pantry list and naive singular forms), so recommendations
+    # differ from upstream's.
+    catalog_enabled: bool = True
+    catalog_search_enabled: bool = False
+    # The catalog is saved as a directory of memory-mapped `.npy` columns. Newly fetched recipes are kept as JSON
+    # until `catalog_segment_size` of them can be stored column-wise.
+    catalog_path: str = "spoonderful_catalog"
+    catalog_max_recipes: int = 50_000
+    catalog_segment_size: int = 256
+    catalog_min_results: int = 20
+    catalog_max_missing: int = 2
+    # Bounded executor for CPU-bound pandas/sklearn work in async routes.
+    processing_workers: int = 4
+    # Recipe clustering: "numpy" (lean engine seeded with `clustering_seed`), "sklearn" (the original pipeline) or
+    # "online" (a long-lived mini-batch model over the feature space, updated in the background from served recipes).
+    clustering_engine: str = "numpy"
+    clustering_seed: int = 0
+    online_clustering_max_pending_rows: int = 10_000
+    # Vote-based ranking for signed-in users, scoring each request's recipes against the user's profile in the feature
+    # space. `/recipes/varied` clusters only the `personalization_varied_candidates` best-ranked recipes of users
+    # with votes.
+    personalization_enabled: bool = True
+    personalization_max_recipes: int = 50_000
+    personalization_varied_candidates: int = 50
+    # Pre-fitted scaling and PCA written by `scripts/fit_feature_space.py`. While the file exists, the numpy engine
+    # only transforms; it is reloaded when it changes.
+    feature_space_enabled: bool = True
+    feature_space_path: str = "spoonderful_feature_space.npz"
+    feature_space_reload_interval_seconds: float = 60.0
+    # Largest number of votes accepted by `/vote/batch`.
+    vote_batch_max_items: int = 500
 
     class Config:
         env_file = ".env"
@@ -1,16 +1,107 @@
+from typing import Optional, Union
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.spoonderful.config import settings
 
 SQLALCHEMY_DATABASE = f"{settings.rdbms}://{settings.database_username}:{settings.database_password}@{settings.database_host}:{settings.database_port}/{settings.database_name}"
+SQLALCHEMY_ASYNC_DATABASE = (
+    settings.async_database_url
+    or f"{settings.async_rdbms}://{settings.database_username}:{settings.database_password}@{settings.database_host}:{settings.database_port}/{settings.database_name}"
+)
 
-engine = create_engine(SQLALCHEMY_DATABASE)
+
+def _engine_options(url: str, asynchronous: bool) -> dict:
+    """
+    Pool and connection arguments from settings. SQLite keeps SQLAlchemy's default pool, though the vote routes need
+    PostgreSQL.
+    """
+    if url.startswith("sqlite"):
+        return {}
+
+    options = {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+    }
+    if settings.database_statement_timeout_ms and url.startswith("postgresql"):
+        timeout = str(settings.database_statement_timeout_ms)
+        # asyncpg takes server settings directly, psycopg2 takes libpq options.
+        options["connect_args"] = (
+            {"server_settings": {"statement_timeout": timeout}}
+            if asynchronous
+            else {"options": f"-c statement_timeout={timeout}"}
+        )
+
+    return options
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE, **_engine_options(SQLALCHEMY_DATABASE, asynchronous=False)
+)
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine
 )  # Local keeps it distinct from the existing Session class.
 Base = declarative_base()
 
+# The async engine is only created when enabled, so its driver (asyncpg) is otherwise not needed.
+async_engine = None
+AsyncSessionLocal: Optional[sessionmaker] = None
+if settings.database_async:
+    async_engine = create_async_engine(
+        SQLALCHEMY_ASYNC_DATABASE,
+        **_engine_options(SQLALCHEMY_ASYNC_DATABASE, asynchronous=True),
+    )
+    AsyncSessionLocal = sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+class ThreadpoolSession:
+    """
+    The part of `AsyncSession` used by the async dependencies and routes, backed by a sync session whose calls run
+    in the threadpool. Serves `get_async_db` while the async engine is disabled.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(
+            self._session.execute, statement, *args, **kwargs
+        )
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self._session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self._session.get, entity, ident)
+
+    def add(self, instance) -> None:
+        self._session.add(instance)
+
+    async def refresh(self, instance) -> None:
+        await run_in_threadpool(self._session.refresh, instance)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self._session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self._session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self._session.close)
+
+
+AsyncDatabase = Union[AsyncSession, ThreadpoolSession]
+
 
 def get_db():
     """
@@ -18,3 +109,29 @@ def get_db():
     """
     with SessionLocal() as db:
         yield db
+
+
+async def get_async_db():
+    """
+    Async counterpart of `get_db`: an `AsyncSession` when `database_async` is enabled, otherwise a sync session
+    wrapped in `ThreadpoolSession`. Only the `AsyncSession` methods the wrapper provides should be used.
+    """
+    if AsyncSessionLocal is None:
+        db = ThreadpoolSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines() -> None:
+    """
+    Close the pooled connections of both engines when the application stops.
+    """
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
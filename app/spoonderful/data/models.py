@@ -1,5 +1,5 @@
 from app.spoonderful.data.database import Base
-from sqlalchemy import TIMESTAMP, Column, ForeignKey, Integer, String, Enum
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, Integer, String, Enum, Index
 from sqlalchemy.sql.expression import text
 from app.spoonderful.data.schemas import Direction
 
@@ -25,7 +25,30 @@ class Vote(Base):
     """
 
     __tablename__ = "likes"
+    __table_args__ = (
+        # Covering index so per-recipe aggregates ("users who liked X") are index-only scans. A user's votes are
+        # found through the (user_id, recipe_id) primary key.
+        Index(
+            "ix_likes_recipe_id_direction",
+            "recipe_id",
+            "direction",
+            postgresql_include=["user_id"],
+        ),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     recipe_id = Column(Integer, primary_key=True)
     direction = Column(Enum(Direction), nullable=False)
+
+
+class RecipeVoteCount(Base):
+    """
+    ORM model for a table of vote totals per recipe, kept up to date by the vote routes so popularity does not
+    need an aggregate over `likes`.
+    """
+
+    __tablename__ = "recipe_vote_counts"
+
+    recipe_id = Column(Integer, primary_key=True, autoincrement=False)
+    likes = Column(Integer, nullable=False, server_default=text("0"))
+    dislikes = Column(Integer, nullable=False, server_default=text("0"))
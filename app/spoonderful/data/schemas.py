@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, conint, conlist
 from datetime import datetime
 from typing import Optional
 from enum import Enum
+from app.spoonderful.config import settings
 
 
 class UserOut(BaseModel):
@@ -41,15 +42,55 @@ class Direction(Enum):
     LIKE = 1
 
 
+# Recipe ids are stored in 32-bit integer columns.
+RecipeId = conint(ge=0, le=2**31 - 1)
+
+
 class Vote(BaseModel):
     """
     Associates likes/dislikes with recipes.
     """
 
-    recipe_id: int
+    recipe_id: RecipeId
     direction: Direction
 
 
+class VoteOperation(Enum):
+    """
+    What a batched vote does: `set` adds the vote or changes its direction, `remove` removes a vote in that direction.
+    """
+
+    SET = "set"
+    REMOVE = "remove"
+
+
+class VoteBatchItem(Vote):
+    """
+    One vote of a batch.
+    """
+
+    op: VoteOperation = VoteOperation.SET
+
+
+class VoteBatch(BaseModel):
+    """
+    Votes applied together. Each recipe may appear once.
+    """
+
+    votes: conlist(VoteBatchItem, min_items=1, max_items=settings.vote_batch_max_items)
+
+
+class VoteResult(BaseModel):
+    """
+    Outcome of one batched vote: `added`, `changed`, `unchanged`, `removed`, `not_found` (no vote in that direction to
+    remove) or `invalid_recipe`.
+    """
+
+    recipe_id: int
+    op: VoteOperation
+    status: str
+
+
 class Recommendation(BaseModel):
     """
     Stores a recommended recipe to present to the user.
@@ -1,18 +1,30 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.spoonacular.client import close_session, close_async_client
+from app.spoonacular.cache import close_cache
+from app.spoonacular.resilience import UpstreamError
+from app.spoonacular.catalog import catalog
+from app.spoonacular.known_ids import known_recipe_ids
+from .config import settings
+from .metrics import MetricsMiddleware
+from .processing.executor import shutdown_executor
+from .auth.hashing import password_hasher
+from .processing.feature_space import feature_space
 from .data import models
-from .data.database import engine
+from .data.database import engine, SessionLocal, dispose_engines
 from .routes import (
     register,
     user,
     login,
     vote,
     recommendation,
+    upstream,
+    metrics,
 )
 
 
-# Create tables in the database from the ORM models if they do not exist.
-models.Base.metadata.create_all(bind=engine)
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(register.router)
@@ -20,6 +32,66 @@ app.include_router(user.router)
 app.include_router(login.router)
 app.include_router(vote.router)
 app.include_router(recommendation.router)
+app.include_router(upstream.router)
+app.include_router(metrics.router)
+
+
+@app.exception_handler(UpstreamError)
+async def upstream_error(request: Request, error: UpstreamError):
+    """
+    Spoonacular failures (exhausted quota, an open circuit breaker or retries running out) are reported with the
+    error's status code and, when known, a `Retry-After` header.
+    """
+    headers = {}
+    if error.retry_after is not None:
+        headers["Retry-After"] = str(int(error.retry_after) + 1)
+
+    return JSONResponse(
+        status_code=error.http_status,
+        content={
+            "detail": "Spoonacular is unavailable right now. Please try again later!"
+        },
+        headers=headers,
+    )
+
+
+@app.on_event("startup")
+def startup():
+    """
+    Create missing tables, then load the local recipe catalog saved by a previous run, the published feature space
+    and the known recipe ids. Recipes in the catalog are known to exist, and so are voted recipes when no known ids
+    were saved yet.
+    """
+    if settings.database_create_tables:
+        # Create tables in the database from the ORM models if they do not exist.
+        models.Base.metadata.create_all(bind=engine)
+    if settings.catalog_enabled:
+        catalog.load(settings.catalog_path)
+    if settings.feature_space_enabled:
+        feature_space.reload()
+    if not known_recipe_ids.load(settings.known_recipe_ids_path):
+        # A saved filter already holds the voted recipes, which have one row each in `recipe_vote_counts`.
+        with SessionLocal() as db:
+            voted_ids = db.query(models.RecipeVoteCount.recipe_id)
+            known_recipe_ids.add(recipe_id for recipe_id, in voted_ids)
+    known_recipe_ids.add(catalog.recipe_ids())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Save the recipe catalog and known recipe ids, and release pooled upstream and database connections, the cache
+    backend and the processing and password hashing executors when the application stops.
+    """
+    if settings.catalog_enabled:
+        catalog.save(settings.catalog_path)
+    known_recipe_ids.save(settings.known_recipe_ids_path)
+    close_session()
+    await close_async_client()
+    close_cache()
+    shutdown_executor()
+    password_hasher.shutdown()
+    await dispose_engines()
 
 
 @app.get("/")
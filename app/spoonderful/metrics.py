@@ -0,0 +1,282 @@
+import bisect
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Optional
+
+# Latency buckets in seconds, from sub-millisecond processing stages up to slow upstream calls.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Metric:
+    """
+    Base class for metrics rendered in the Prometheus text format. Samples are kept per combination of label values,
+    given as keyword arguments in the order of `labelnames`.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)
+        ]
+        if extra:
+            pairs.append(extra)
+
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """
+    A value that only goes up, e.g. requests served.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+
+        return [f"{self.name}{self._labels(key)} {value}" for key, value in values]
+
+
+class Gauge(Metric):
+    """
+    A value that is set to its latest reading, e.g. the remaining upstream quota.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+
+        return [f"{self.name}{self._labels(key)} {value}" for key, value in values]
+
+
+class Histogram(Metric):
+    """
+    Counts observations into fixed buckets. An observation is one bisect and three additions under a lock;
+    cumulative bucket counts are only computed when rendering.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> (per-bucket counts with a final +Inf bucket, [sum]).
+        self._values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = [
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            ]
+
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = self._labels(key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+
+        return lines
+
+
+class Registry:
+    """
+    The metrics exposed by `/metrics`.
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(
+    Histogram(
+        "spoonderful_stage_seconds",
+        "Time spent in each stage of serving recommendations.",
+        ("stage",),
+    )
+)
+HTTP_REQUEST_SECONDS = registry.register(
+    Histogram(
+        "spoonderful_http_request_seconds",
+        "Latency of API requests by handler, method and status code.",
+        ("handler", "method", "status"),
+    )
+)
+UPSTREAM_RESPONSES = registry.register(
+    Counter(
+        "spoonacular_responses_total",
+        "Spoonacular calls by endpoint and status code, or timeout, connection_error, circuit_open or quota_exhausted.",
+        ("endpoint", "status"),
+    )
+)
+UPSTREAM_SECONDS = registry.register(
+    Histogram(
+        "spoonacular_request_seconds",
+        "Time until Spoonacular's response headers arrived or the request failed, by endpoint.",
+        ("endpoint",),
+    )
+)
+UPSTREAM_RATELIMIT = registry.register(
+    Gauge(
+        "spoonacular_ratelimit",
+        "RapidAPI rate limit headers from the latest response, by bucket and kind (limit or remaining).",
+        ("bucket", "kind"),
+    )
+)
+
+
+class span(ContextDecorator):
+    """
+    Times a stage into `spoonderful_stage_seconds`, as a context manager (`with span("tabulate"):`) or a decorator
+    of sync functions. Async stages should use the context manager inside the coroutine.
+    """
+
+    def __init__(self, stage: str, histogram: Optional[Histogram] = None):
+        self.stage = stage
+        self.histogram = histogram or STAGE_SECONDS
+        self._started = 0.0
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call, so concurrent calls do not share a start time.
+        return span(self.stage, self.histogram)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self._started, stage=self.stage)
+        return False
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request into `spoonderful_http_request_seconds`, labelled
+    with the name of the endpoint function that handled it (a bounded set, unlike raw paths).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Routing stores the matched endpoint in the request scope.
+            endpoint = scope.get("endpoint")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                handler=getattr(endpoint, "__name__", "unmatched"),
+                method=scope["method"],
+                status=status,
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,283 @@
+import threading
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+
+# KMeans defaults matching scikit-learn's.
+N_INIT = 10
+MAX_ITER = 300
+TOLERANCE = 1e-4
+
+
+@dataclass
+class Clustering:
+    """
+    A fitted k-means clustering. Attribute names follow scikit-learn's `KMeans` so either can be passed to the
+    recommendation step. `global_centers` marks centers fitted across requests rather than to these rows.
+    """
+
+    cluster_centers_: np.ndarray
+    labels_: np.ndarray
+    inertia_: float
+    global_centers: bool = False
+
+
+def standardize(X: np.ndarray) -> np.ndarray:
+    """
+    Scales each column to zero mean and unit variance. Constant columns are only centred, as in `StandardScaler`.
+    """
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1
+
+    return (X - X.mean(axis=0)) / scale
+
+
+def principal_components(X: np.ndarray, n_components: int) -> np.ndarray:
+    """
+    Projects centred data onto its first `n_components` principal components, using the SVD of `X` itself. Signs
+    are fixed the way scikit-learn's `PCA` fixes them so the output does not depend on the LAPACK build.
+    """
+    U, S, _ = np.linalg.svd(X, full_matrices=False)
+    U, S = U[:, :n_components], S[:n_components]
+    signs = np.sign(U[np.abs(U).argmax(axis=0), range(U.shape[1])])
+    signs[signs == 0] = 1
+
+    return U * (S * signs)
+
+
+def kmeans(
+    X: np.ndarray,
+    n_clusters: int,
+    rng: np.random.Generator,
+    n_init: int = N_INIT,
+    max_iter: int = MAX_ITER,
+    tolerance: float = TOLERANCE,
+) -> Clustering:
+    """
+    Lloyd's k-means with k-means++ initialisation, keeping the best of `n_init` runs. Work arrays are allocated
+    once and reused across iterations and runs.
+    """
+    n_samples = X.shape[0]
+    if n_samples < n_clusters:
+        raise ValueError(f"n_samples={n_samples} should be >= n_clusters={n_clusters}.")
+
+    squared_norms = np.einsum("ij,ij->i", X, X)
+    distances = np.empty((n_samples, n_clusters))
+    labels = np.empty(n_samples, dtype=np.intp)
+    shift_tolerance = tolerance * X.var(axis=0).mean()
+    best = None
+
+    for _ in range(n_init):
+        centers = _kmeans_plus_plus(X, n_clusters, rng, squared_norms)
+        for _ in range(max_iter):
+            _squared_distances(X, centers, squared_norms, distances)
+            distances.argmin(axis=1, out=labels)
+            new_centers = _centroids(X, labels, distances, n_clusters)
+            shift = ((new_centers - centers) ** 2).sum()
+            centers = new_centers
+            if shift <= shift_tolerance:
+                break
+
+        _squared_distances(X, centers, squared_norms, distances)
+        distances.argmin(axis=1, out=labels)
+        inertia = float(distances[np.arange(n_samples), labels].sum())
+        if best is None or inertia < best.inertia_:
+            best = Clustering(centers, labels.copy(), inertia)
+
+    return best
+
+
+def closest_to_centers(
+    centers: np.ndarray, X: np.ndarray, distinct: bool = False
+) -> np.ndarray:
+    """
+    Returns, for each center, the row index of the closest point in `X`, like scikit-learn's
+    `pairwise_distances_argmin`. With `distinct` and enough rows in `X`, centers whose closest point was already
+    taken by an earlier center get their closest remaining point instead.
+    """
+    distances = ((centers[:, np.newaxis, :] - X[np.newaxis, :, :]) ** 2).sum(axis=2)
+    if not distinct or len(X) < len(centers):
+        return distances.argmin(axis=1)
+
+    closest = np.empty(len(centers), dtype=np.intp)
+    for index, row in enumerate(distances):
+        closest[index] = row.argmin()
+        distances[:, closest[index]] = np.inf
+
+    return closest
+
+
+class OnlineKMeans:
+    """
+    Long-lived mini-batch k-means over a fixed feature space. Rows seen by requests are buffered with `observe` and
+    folded into the centers by `update`, which runs in the background. Each center moves to the running mean of
+    every row assigned to it. Updates build new arrays and swap them in one assignment (copy-on-write), so
+    `clustering` reads a consistent snapshot without locking. The model resets when the feature space changes.
+    """
+
+    def __init__(self, n_clusters: int, seed: int, max_pending_rows: int):
+        self.n_clusters = n_clusters
+        self.max_pending_rows = max_pending_rows
+        self._rng = np.random.default_rng(seed)
+        # (feature space, centers, per-center counts); replaced, never mutated.
+        self._state: tuple[object, Optional[np.ndarray], Optional[np.ndarray]] = (
+            None,
+            None,
+            None,
+        )
+        self._pending: list[np.ndarray] = []
+        self._pending_rows = 0
+        self._pending_space = None
+        self._update_scheduled = False
+        self._pending_lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+    def observe(self, X: np.ndarray, space: object) -> bool:
+        """
+        Buffers rows of `space` for the next update. Returns True if the caller should schedule `update`, i.e. no
+        update is pending yet. Rows beyond `max_pending_rows` are dropped.
+        """
+        with self._pending_lock:
+            if space is not self._pending_space:
+                self._pending, self._pending_rows = [], 0
+                self._pending_space = space
+            if self._pending_rows + len(X) <= self.max_pending_rows:
+                self._pending.append(X)
+                self._pending_rows += len(X)
+
+            schedule = not self._update_scheduled
+            self._update_scheduled = True
+
+            return schedule
+
+    def update(self) -> None:
+        """
+        Folds the buffered rows into the centers (`partial_fit`).
+        """
+        with self._pending_lock:
+            pending, space = self._pending, self._pending_space
+            self._pending, self._pending_rows = [], 0
+            self._update_scheduled = False
+
+        if pending:
+            self.partial_fit(np.vstack(pending), space)
+
+    def partial_fit(self, X: np.ndarray, space: object) -> None:
+        """
+        Updates the centers with a batch of rows. The first batch with at least `n_clusters` rows of a new feature
+        space initialises the centers with k-means++.
+        """
+        with self._update_lock:
+            current_space, centers, counts = self._state
+            if space is not current_space or centers is None:
+                if len(X) < self.n_clusters:
+                    return
+                centers = _kmeans_plus_plus(
+                    X, self.n_clusters, self._rng, np.einsum("ij,ij->i", X, X)
+                )
+                counts = np.zeros(self.n_clusters)
+
+            labels = _labels(X, centers)
+            batch_counts = np.bincount(labels, minlength=self.n_clusters)
+            batch_sums = np.stack(
+                [
+                    np.bincount(labels, weights=X[:, column], minlength=self.n_clusters)
+                    for column in range(X.shape[1])
+                ],
+                axis=1,
+            )
+            new_counts = counts + batch_counts
+            assigned = batch_counts > 0
+            new_centers = centers.copy()
+            new_centers[assigned] = (
+                centers[assigned] * counts[assigned, np.newaxis] + batch_sums[assigned]
+            ) / new_counts[assigned, np.newaxis]
+
+            self._state = (space, new_centers, new_counts)
+
+    def clustering(self, X: np.ndarray, space: object) -> Optional[Clustering]:
+        """
+        Assigns the rows of `X` to the current centers. Returns None until the model has centers for `space`.
+        """
+        current_space, centers, _ = self._state
+        if space is not current_space or centers is None:
+            return None
+
+        distances = np.empty((len(X), self.n_clusters))
+        _squared_distances(X, centers, np.einsum("ij,ij->i", X, X), distances)
+        labels = distances.argmin(axis=1)
+        inertia = float(distances[np.arange(len(X)), labels].sum())
+
+        return Clustering(centers, labels, inertia, global_centers=True)
+
+
+def _squared_distances(
+    X: np.ndarray, centers: np.ndarray, squared_norms: np.ndarray, out: np.ndarray
+) -> None:
+    """
+    Writes the squared euclidean distance from every point to every center into `out`.
+    """
+    np.dot(X, centers.T, out=out)
+    out *= -2
+    out += squared_norms[:, np.newaxis]
+    out += np.einsum("ij,ij->i", centers, centers)
+    np.maximum(out, 0, out=out)
+
+
+def _labels(X: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    distances = np.empty((len(X), len(centers)))
+    _squared_distances(X, centers, np.einsum("ij,ij->i", X, X), distances)
+
+    return distances.argmin(axis=1)
+
+
+def _centroids(
+    X: np.ndarray, labels: np.ndarray, distances: np.ndarray, n_clusters: int
+) -> np.ndarray:
+    """
+    Returns the mean of each cluster. An empty cluster is moved to the point farthest from its own center.
+    """
+    counts = np.bincount(labels, minlength=n_clusters)
+    centers = np.stack(
+        [
+            np.bincount(labels, weights=X[:, column], minlength=n_clusters)
+            for column in range(X.shape[1])
+        ],
+        axis=1,
+    )
+    empty = counts == 0
+    if empty.any():
+        farthest = np.argsort(distances[np.arange(len(X)), labels])[::-1]
+        centers[empty] = X[farthest[: empty.sum()]]
+        counts[empty] = 1
+
+    return centers / counts[:, np.newaxis]
+
+
+def _kmeans_plus_plus(
+    X: np.ndarray,
+    n_clusters: int,
+    rng: np.random.Generator,
+    squared_norms: np.ndarray,
+) -> np.ndarray:
+    """
+    Picks initial centers: the first uniformly at random, then each next one with probability proportional to its
+    squared distance from the closest center picked so far.
+    """
+    n_samples = X.shape[0]
+    centers = np.empty((n_clusters, X.shape[1]))
+    centers[0] = X[rng.integers(n_samples)]
+    closest = np.empty((n_samples, 1))
+    _squared_distances(X, centers[:1], squared_norms, closest)
+    closest = closest[:, 0]
+
+    for index in range(1, n_clusters):
+        total = closest.sum()
+        if total > 0:
+            candidate = rng.choice(n_samples, p=closest / total)
+        else:  # Fewer distinct points than clusters.
+            candidate = rng.integers(n_samples)
+        centers[index] = X[candidate]
+        np.minimum(closest, ((X - X[candidate]) ** 2).sum(axis=1), out=closest)
+
+    return centers
@@ -0,0 +1,45 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from app.spoonderful.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the bounded executor used for CPU-bound processing (tabulation and clustering), creating it on
+    first use. Kept separate from the default threadpool so slow processing cannot starve other handlers.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.processing_workers,
+            thread_name_prefix="processing",
+        )
+
+    return _executor
+
+
+async def run_in_executor(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs `func(*args, **kwargs)` on the processing executor and awaits the result.
+    """
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_executor() -> None:
+    """
+    Waits for queued processing work to finish and releases the executor threads.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import os
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+from app.spoonderful.config import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass
+class FeatureSpace:
+    """
+    Standardization and PCA learned once over a large recipe sample by `scripts/fit_feature_space.py`. Requests only
+    call `transform`, so every request projects its recipes into the same space.
+    """
+
+    columns: list[str]
+    mean: np.ndarray
+    scale: np.ndarray
+    components: np.ndarray  # (n_components, n_features)
+    _projection: np.ndarray = field(init=False, repr=False)
+    _offset: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Fold the scaling into the projection so that `transform` is a single matrix multiply.
+        self._projection = (self.components / self.scale).T
+        self._offset = self.mean @ self._projection
+
+    @classmethod
+    def fit(cls, features: pd.DataFrame, n_components: int) -> FeatureSpace:
+        """
+        Learns the per-column mean and scale of `features` and its first `n_components` principal axes.
+        """
+        X = features.to_numpy(dtype=np.float64)
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1
+        _, _, Vt = np.linalg.svd((X - mean) / scale, full_matrices=False)
+        components = Vt[:n_components]
+        # Make the largest loading of each axis positive so refits do not flip the space.
+        signs = np.sign(
+            components[range(len(components)), np.abs(components).argmax(axis=1)]
+        )
+        signs[signs == 0] = 1
+
+        return cls(
+            list(features.columns), mean, scale, components * signs[:, np.newaxis]
+        )
+
+    def transform(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Projects `features` into the fitted space. Columns the space was not fitted on are ignored and missing ones
+        are treated as 0.
+        """
+        return self._align(features) @ self._projection - self._offset
+
+    def standardize(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Scales `features` with the fitted means and scales, without projecting them.
+        """
+        return (self._align(features) - self.mean) / self.scale
+
+    def _align(self, features: pd.DataFrame) -> np.ndarray:
+        return features.reindex(columns=self.columns, fill_value=0).to_numpy(
+            dtype=np.float64
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Writes the space to `path` as an `.npz` file. The file is replaced atomically so a serving process never
+        reads a partial artifact.
+        """
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            np.savez(
+                file,
+                columns=np.array(self.columns),
+                mean=self.mean,
+                scale=self.scale,
+                components=self.components,
+            )
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> FeatureSpace:
+        with np.load(path) as arrays:
+            return cls(
+                arrays["columns"].tolist(),
+                arrays["mean"],
+                arrays["scale"],
+                arrays["components"],
+            )
+
+
+class FeatureSpaceLoader:
+    """
+    Serves the `FeatureSpace` published at `path`. Loaded at startup, then reloaded when the file's modification time
+    changes, checked at most every `check_interval` seconds, so a newly published artifact is picked up without a
+    restart.
+    """
+
+    def __init__(self, path: str, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self._feature_space: Optional[FeatureSpace] = None
+        self._modified_at: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[FeatureSpace]:
+        """
+        Returns the current feature space, or None if none has been published.
+        """
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+
+        return self._feature_space
+
+    def reload(self) -> bool:
+        """
+        Loads the artifact if it changed since it was last loaded. Returns True if a new feature space was loaded.
+        A missing or unreadable artifact keeps the current one.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                modified_at = os.stat(self.path).st_mtime
+                if modified_at == self._modified_at:
+                    return False
+                feature_space = FeatureSpace.load(self.path)
+            except (OSError, KeyError, ValueError) as error:
+                if not isinstance(error, FileNotFoundError):
+                    print(f"Could not load the feature space at {self.path}: {error}")
+                return False
+
+            self._feature_space = feature_space
+            self._modified_at = modified_at
+
+            return True
+
+
+feature_space = FeatureSpaceLoader(
+    settings.feature_space_path, settings.feature_space_reload_interval_seconds
+)
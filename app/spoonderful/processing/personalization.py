@@ -0,0 +1,167 @@
+from __future__ import annotations
+import threading
+import numpy as np
+from typing import TYPE_CHECKING, Iterable, Optional
+from app.spoonderful.config import settings
+from app.spoonderful.data.schemas import Direction
+from .feature_space import feature_space
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class RecipeVectorIndex:
+    """
+    Unit recipe vectors by recipe id. Recipes are only ever ranked among the candidates of one request, so they are
+    scored exactly: the cost depends on the number of candidates rather than on the number of indexed recipes, and
+    an approximate index would only add hashing on every insert.
+    """
+
+    def __init__(self, dimensions: int, max_recipes: int):
+        self.dimensions = dimensions
+        self.max_recipes = max_recipes
+        self._vectors = np.empty((64, dimensions), dtype=np.float32)
+        self._rows: dict[int, int] = {}  # Recipe id -> row of `_vectors`.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._rows
+
+    def add(self, recipe_ids: Iterable[int], vectors: np.ndarray) -> None:
+        """
+        Indexes unit `vectors`. Recipes already indexed, or beyond `max_recipes`, are skipped.
+        """
+        with self._lock:
+            for recipe_id, vector in zip(recipe_ids, vectors):
+                if recipe_id in self._rows or len(self._rows) >= self.max_recipes:
+                    continue
+
+                row = len(self._rows)
+                if row == len(self._vectors):
+                    self._vectors = np.concatenate([self._vectors, self._vectors])
+                self._vectors[row] = vector
+                self._rows[recipe_id] = row
+
+    def vectors(self, recipe_ids: Iterable[int]) -> np.ndarray:
+        """
+        Returns the vectors of the indexed recipes among `recipe_ids`.
+        """
+        with self._lock:
+            rows = [
+                self._rows[recipe_id]
+                for recipe_id in recipe_ids
+                if recipe_id in self._rows
+            ]
+
+            return self._vectors[rows]
+
+    def similarities(
+        self, vector: np.ndarray, recipe_ids: Iterable[int]
+    ) -> dict[int, float]:
+        """
+        Returns the cosine similarity to the unit `vector` of each indexed recipe among `recipe_ids`.
+        """
+        with self._lock:
+            ids = [recipe_id for recipe_id in recipe_ids if recipe_id in self._rows]
+            rows = [self._rows[recipe_id] for recipe_id in ids]
+            scores = self._vectors[rows] @ vector
+
+        return dict(zip(ids, scores.tolist()))
+
+
+class Personalizer:
+    """
+    Ranks recipes for a user from their votes. Recipes are represented by their standardized features in the
+    published `FeatureSpace`, scaled to unit length, and a user's profile is the mean of their liked recipes minus
+    the mean of their disliked ones. The index is rebuilt whenever the feature space changes, and personalization is
+    skipped without one.
+    """
+
+    def __init__(self, max_recipes: int):
+        self.max_recipes = max_recipes
+        self._space = None
+        self._index: Optional[RecipeVectorIndex] = None
+        self._lock = threading.Lock()
+
+    def add(self, recipe_ids: Iterable[int], features: pd.DataFrame) -> None:
+        """
+        Indexes recipes from their clustering features (see `pipeline.select_features`).
+        """
+        space = feature_space.get()
+        index = self._index_for(space)
+        if index is None or features.empty:
+            return
+
+        X = space.standardize(features)
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        index.add(recipe_ids, (X / norms).astype(np.float32))
+
+    def missing(self, recipe_ids: Iterable[int]) -> list[int]:
+        """
+        Returns the recipe ids that are not indexed yet.
+        """
+        index = self._index_for(feature_space.get())
+        if index is None:
+            return []
+
+        return [recipe_id for recipe_id in recipe_ids if recipe_id not in index]
+
+    def rank(
+        self, df: pd.DataFrame, votes: list, keep: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Drops the recipes the user disliked and moves those closest to their profile first, in order of similarity.
+        Recipes that are not indexed keep their order after them. With `keep`, only the first `keep` recipes are
+        returned.
+        """
+        liked = [vote.recipe_id for vote in votes if vote.direction == Direction.LIKE]
+        disliked = [
+            vote.recipe_id for vote in votes if vote.direction == Direction.DISLIKE
+        ]
+        df = df[~df["id"].isin(disliked)]
+
+        index = self._index_for(feature_space.get())
+        profile = self._profile(index, liked, disliked) if index is not None else None
+        if profile is not None:
+            scores = index.similarities(profile, df["id"].tolist())
+            # Unindexed recipes sort after every score, which are at least -1.
+            similarity = df["id"].map(scores).fillna(-2.0).to_numpy()
+            df = df.iloc[np.argsort(-similarity, kind="stable")]
+
+        return df if keep is None else df.head(keep)
+
+    @staticmethod
+    def _profile(
+        index: RecipeVectorIndex, liked: list[int], disliked: list[int]
+    ) -> Optional[np.ndarray]:
+        liked_vectors = index.vectors(liked)
+        disliked_vectors = index.vectors(disliked)
+        if not len(liked_vectors) and not len(disliked_vectors):
+            return None
+
+        profile = np.zeros(index.dimensions, dtype=np.float32)
+        if len(liked_vectors):
+            profile += liked_vectors.mean(axis=0)
+        if len(disliked_vectors):
+            profile -= disliked_vectors.mean(axis=0)
+        norm = np.linalg.norm(profile)
+
+        return profile / norm if norm else None
+
+    def _index_for(self, space) -> Optional[RecipeVectorIndex]:
+        if space is None:
+            return None
+
+        with self._lock:
+            if space is not self._space:
+                self._space = space
+                self._index = RecipeVectorIndex(len(space.columns), self.max_recipes)
+
+            return self._index
+
+
+personalizer = Personalizer(max_recipes=settings.personalization_max_recipes)
@@ -1,18 +1,112 @@
-import pandas as pd
+from __future__ import annotations
 import numpy as np
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+from typing import TYPE_CHECKING, Union
+from . import clustering
+from .feature_space import feature_space
+from .executor import get_executor
+from app.spoonderful.config import settings
+from app.spoonderful.metrics import span
 
+# pandas and scikit-learn are imported on first use so the API process starts quickly.
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.cluster import KMeans
 
-def apply_clustering(prepared_data: pd.DataFrame) -> tuple[KMeans, np.ndarray]:
+N_CLUSTERS = 5
+N_COMPONENTS = 2
+
+# Long-lived clustering used by the "online" engine.
+online_kmeans = clustering.OnlineKMeans(
+    N_CLUSTERS, settings.clustering_seed, settings.online_clustering_max_pending_rows
+)
+
+
+@span("apply_clustering")
+def apply_clustering(
+    prepared_data: pd.DataFrame,
+) -> tuple[Union[KMeans, clustering.Clustering], np.ndarray]:
     """
     Apply cluster analysis to the appropriate columns of the prepared DataFrame using a 'force 5' KMeans
     strategy. The `recommended_columns` refers to columns appearing in the recommendations sent to users.
-    Returns the fitted clustering (`cluster`) and the transformed data (`X`).
+    Returns the fitted clustering (`cluster`) and the transformed data (`X`). Uses the engine selected by
+    `settings.clustering_engine`.
+    """
+    if settings.clustering_engine == "sklearn":
+        return _apply_sklearn_clustering(prepared_data)
+    if settings.clustering_engine == "online":
+        return _apply_online_clustering(prepared_data)
+
+    return _apply_numpy_clustering(prepared_data)
+
+
+def select_features(df: pd.DataFrame, columns_to_show: list[str]) -> pd.DataFrame:
+    """
+    Returns the columns clustered on: every column except those shown to users, plus the total time.
     """
+    features = df.drop(columns=columns_to_show)
+    features["minutes"] = df["readyInMinutes"]  # include total time in clustering.
+
+    return features
+
+
+def _apply_numpy_clustering(
+    prepared_data: pd.DataFrame,
+) -> tuple[clustering.Clustering, np.ndarray]:
+    """
+    The sklearn pipeline's standardization, PCA and KMeans written directly against numpy, which is much cheaper
+    for the at most 100 recipes clustered per request. Seeded with `settings.clustering_seed`, so the same recipes
+    always give the same clusters. Binary features are already 0/1, which is what `OrdinalEncoder` maps them to.
+    When a pre-fitted `FeatureSpace` is published, the recipes are only projected into it.
+    """
+    space = feature_space.get() if settings.feature_space_enabled else None
+    if space is not None:
+        X = space.transform(prepared_data)
+    else:
+        X = prepared_data.to_numpy(dtype=np.float64)
+        X = clustering.standardize(X)
+        X = clustering.principal_components(X, N_COMPONENTS)
+
+    return _fit_kmeans(X), X
+
+
+def _apply_online_clustering(
+    prepared_data: pd.DataFrame,
+) -> tuple[clustering.Clustering, np.ndarray]:
+    """
+    Assigns the recipes to the centers of `online_kmeans` instead of clustering them, and queues their rows to update
+    the model in the background. Needs a published `FeatureSpace`; falls back to `_apply_numpy_clustering` without
+    one, and to a per-request fit while the model has no centers yet.
+    """
+    space = feature_space.get() if settings.feature_space_enabled else None
+    if space is None:
+        return _apply_numpy_clustering(prepared_data)
+
+    X = space.transform(prepared_data)
+    if online_kmeans.observe(X, space):
+        get_executor().submit(online_kmeans.update)
+    cluster = online_kmeans.clustering(X, space)
+    if cluster is None:
+        cluster = _fit_kmeans(X)
+
+    return cluster, X
+
+
+def _fit_kmeans(X: np.ndarray) -> clustering.Clustering:
+    rng = np.random.default_rng(settings.clustering_seed)
+
+    return clustering.kmeans(X, N_CLUSTERS, rng)
+
+
+def _apply_sklearn_clustering(prepared_data: pd.DataFrame) -> tuple[KMeans, np.ndarray]:
+    """
+    The original clustering: a scikit-learn pipeline of ordinal encoding, scaling and PCA, then KMeans.
+    """
+    from sklearn.pipeline import Pipeline
+    from sklearn.compose import ColumnTransformer
+    from sklearn.decomposition import PCA
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+
     all_columns = prepared_data.columns.tolist()
     column_indices_dict = _map_columns_to_indices(all_columns)
 
@@ -32,11 +126,11 @@ def apply_clustering(prepared_data: pd.DataFrame) -> tuple[KMeans, np.ndarray]:
                 ),
             ),
             ("scaling", StandardScaler()),
-            ("reduce_dimensions", PCA(n_components=2)),
+            ("reduce_dimensions", PCA(n_components=N_COMPONENTS)),
         ],
     )
 
-    cluster = KMeans(n_clusters=5)
+    cluster = KMeans(n_clusters=N_CLUSTERS)
 
     X = pipe.fit_transform(prepared_data)
     cluster.fit(X)
@@ -1,7 +1,13 @@
-from app.spoonacular.response import SpoonacularResponse
+from __future__ import annotations
+from app.spoonacular.response import SpoonacularResponse, AsyncSpoonacularResponse
 from app.spoonacular.retrieval import ComplexRetrievalStrategy, DataRetrievalStrategy
-from . import tabulation as tab
-import pandas as pd
+from app.spoonderful.metrics import span
+from .executor import run_in_executor
+from typing import TYPE_CHECKING
+
+# Tabulation (and with it pandas) is imported on first use so the API process starts quickly.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def get_query(path: str = "../data/my_food.txt") -> str:
@@ -26,10 +32,30 @@ def retrieve_data(
     Uses the SpoonacularResponse.classmethod to query a Spoonacular endpoint and retrieve
     the data defined in the strategy class. Returns response JSON data.
     """
-    spoon = response(query, recipe_quantity)
+    with span("fetch_recipes"):
+        spoon = response(query, recipe_quantity)
+    retrieval_strategy = strategy()
+
+    with span("retrieve_data"):
+        return spoon.get_data(retrieval_strategy)
+
+
+async def retrieve_data_async(
+    query: str,
+    recipe_quantity: int,
+    response: AsyncSpoonacularResponse,
+    strategy: DataRetrievalStrategy,
+) -> list[dict, str, object]:
+    """
+    Async `retrieve_data` that awaits an AsyncSpoonacularResponse.classmethod.
+    """
+    # Includes answers from the cache and catalog, unlike `spoonacular_request_seconds`.
+    with span("fetch_recipes"):
+        spoon = await response(query, recipe_quantity)
     retrieval_strategy = strategy()
 
-    return spoon.get_data(retrieval_strategy)
+    with span("retrieve_data"):
+        return spoon.get_data(retrieval_strategy)
 
 
 def prep_recipe_data(
@@ -41,34 +67,42 @@ def prep_recipe_data(
     """
     Get the Spoonacular response and preprocess the recipe JSON data in preparation for recommendation.
     """
-    # TODO increase cohesion here.
-
     data = retrieve_data(query, recipe_quantity, response, strategy)
 
-    df = pd.DataFrame(data)
-    try:
-        df = df.drop(columns=["nutrition", "analyzedInstructions"])
-    except KeyError:
-        print("No results retrieved for provided ingredients.")
-        return df
+    return tabulate_recipe_data(data)
+
+
+async def prep_recipe_data_async(
+    query: str,
+    recipe_quantity: int = 5,
+    response: AsyncSpoonacularResponse = AsyncSpoonacularResponse.get_recipes,
+    strategy: DataRetrievalStrategy = ComplexRetrievalStrategy,
+):
+    """
+    Async `prep_recipe_data`. The upstream request is awaited and the tabulation runs on the bounded
+    processing executor so it does not block the event loop.
+    """
+    data = await retrieve_data_async(query, recipe_quantity, response, strategy)
 
-    nutrition_data = []
-    instruction_data = []
-    for recipe in data:
-        nutrition_data.append(recipe.get("nutrition"))
-        instruction_data.append(recipe.get("analyzedInstructions"))
+    return await run_in_executor(tabulate_recipe_data, data)
 
-    calories = tab.CaloricBreakdownTabulator()
-    calorie_df = calories.tabulate_data(nutrition_data)
 
-    nutrients = tab.NutrientDailyNeedsTabulator()
-    nutrient_df = nutrients.tabulate_data(nutrition_data)
+def tabulate_recipe_data(data: list[dict]) -> pd.DataFrame:
+    """
+    Preprocess the retrieved recipe JSON data in preparation for recommendation. This is the CPU-bound half
+    of `prep_recipe_data`.
+    """
+    import pandas as pd
+    from . import tabulation as tab
 
-    instructions = tab.InstructionsTabulator()
-    instructions_df = instructions.tabulate_data(instruction_data)
+    if not data:
+        print("No results retrieved for provided ingredients.")
+        return pd.DataFrame(data)
 
-    frames = [df, calorie_df, nutrient_df, instructions_df]
-    aggregate_df = pd.concat(frames, axis=1)
-    aggregate_df = aggregate_df.fillna(0)
+    recipes = tab.RecipeBatchTabulator()
+    with span("tabulate"):
+        aggregate_df = recipes.tabulate_data(data)
+    with span("fillna"):
+        aggregate_df = aggregate_df.fillna(0)
 
     return aggregate_df
@@ -1,7 +1,52 @@
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
+# Nutrients reported by complexSearch with `addRecipeNutrition`, in the order of their recommendation columns.
+NUTRIENTS = (
+    "Calories",
+    "Fat",
+    "Saturated Fat",
+    "Mono Unsaturated Fat",
+    "Poly Unsaturated Fat",
+    "Trans Fat",
+    "Carbohydrates",
+    "Net Carbohydrates",
+    "Sugar",
+    "Fiber",
+    "Protein",
+    "Cholesterol",
+    "Sodium",
+    "Alcohol",
+    "Caffeine",
+    "Vitamin A",
+    "Vitamin B1",
+    "Vitamin B2",
+    "Vitamin B3",
+    "Vitamin B5",
+    "Vitamin B6",
+    "Vitamin B12",
+    "Vitamin C",
+    "Vitamin D",
+    "Vitamin E",
+    "Vitamin K",
+    "Folate",
+    "Folic Acid",
+    "Choline",
+    "Calcium",
+    "Copper",
+    "Fluoride",
+    "Iron",
+    "Magnesium",
+    "Manganese",
+    "Phosphorus",
+    "Potassium",
+    "Selenium",
+    "Zinc",
+)
+NUTRIENT_INDEX = {name: column for column, name in enumerate(NUTRIENTS)}
+
 
 class DataTabulator(ABC):
     """
@@ -85,3 +130,71 @@ class InstructionsTabulator(DataTabulator):
             all_instructions.append(recipe_instructions)
 
         return pd.DataFrame(all_instructions, columns=["instructions"])
+
+
+@dataclass
+class RecipeBatchTabulator(DataTabulator):
+    """
+    Tabulates complexSearch recipe data in a single pass. The caloric breakdown and nutrient daily needs are written
+    into preallocated float32 matrices through the fixed `NUTRIENT_INDEX`, and the instructions are numbered on the
+    way. Nutrients missing from `NUTRIENTS` still get a column, and nutrients no recipe reported get none.
+    """
+
+    nested_fields: tuple = ("nutrition", "analyzedInstructions")
+    caloric_fields: tuple = ("percentProtein", "percentFat", "percentCarbs")
+
+    def tabulate_data(self, json_data: list[dict]) -> pd.DataFrame:
+        """
+        Returns the top-level recipe fields, macronutrient percentages, nutrient daily need percentages and
+        instructions of each recipe. Missing values are 0.
+        """
+        size = len(json_data)
+        caloric_breakdown = np.zeros((size, len(self.caloric_fields)), dtype=np.float32)
+        daily_needs = np.zeros((size, len(NUTRIENTS)), dtype=np.float32)
+        reported = np.zeros(len(NUTRIENTS), dtype=bool)
+        other_daily_needs: dict[str, np.ndarray] = {}
+        instructions = []
+
+        for row, recipe in enumerate(json_data):
+            nutrition = recipe.get("nutrition") or {}
+            breakdown = nutrition.get("caloricBreakdown") or {}
+            for column, field in enumerate(self.caloric_fields):
+                caloric_breakdown[row, column] = breakdown.get(field) or 0
+
+            for nutrient in nutrition.get("nutrients") or []:
+                column = NUTRIENT_INDEX.get(nutrient["name"])
+                if column is None:
+                    values = other_daily_needs.setdefault(
+                        nutrient["name"], np.zeros(size, dtype=np.float32)
+                    )
+                    values[row] = nutrient["percentOfDailyNeeds"]
+                else:
+                    daily_needs[row, column] = nutrient["percentOfDailyNeeds"]
+                    reported[column] = True
+
+            instructions.append(_number_steps(recipe.get("analyzedInstructions")))
+
+        frames = [
+            pd.DataFrame.from_records(json_data, exclude=self.nested_fields),
+            pd.DataFrame(caloric_breakdown, columns=list(self.caloric_fields)),
+            pd.DataFrame(
+                daily_needs[:, reported],
+                columns=[name for name, seen in zip(NUTRIENTS, reported) if seen],
+            ),
+            pd.DataFrame(other_daily_needs, index=range(size)),
+            pd.DataFrame({"instructions": instructions}),
+        ]
+
+        return pd.concat(frames, axis=1)
+
+
+def _number_steps(analyzed_instructions: list[dict]) -> str:
+    """
+    Formats the steps of a recipe's first set of instructions as numbered lines.
+    """
+    if not analyzed_instructions:
+        return ""
+
+    steps = analyzed_instructions[0].get("steps") or []
+
+    return "\n".join(f"{index}. {step['step']}" for index, step in enumerate(steps, 1))
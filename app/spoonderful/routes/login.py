@@ -1,37 +1,50 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
 from app.spoonderful.data import database, schemas, models
-from app.spoonderful.auth import utils, oauth2
+from app.spoonderful.auth import oauth2
+from app.spoonderful.auth.hashing import password_hasher
 
 router = APIRouter(tags=["Authentication"])
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     user_credentials: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(database.get_db),
+    db: database.AsyncDatabase = Depends(database.get_async_db),
 ):
     """
     The green 'Authorize' button at the top right of the docs should be used as a more intuitive login option.
     Use the email address you registered with as a `username`.
     """
     user = (
-        db.query(models.User)
-        .filter(models.User.email == user_credentials.username)
-        .first()
-    )
+        await db.execute(
+            select(models.User).where(models.User.email == user_credentials.username)
+        )
+    ).scalar()
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=f"Invalid Credentials."
         )
 
-    if not utils.verify_password(user_credentials.password, user.password):
+    verified, new_hash = await password_hasher.verify_and_update(
+        user_credentials.password, user.password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=f"Invalid Credentials."
         )
 
+    if new_hash is not None:
+        # The password was hashed with another cost, so it is stored again with the current one.
+        await db.execute(
+            update(models.User)
+            .where(models.User.id == user.id)
+            .values(password=new_hash)
+        )
+        await db.commit()
+
     access_token = oauth2.create_access_token(data={"user_id": user.id})
 
     return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from app.spoonderful.metrics import registry
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics", status_code=status.HTTP_200_OK, response_class=PlainTextResponse
+)
+def get_metrics():
+    """
+    Returns request latencies, per-stage timings of recommendations and Spoonacular call counts in the Prometheus
+    text format.
+    """
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,31 +1,54 @@
-from fastapi import APIRouter, status, HTTPException, Query
-from app.spoonderful.processing.preprocess import prep_recipe_data
-from app.spoonderful.processing.pipeline import apply_clustering
-from app.spoonderful.data.schemas import Recommendation
-from sklearn.cluster import KMeans
-from sklearn.metrics import pairwise_distances_argmin_min
-import pandas as pd
+from __future__ import annotations
+from fastapi import APIRouter, status, HTTPException, Query, Depends
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.spoonderful.processing.preprocess import (
+    prep_recipe_data_async,
+    tabulate_recipe_data,
+)
+from app.spoonderful.processing.executor import run_in_executor
+from app.spoonderful.processing.pipeline import apply_clustering, select_features
+from app.spoonderful.processing.clustering import Clustering, closest_to_centers
+from app.spoonderful.processing.personalization import personalizer
+from app.spoonderful.data import database, models
+from app.spoonderful.data.schemas import Recommendation, UserOut
+from app.spoonderful.auth import oauth2
+from app.spoonderful.config import settings
+from app.spoonderful.metrics import span
+from app.spoonacular.catalog import catalog
+from app.spoonacular.known_ids import known_recipe_ids
+from app.spoonacular.retrieval import ComplexRetrievalStrategy
+from app.spoonacular.ratelimit import quota
+from typing import TYPE_CHECKING, Optional, Union
 import numpy as np
 
+# pandas and scikit-learn are only imported once recipes are processed, keeping startup fast.
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.cluster import KMeans
+
 router = APIRouter(prefix="/recipes", tags=["Recommendations"])
 # These columns will be excluded from analysis and shown to the user. Note that a change here requires a change to the Recommendation schema.
 COLUMNS_TO_SHOW = ["id", "title", "image", "instructions", "readyInMinutes"]
 
 
 @router.get("/simple", status_code=status.HTTP_200_OK)
-def get_similar_recipies(
+async def get_similar_recipies(
     ingredients: str = Query(
         None,
         description="A comma-separated list of ingredients you want to use up. e.g. 'eggs,bacon,ham'",
     ),
+    db: Session = Depends(database.get_db),
+    current_user: Optional[UserOut] = Depends(oauth2.get_optional_user),
 ):
     """
     Query Spoonacular's API for data using the provided ingredient list and return the top 5 (or fewer) recipe recommendations.
     Note that searches for short ingredient lists are more likely to recommend recipes with ingredients you don't have handy. In
     such cases, looking among your supplies for substitutes (or excluding them where possible) will be your best bet if you can't
-    obtain them.
+    obtain them. Signed-in users get recipes they disliked removed and those most like the ones they liked first.
     """
-    df = prep_recipe_data(ingredients)
+    df = await prep_recipe_data_async(ingredients)
+    df = await _personalize(df, current_user, db)
     try:
         recommendations = _make_recommendations(df)
     except KeyError:
@@ -38,29 +61,26 @@ def get_similar_recipies(
 
 
 @router.get("/varied", status_code=status.HTTP_200_OK)
-def get_varied_recipes(
+async def get_varied_recipes(
     ingredients: str = Query(
         None,
         description="A comma-separated list of ingredients you want to use up. e.g. 'eggs,bacon,ham'",
     ),
+    db: Session = Depends(database.get_db),
+    current_user: Optional[UserOut] = Depends(oauth2.get_optional_user),
 ):
     """
     Query Spoonacular's API for data using the provided ingredient list and apply unsupervised learning to return more varied recipe
     recommendations. Note that searches for short ingredient lists are more likely to recommend recipes with ingredients you don't have
     handy. In such cases, looking among your supplies for substitutes (or excluding them where possible) will be your best bet if you
-    can't obtain them.
+    can't obtain them. For signed-in users, only the recipes ranked best for them from their votes are clustered.
     """
-    df = prep_recipe_data(ingredients, 100)
-
-    if df.shape[0] > 5:
-        df["minutes"] = df["readyInMinutes"]  # include total time in clustering.
-        clustering, principal_component_coordinates = apply_clustering(
-            df.drop(columns=COLUMNS_TO_SHOW)
-        )
-        indices = _get_recommendation_indices_from_clusters(
-            clustering, principal_component_coordinates
-        )
-        df = df.iloc[indices]
+    # Fewer recipes are requested while the RapidAPI quota is running low.
+    df = await prep_recipe_data_async(ingredients, quota.recipe_quantity(100))
+    df = await _personalize(
+        df, current_user, db, keep=settings.personalization_varied_candidates
+    )
+    df = await run_in_executor(_select_varied_recipes, df)
 
     try:
         recommendations = _make_recommendations(df)
@@ -73,22 +93,92 @@ def get_varied_recipes(
     return recommendations
 
 
+async def _personalize(
+    df: pd.DataFrame,
+    user: Optional[UserOut],
+    db: Session,
+    keep: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Internal function used by the recommendation routes to rank recipes for a signed-in user from their votes. Anonymous
+    requests and users without votes get `df` unchanged.
+    """
+    if user is None or df.empty or not settings.personalization_enabled:
+        return df
+
+    votes_query = db.query(models.Vote).filter(models.Vote.user_id == user.id)
+    votes = await run_in_threadpool(votes_query.all)
+    if not votes:
+        return df
+
+    return await run_in_executor(_rank_for_user, df, votes, keep)
+
+
+@span("personalize")
+def _rank_for_user(
+    df: pd.DataFrame, votes: list[models.Vote], keep: Optional[int]
+) -> pd.DataFrame:
+    """
+    Internal function used by `_personalize` that indexes the retrieved recipes, and any voted recipes the index is missing
+    that the local catalog has, before ranking. CPU-bound, so it runs on the processing executor.
+    """
+    personalizer.add(df["id"].tolist(), select_features(df, COLUMNS_TO_SHOW))
+    voted_ids = personalizer.missing([vote.recipe_id for vote in votes])
+    recipes = [recipe for recipe in map(catalog.get, voted_ids) if recipe is not None]
+    if recipes:
+        # Ingredient counts only matter to a search, so voted recipes get none.
+        results = [
+            {**recipe, "usedIngredientCount": 0, "missedIngredientCount": 0}
+            for recipe in recipes
+        ]
+        data = ComplexRetrievalStrategy().retrieve_data({"results": results})
+        voted_df = tabulate_recipe_data(data)
+        personalizer.add(
+            voted_df["id"].tolist(), select_features(voted_df, COLUMNS_TO_SHOW)
+        )
+
+    return personalizer.rank(df, votes, keep)
+
+
+@span("select_varied_recipes")
+def _select_varied_recipes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Internal function used by `get_varied_recipes` that clusters more than 5 recipes and keeps the recipe closest to each
+    cluster centroid. CPU-bound, so the route runs it on the processing executor.
+    """
+    if df.shape[0] > 5:
+        clustering, principal_component_coordinates = apply_clustering(
+            select_features(df, COLUMNS_TO_SHOW)
+        )
+        indices = _get_recommendation_indices_from_clusters(
+            clustering, principal_component_coordinates
+        )
+        df = df.iloc[indices]
+
+    return df
+
+
 def _get_recommendation_indices_from_clusters(
-    clustering: KMeans, data: pd.DataFrame
+    clustering: Union[KMeans, Clustering], data: np.ndarray
 ) -> np.ndarray:
     """
     Retrieves the 5 recipes from the cluster analysis that are closest to the centroids of each cluster in the fitted pipeline.
     `clustering` = The fitted pipeline.
     `data` = The transformed data (scaled principal components).
     """
-    closest, _ = pairwise_distances_argmin_min(clustering.cluster_centers_, data)
+    # Centers shared across requests can have the same closest recipe, so each gets a distinct one.
+    distinct = isinstance(clustering, Clustering) and clustering.global_centers
+    closest = closest_to_centers(clustering.cluster_centers_, data, distinct)
     return closest
 
 
+@span("make_recommendations")
 def _make_recommendations(df: pd.DataFrame) -> dict[Recommendation]:
     """
     Internal function used by `get_recipes` that takes in a DataFrame filtered down to <= 5 recipes and returns the recommendations in a dictionary.
+    The recommended ids are remembered so that votes on them skip validation.
     """
+    known_recipe_ids.add(df["id"].tolist())
     recommendations = {
         row.id: Recommendation(
             name=row.title,
@@ -1,7 +1,6 @@
 from fastapi import status, Depends, APIRouter, HTTPException
-from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from app.spoonderful.auth import utils
+from app.spoonderful.auth.hashing import password_hasher
 from app.spoonderful.data import database, models, schemas
 
 
@@ -11,7 +10,10 @@ router = APIRouter(tags=["Sign Up"])
 @router.post(
     "/register", status_code=status.HTTP_201_CREATED, response_model=schemas.UserOut
 )
-def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+async def create_user(
+    user: schemas.UserCreate,
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+):
     """
     Register to gain access to voting on valid recipes. Note email validation here requires x@y.z format where traditionally:
     x = account
@@ -22,14 +24,14 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     for unique usernames that gave me a chance to play with an email string validation strategy.
     """
 
-    hashed_password = utils.hash_password(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     user.password = hashed_password
 
     try:
         new_user = models.User(**user.dict())
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
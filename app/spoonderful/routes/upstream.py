@@ -0,0 +1,23 @@
+from fastapi import APIRouter, status
+from app.spoonacular.ratelimit import quota
+from app.spoonacular.resilience import upstream
+
+router = APIRouter(prefix="/upstream", tags=["Upstream"])
+
+
+@router.get("/quota", status_code=status.HTTP_200_OK)
+def get_quota():
+    """
+    Returns the remaining RapidAPI quota for each bucket (`requests`, `tinyrequests` and `classifications`) as last
+    reported by Spoonacular, and whether it is low enough for recommendations to be downgraded.
+    """
+    return quota.snapshot()
+
+
+@router.get("/breakers", status_code=status.HTTP_200_OK)
+def get_circuit_breakers():
+    """
+    Returns the circuit breaker state for each upstream host. While a breaker is `open`, requests to that host fail
+    fast with a 503.
+    """
+    return upstream.breakers()
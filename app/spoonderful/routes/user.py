@@ -1,5 +1,5 @@
 from fastapi import Depends, APIRouter
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from app.spoonderful.data import database, models, schemas
 from app.spoonderful.auth import oauth2
 
@@ -7,31 +7,30 @@ router = APIRouter(prefix="/user", tags=["Users"])
 
 
 @router.get("/", response_model=schemas.UserOut)
-def get_user_info(
-    db: Session = Depends(database.get_db),
-    current_user: int = Depends(oauth2.get_current_user),
+async def get_user_info(
+    current_user: schemas.UserOut = Depends(oauth2.get_current_user_async),
 ):
     """
-    Returns the account information of the signed in user.
+    Returns the account information of the signed in user, as already loaded by authentication.
     """
-    user_info = db.query(models.User).filter(models.User.id == current_user.id).first()
-
-    return user_info
+    return current_user
 
 
 @router.get("/votes")
-def get_user_votes(
-    db: Session = Depends(database.get_db),
-    current_user: int = Depends(oauth2.get_current_user),
+async def get_user_votes(
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+    current_user: int = Depends(oauth2.get_current_user_async),
 ):
     """
     Returns the votes (likes and dislikes encoded as 1 and 0, respectively) of the signed
     in user.
     """
     user_info = (
-        db.query(models.Vote.recipe_id, models.Vote.direction)
-        .filter(models.Vote.user_id == current_user.id)
-        .all()
-    )
+        await db.execute(
+            select(models.Vote.recipe_id, models.Vote.direction).where(
+                models.Vote.user_id == current_user.id
+            )
+        )
+    ).all()
 
     return user_info
@@ -1,35 +1,36 @@
+import asyncio
+from typing import Optional
 from fastapi import status, Depends, APIRouter, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from app.spoonderful.data import schemas, database, models
 from app.spoonderful.auth import oauth2
-from app.spoonacular.response import SpoonacularResponse
+from app.spoonacular.response import AsyncSpoonacularResponse
+from app.spoonacular.known_ids import known_recipe_ids
 
 
 router = APIRouter(prefix="/vote", tags=["Vote"])
 
 
 @router.post("/new", status_code=status.HTTP_201_CREATED)
-def new_vote_on_recipe(
+async def new_vote_on_recipe(
     vote: schemas.Vote,
-    db: Session = Depends(database.get_db),
-    current_user: int = Depends(oauth2.get_current_user),
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+    current_user: int = Depends(oauth2.get_current_user_async),
 ):
     """
     Voting logic that covers adding a valid vote.
     `recipe_id` should be a valid Spoonacular recipe id and `direction` should be 0 for dislike or 1 for like.
     Confirms recipe validity using `_check_recipe_id`.
     """
-    vote_query = db.query(models.Vote).filter(
-        models.Vote.recipe_id == vote.recipe_id, models.Vote.user_id == current_user.id
-    )
-
-    found_vote = vote_query.first()
-    if not found_vote:
-        if _check_recipe_id(vote.recipe_id):
+    found_direction = await _find_vote_direction(db, vote.recipe_id, current_user.id)
+    if found_direction is None:
+        if await _check_recipe_id(vote.recipe_id):
             # Add the vote if it does not exist for a valid recipe.
             new_vote = _make_vote(vote, current_user.id)
             db.add(new_vote)
-            db.commit()
+            await _count_votes(db, [(vote.recipe_id, vote.direction, 1)])
+            await db.commit()
 
             return {"message": "Successfully added vote."}
 
@@ -45,10 +46,10 @@ def new_vote_on_recipe(
 
 
 @router.delete("/remove", status_code=status.HTTP_200_OK)
-def remove_vote_on_recipe(
+async def remove_vote_on_recipe(
     vote: schemas.Vote,
-    db: Session = Depends(database.get_db),
-    current_user: int = Depends(oauth2.get_current_user),
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+    current_user: int = Depends(oauth2.get_current_user_async),
 ):
     """
     Voting logic that covers removing votes.
@@ -56,16 +57,24 @@ def remove_vote_on_recipe(
     For the vote to be removed successfully, the `direction` of the `vote` argument should match what is stored
     in the database.
     """
-    vote_query = db.query(models.Vote).filter(
-        models.Vote.recipe_id == vote.recipe_id, models.Vote.user_id == current_user.id
-    )
-
-    found_vote = vote_query.first()
-    if found_vote:
-        if found_vote.direction == vote.direction:
+    found_direction = await _find_vote_direction(db, vote.recipe_id, current_user.id)
+    if found_direction is not None:
+        if found_direction == vote.direction:
             # Remove vote when same activity is repeated (e.g. clicking like on a liked recipe should remove the like).
-            vote_query.delete(synchronize_session=False)
-            db.commit()
+            removed = await db.execute(
+                delete(models.Vote)
+                .where(
+                    models.Vote.recipe_id == vote.recipe_id,
+                    models.Vote.user_id == current_user.id,
+                    models.Vote.direction == found_direction,
+                )
+                .returning(models.Vote.recipe_id)
+            )
+            # A concurrent request may have removed or changed the vote since it was read.
+            if removed.first() is None:
+                raise _concurrent_vote_conflict(vote.recipe_id)
+            await _count_votes(db, [(vote.recipe_id, vote.direction, -1)])
+            await db.commit()
 
             return {"message": "Successfully removed vote."}
 
@@ -81,10 +90,10 @@ def remove_vote_on_recipe(
 
 
 @router.put("/change", status_code=status.HTTP_200_OK)
-def change_vote_on_recipe(
+async def change_vote_on_recipe(
     vote: schemas.Vote,
-    db: Session = Depends(database.get_db),
-    current_user: int = Depends(oauth2.get_current_user),
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+    current_user: int = Depends(oauth2.get_current_user_async),
 ):
     """
     Voting logic that covers changing votes.
@@ -92,18 +101,31 @@ def change_vote_on_recipe(
     For the vote to be changed successfully, the `direction` of the `vote` argument should oppose what is stored
     in the database.
     """
-    vote_query = db.query(models.Vote).filter(
-        models.Vote.recipe_id == vote.recipe_id, models.Vote.user_id == current_user.id
-    )
-
-    found_vote = vote_query.first()
-    if found_vote:
-        if vote.direction != found_vote.direction:
+    found_direction = await _find_vote_direction(db, vote.recipe_id, current_user.id)
+    if found_direction is not None:
+        if vote.direction != found_direction:
             # Switch the vote when the opposite behaviour is selected (e.g. clicking dislike on a liked recipe).
-            new_vote = _make_vote(vote, current_user.id)
-            vote_query.delete(synchronize_session=False)
-            db.add(new_vote)
-            db.commit()
+            changed = await db.execute(
+                update(models.Vote)
+                .where(
+                    models.Vote.recipe_id == vote.recipe_id,
+                    models.Vote.user_id == current_user.id,
+                    models.Vote.direction == found_direction,
+                )
+                .values(direction=vote.direction)
+                .returning(models.Vote.recipe_id)
+            )
+            # A concurrent request may have removed or changed the vote since it was read.
+            if changed.first() is None:
+                raise _concurrent_vote_conflict(vote.recipe_id)
+            await _count_votes(
+                db,
+                [
+                    (vote.recipe_id, vote.direction, 1),
+                    (vote.recipe_id, found_direction, -1),
+                ],
+            )
+            await db.commit()
 
             return {"message": "Successfully changed vote."}
 
@@ -119,6 +141,179 @@ def change_vote_on_recipe(
         )
 
 
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def batch_vote_on_recipes(
+    batch: schemas.VoteBatch,
+    db: database.AsyncDatabase = Depends(database.get_async_db),
+    current_user: int = Depends(oauth2.get_current_user_async),
+) -> dict[str, list[schemas.VoteResult]]:
+    """
+    Applies many votes at once, e.g. likes made offline. `op` is `set` to add a vote or change its direction, or
+    `remove` to remove a vote in the given `direction`. Votes being set are validated like `/vote/new`. All votes are
+    applied in one transaction with one upsert and one delete, and a result is returned for each, in order.
+    """
+    recipe_ids = [vote.recipe_id for vote in batch.votes]
+    if len(set(recipe_ids)) != len(recipe_ids):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Each recipe may only be voted on once per batch.",
+        )
+
+    to_set = [vote for vote in batch.votes if vote.op == schemas.VoteOperation.SET]
+    valid = await asyncio.gather(*(_check_recipe_id(vote.recipe_id) for vote in to_set))
+    to_set = [vote for vote, is_valid in zip(to_set, valid) if is_valid]
+    to_remove = [
+        vote for vote in batch.votes if vote.op == schemas.VoteOperation.REMOVE
+    ]
+
+    inserted, removed = await _apply_vote_batch(db, current_user.id, to_set, to_remove)
+    set_ids = {vote.recipe_id for vote in to_set}
+
+    def result(vote: schemas.VoteBatchItem) -> schemas.VoteResult:
+        if vote.op == schemas.VoteOperation.REMOVE:
+            outcome = "removed" if vote.recipe_id in removed else "not_found"
+        elif vote.recipe_id not in set_ids:
+            outcome = "invalid_recipe"
+        elif vote.recipe_id in inserted:
+            outcome = "added" if inserted[vote.recipe_id] else "changed"
+        else:
+            outcome = "unchanged"
+
+        return schemas.VoteResult(recipe_id=vote.recipe_id, op=vote.op, status=outcome)
+
+    return {"results": [result(vote) for vote in batch.votes]}
+
+
+async def _apply_vote_batch(
+    db: database.AsyncDatabase,
+    user_id: int,
+    to_set: list[schemas.VoteBatchItem],
+    to_remove: list[schemas.VoteBatchItem],
+) -> tuple[dict[int, bool], set[int]]:
+    """
+    Internal function used by `batch_vote_on_recipes` that upserts `to_set` and deletes `to_remove` in one
+    transaction, along with the recipes' vote counts. Returns whether each added or changed vote was inserted (rather
+    than updated), and the recipe ids whose vote was removed. Votes already in the requested direction are left alone
+    and not returned.
+    """
+    upserted, removed = {}, set()
+    if to_set:
+        statement = insert(models.Vote).values(
+            [
+                {
+                    "user_id": user_id,
+                    "recipe_id": vote.recipe_id,
+                    "direction": vote.direction,
+                }
+                for vote in to_set
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[models.Vote.user_id, models.Vote.recipe_id],
+            set_={"direction": statement.excluded.direction},
+            where=models.Vote.direction != statement.excluded.direction,
+        ).returning(
+            models.Vote.recipe_id,
+            # xmax is only 0 for freshly inserted rows.
+            literal_column("xmax = 0").label("inserted"),
+        )
+        upserted = dict((await db.execute(statement)).all())
+
+    if to_remove:
+        statement = (
+            delete(models.Vote)
+            .where(
+                models.Vote.user_id == user_id,
+                tuple_(models.Vote.recipe_id, models.Vote.direction).in_(
+                    [(vote.recipe_id, vote.direction) for vote in to_remove]
+                ),
+            )
+            .returning(models.Vote.recipe_id)
+        )
+        removed = set((await db.execute(statement)).scalars())
+
+    changes = []
+    for vote in to_set:
+        if vote.recipe_id in upserted:
+            changes.append((vote.recipe_id, vote.direction, 1))
+            if not upserted[vote.recipe_id]:  # Changed from the opposite direction.
+                changes.append((vote.recipe_id, _opposite(vote.direction), -1))
+    for vote in to_remove:
+        if vote.recipe_id in removed:
+            changes.append((vote.recipe_id, vote.direction, -1))
+    await _count_votes(db, changes)
+
+    await db.commit()
+
+    return upserted, removed
+
+
+async def _find_vote_direction(
+    db: database.AsyncDatabase, recipe_id: int, user_id: int
+) -> Optional[schemas.Direction]:
+    """
+    Internal function that returns the direction of the user's vote on a recipe, or None if they have not voted on it.
+    """
+    return await db.scalar(
+        select(models.Vote.direction).where(
+            models.Vote.recipe_id == recipe_id, models.Vote.user_id == user_id
+        )
+    )
+
+
+def _concurrent_vote_conflict(recipe_id: int) -> HTTPException:
+    """
+    Internal function returning the error for a vote that another request removed or changed after it was read, so
+    the counts are left alone.
+    """
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"User vote on recipe {recipe_id} changed during this request. Please try again.",
+    )
+
+
+async def _count_votes(
+    db: database.AsyncDatabase, changes: list[tuple[int, schemas.Direction, int]]
+) -> None:
+    """
+    Internal function that applies (recipe id, direction, +1 or -1) changes to `recipe_vote_counts` with one upsert,
+    in the caller's transaction.
+    """
+    deltas = {}
+    for recipe_id, direction, change in changes:
+        likes, dislikes = deltas.get(recipe_id, (0, 0))
+        if direction == schemas.Direction.LIKE:
+            likes += change
+        else:
+            dislikes += change
+        deltas[recipe_id] = (likes, dislikes)
+    if not deltas:
+        return
+
+    # Rows are locked in recipe id order so concurrent batches cannot deadlock on each other.
+    statement = insert(models.RecipeVoteCount).values(
+        [
+            {"recipe_id": recipe_id, "likes": likes, "dislikes": dislikes}
+            for recipe_id, (likes, dislikes) in sorted(deltas.items())
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[models.RecipeVoteCount.recipe_id],
+        set_={
+            "likes": models.RecipeVoteCount.likes + statement.excluded.likes,
+            "dislikes": models.RecipeVoteCount.dislikes + statement.excluded.dislikes,
+        },
+    )
+    await db.execute(statement)
+
+
+def _opposite(direction: schemas.Direction) -> schemas.Direction:
+    if direction == schemas.Direction.LIKE:
+        return schemas.Direction.DISLIKE
+
+    return schemas.Direction.LIKE
+
+
 def _make_vote(vote: schemas.Vote, current_user_id: int) -> models.Vote:
     """
     Internal function that creates a new entry for the votes table.
@@ -132,10 +327,12 @@ def _make_vote(vote: schemas.Vote, current_user_id: int) -> models.Vote:
     return new_vote
 
 
-def _check_recipe_id(recipe_id: models.Vote.recipe_id) -> bool:
+async def _check_recipe_id(recipe_id: models.Vote.recipe_id) -> bool:
     """
-    Validates the recipe id using Spoonacular's API.
+    Validates the recipe id, using Spoonacular's API only for ids that are not known already. Checks from concurrent
+    votes are batched into one request.
     """
-    spoon = SpoonacularResponse.get_recipe_from_id(recipe_id)
+    if recipe_id in known_recipe_ids:
+        return True
 
-    return spoon.response.status_code == 200
+    return await AsyncSpoonacularResponse.recipe_exists(recipe_id)
@@ -0,0 +1,273 @@
+"""
+Spoonacular payloads for the benchmarks and the stub server. Payloads recorded with `benchmarks.record_fixtures` are
+replayed when present in `benchmarks/recorded/`; otherwise deterministic synthetic payloads with the shape and roughly
+the size of real `complexSearch`, `information` and `tasteWidget` responses are generated.
+"""
+import json
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from app.spoonderful.processing.tabulation import NUTRIENTS
+
+FIXTURES_DIR = Path(__file__).parent / "recorded"
+COMPLEX_SEARCH_FILE = FIXTURES_DIR / "complexSearch.json"
+INFORMATION_FILE = FIXTURES_DIR / "information.json"
+TASTE_WIDGET_FILE = FIXTURES_DIR / "tasteWidget.json"
+
+# Synthetic recipe ids start here, clear of the ids used in examples and the docs.
+SYNTHETIC_ID_BASE = 900_000
+SYNTHETIC_RECIPES = 500
+
+INGREDIENTS = (
+    "egg",
+    "ham",
+    "bacon",
+    "rice",
+    "pasta",
+    "flour",
+    "butter",
+    "milk",
+    "cheddar",
+    "parmesan",
+    "chicken breast",
+    "ground beef",
+    "salmon",
+    "tofu",
+    "onion",
+    "garlic",
+    "tomato",
+    "potato",
+    "carrot",
+    "spinach",
+    "bell pepper",
+    "mushroom",
+    "zucchini",
+    "broccoli",
+    "lemon",
+    "lime",
+    "basil",
+    "cilantro",
+    "olive oil",
+    "soy sauce",
+    "honey",
+    "brown sugar",
+    "black beans",
+    "chickpeas",
+    "yogurt",
+    "avocado",
+    "corn",
+    "ginger",
+    "cumin",
+    "paprika",
+)
+TASTES = (
+    "sweetness",
+    "saltiness",
+    "sourness",
+    "bitterness",
+    "savoriness",
+    "fattiness",
+    "spiciness",
+)
+# Units of the nutrients in `NUTRIENTS`, in the same order.
+NUTRIENT_UNITS = ("kcal",) + ("g",) * 10 + ("mg",) * 4 + ("IU",) + ("mg",) * 23
+
+
+@lru_cache(maxsize=None)
+def recipes() -> list[dict]:
+    """
+    The complexSearch results the stub server searches: the recorded results if any, else synthetic recipes. Shared
+    between callers, so they should not be modified.
+    """
+    recorded = _load(COMPLEX_SEARCH_FILE)
+    if recorded is not None:
+        return recorded["results"]
+
+    return [synthetic_recipe(SYNTHETIC_ID_BASE + i) for i in range(SYNTHETIC_RECIPES)]
+
+
+def complex_search(number: int = 100, offset: int = 0) -> dict:
+    """
+    A complexSearch body of up to `number` recipes, starting at `offset` into `recipes()` and wrapping around.
+    """
+    pool = recipes()
+    number = min(number, len(pool))
+    results = [pool[(offset + i) % len(pool)] for i in range(number)]
+
+    return {
+        "results": results,
+        "offset": offset,
+        "number": number,
+        "totalResults": len(pool),
+    }
+
+
+def information(recipe_id: int) -> Optional[dict]:
+    """
+    The information body of a recipe, or None for a recipe that does not exist.
+    """
+    recorded = _load(INFORMATION_FILE)
+    if recorded is not None:
+        for recipe in recorded:
+            if recipe["id"] == recipe_id:
+                return recipe
+
+    recipe = _recipes_by_id().get(recipe_id)
+    if recipe is None:
+        return None
+
+    information = {
+        key: value
+        for key, value in recipe.items()
+        if key not in ("nutrition", "usedIngredientCount", "missedIngredientCount")
+    }
+    information["extendedIngredients"] = [
+        {
+            "id": ingredient["id"],
+            "name": ingredient["name"],
+            "amount": ingredient["amount"],
+            "unit": ingredient["unit"],
+            "original": f"{ingredient['amount']} {ingredient['unit']} {ingredient['name']}",
+            "aisle": "Produce",
+            "consistency": "SOLID",
+        }
+        for ingredient in recipe["nutrition"]["ingredients"]
+    ]
+    information["instructions"] = " ".join(
+        step["step"] for step in recipe["analyzedInstructions"][0]["steps"]
+    )
+
+    return information
+
+
+def taste_widget(recipe_id: int) -> dict:
+    """
+    The tasteWidget body of a recipe.
+    """
+    recorded = _load(TASTE_WIDGET_FILE)
+    if recorded is not None and str(recipe_id) in recorded:
+        return recorded[str(recipe_id)]
+
+    rng = random.Random(recipe_id)
+    return {taste: round(rng.uniform(0, 100), 2) for taste in TASTES}
+
+
+def synthetic_recipe(recipe_id: int) -> dict:
+    """
+    A complexSearch result with `addRecipeNutrition`, seeded by its id. Most recipes miss at most two ingredients,
+    so most survive `ComplexRetrievalStrategy`.
+    """
+    rng = random.Random(recipe_id)
+    names = rng.sample(INGREDIENTS, rng.randint(5, 12))
+    servings = rng.randint(1, 8)
+    ready_in_minutes = rng.choice((10, 15, 20, 25, 30, 45, 60, 90, 120))
+    steps = [
+        {
+            "number": number,
+            "step": f"{rng.choice(('Chop', 'Stir in', 'Add', 'Whisk', 'Saute'))} the {name} "
+            f"and cook for {rng.randint(1, 20)} minutes, stirring occasionally.",
+            "ingredients": [{"id": 10000 + INGREDIENTS.index(name), "name": name}],
+            "equipment": [],
+        }
+        for number, name in enumerate(names, 1)
+    ]
+    ingredients = [
+        {
+            "id": 10000 + INGREDIENTS.index(name),
+            "name": name,
+            "amount": round(rng.uniform(0.1, 4), 2),
+            "unit": rng.choice(("", "cup", "tbsp", "tsp", "g", "oz")),
+            "nutrients": [
+                {
+                    "name": nutrient,
+                    "amount": round(rng.uniform(0, 50), 2),
+                    "unit": unit,
+                    "percentOfDailyNeeds": round(rng.uniform(0, 30), 2),
+                }
+                for nutrient, unit in zip(NUTRIENTS[:12], NUTRIENT_UNITS)
+            ],
+        }
+        for name in names
+    ]
+    protein, fat = rng.uniform(5, 40), rng.uniform(10, 50)
+
+    return {
+        "vegetarian": rng.random() < 0.3,
+        "vegan": rng.random() < 0.1,
+        "glutenFree": rng.random() < 0.4,
+        "dairyFree": rng.random() < 0.4,
+        "veryHealthy": rng.random() < 0.1,
+        "cheap": False,
+        "veryPopular": rng.random() < 0.1,
+        "sustainable": False,
+        "lowFodmap": False,
+        "weightWatcherSmartPoints": rng.randint(1, 30),
+        "gaps": "no",
+        "preparationMinutes": -1,
+        "cookingMinutes": -1,
+        "aggregateLikes": rng.randint(0, 5000),
+        "healthScore": rng.randint(0, 100),
+        "creditsText": "Benchmark Kitchen",
+        "sourceName": "Benchmark Kitchen",
+        "pricePerServing": round(rng.uniform(20, 800), 2),
+        "id": recipe_id,
+        "title": f"{names[0].title()} with {names[1]} and {names[2]}",
+        "readyInMinutes": ready_in_minutes,
+        "servings": servings,
+        "sourceUrl": f"https://example.com/recipes/{recipe_id}",
+        "image": f"https://spoonacular.com/recipeImages/{recipe_id}-312x231.jpg",
+        "imageType": "jpg",
+        "nutrition": {
+            "nutrients": [
+                {
+                    "name": nutrient,
+                    "amount": round(rng.uniform(0, 500), 2),
+                    "unit": unit,
+                    "percentOfDailyNeeds": round(rng.uniform(0, 120), 2),
+                }
+                for nutrient, unit in zip(NUTRIENTS, NUTRIENT_UNITS)
+                if rng.random() < 0.9
+            ],
+            "properties": [
+                {"name": "Glycemic Index", "amount": round(rng.uniform(0, 100), 2)},
+                {"name": "Glycemic Load", "amount": round(rng.uniform(0, 40), 2)},
+            ],
+            "flavonoids": [
+                {"name": name, "amount": 0, "unit": "mg"}
+                for name in ("Cyanidin", "Petunidin", "Delphinidin", "Malvidin")
+            ],
+            "ingredients": ingredients,
+            "caloricBreakdown": {
+                "percentProtein": round(protein, 2),
+                "percentFat": round(fat, 2),
+                "percentCarbs": round(100 - protein - fat, 2),
+            },
+            "weightPerServing": {"amount": rng.randint(100, 800), "unit": "g"},
+        },
+        "summary": f"{names[0].title()} with {names[1]} takes roughly <b>{ready_in_minutes} minutes</b> "
+        f"from beginning to end and serves {servings}. " * 4,
+        "cuisines": rng.sample(("American", "Italian", "Mexican", "Asian"), 1),
+        "dishTypes": rng.sample(("lunch", "main course", "dinner", "side dish"), 2),
+        "diets": [],
+        "occasions": [],
+        "analyzedInstructions": [{"name": "", "steps": steps}],
+        "spoonacularScore": round(rng.uniform(0, 100), 2),
+        "spoonacularSourceUrl": f"https://spoonacular.com/recipe-{recipe_id}",
+        "usedIngredientCount": rng.randint(1, 3),
+        "missedIngredientCount": rng.choice((0, 0, 0, 1, 1, 2, 3, 4)),
+    }
+
+
+@lru_cache(maxsize=None)
+def _recipes_by_id() -> dict[int, dict]:
+    return {recipe["id"]: recipe for recipe in recipes()}
+
+
+@lru_cache(maxsize=None)
+def _load(path: Path):
+    if not path.exists():
+        return None
+
+    with open(path, "r") as file:
+        return json.load(file)
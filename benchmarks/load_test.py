@@ -0,0 +1,226 @@
+"""
+End-to-end load test of the recommendation routes. Starts the stub Spoonacular server and the app under uvicorn
+pointed at it (or targets a running app with `--url`), drives `/recipes/varied` and `/recipes/simple` from concurrent
+clients with a fixed set of ingredient lists, and reports throughput and p50/p90/p99 latency per route. The app
+needs the same environment (`.env`, including the database) as when deployed. Run from the repository root:
+
+    python -m benchmarks.load_test --concurrency 32 --duration 30 --stub-latency-ms 150 --workers 2
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+import httpx
+from .fixtures import INGREDIENTS
+
+ROUTES = {"varied": "/recipes/varied", "simple": "/recipes/simple"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Load an app that is already running here.")
+    parser.add_argument("--app", default="app.spoonderful.main:app")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers.")
+    parser.add_argument(
+        "--route", choices=sorted(ROUTES), action="append", help="Default: both."
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds.")
+    parser.add_argument(
+        "--warmup", type=float, default=5.0, help="Seconds not measured."
+    )
+    parser.add_argument(
+        "--queries", type=int, default=50, help="Distinct ingredient lists."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-latency-ms", type=float, default=150.0)
+    parser.add_argument("--stub-jitter-ms", type=float, default=30.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    processes = []
+    stub_url = None
+    try:
+        url = args.url
+        if url is None:
+            stub_url = f"http://127.0.0.1:{_free_port()}/"
+            processes.append(_start_stub(stub_url, args))
+            url = f"http://127.0.0.1:{_free_port()}"
+            processes.append(_start_app(url, stub_url, args))
+        _wait_until_ready(url, processes)
+
+        rng = random.Random(args.seed)
+        queries = [
+            ",".join(rng.sample(INGREDIENTS, rng.randint(2, 4)))
+            for _ in range(args.queries)
+        ]
+        routes = [ROUTES[route] for route in args.route or sorted(ROUTES)]
+        samples, elapsed = asyncio.run(
+            _run_load(url, routes, queries, args, random.Random(args.seed))
+        )
+        _report(samples, elapsed)
+        if stub_url is not None:
+            stats = httpx.get(f"{stub_url}_stub/stats").json()
+            print(f"Upstream requests: {stats['requests']}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=30)
+
+
+async def _run_load(
+    url: str, routes: list[str], queries: list[str], args, rng: random.Random
+) -> tuple[list[tuple[str, object, float]], float]:
+    """
+    Runs `args.concurrency` clients that each send one request at a time until the duration is over. Returns the
+    (route, status or exception name, seconds) of the requests started after the warm-up, and the measured time.
+    """
+    samples = []
+    started = time.perf_counter()
+    measured_from = started + args.warmup
+    deadline = measured_from + args.duration
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+
+        async def run_client():
+            while (request_started := time.perf_counter()) < deadline:
+                route = rng.choice(routes)
+                try:
+                    response = await client.get(
+                        route, params={"ingredients": rng.choice(queries)}
+                    )
+                    status = response.status_code
+                except httpx.HTTPError as error:
+                    status = type(error).__name__
+                if request_started >= measured_from:
+                    samples.append(
+                        (route, status, time.perf_counter() - request_started)
+                    )
+
+        await asyncio.gather(*(run_client() for _ in range(args.concurrency)))
+
+    return samples, time.perf_counter() - measured_from
+
+
+def _report(samples: list[tuple[str, object, float]], elapsed: float) -> None:
+    """
+    Prints the throughput, errors and latency percentiles of each route and of all requests.
+    """
+    by_route = defaultdict(list)
+    for sample in samples:
+        by_route[sample[0]].append(sample)
+    by_route["all"] = samples
+
+    print(
+        f"{'Route':<16}{'requests':>10}{'req/s':>10}{'errors':>8}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for route, route_samples in by_route.items():
+        latencies = sorted(seconds for _, _, seconds in route_samples)
+        errors = sum(status != 200 for _, status, _ in route_samples)
+        percentiles = "".join(
+            f"{_percentile(latencies, p) * 1000:>10.1f}" for p in (50, 90, 99, 100)
+        )
+        print(
+            f"{route:<16}{len(route_samples):>10}{len(route_samples) / elapsed:>10.1f}"
+            f"{errors:>8}{percentiles}"
+        )
+
+    statuses = defaultdict(int)
+    for _, status, _ in samples:
+        statuses[status] += 1
+    print(f"Responses: {dict(statuses)}")
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """
+    The nearest-rank percentile of sorted `values`, or NaN without any.
+    """
+    if not values:
+        return math.nan
+
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def _start_stub(stub_url: str, args) -> subprocess.Popen:
+    port = stub_url.rstrip("/").rsplit(":", 1)[1]
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.stub_server",
+        "--port",
+        port,
+        "--latency-ms",
+        str(args.stub_latency_ms),
+        "--jitter-ms",
+        str(args.stub_jitter_ms),
+        "--error-rate",
+        str(args.stub_error_rate),
+        "--seed",
+        str(args.seed),
+    ]
+
+    return subprocess.Popen(command)
+
+
+def _start_app(url: str, stub_url: str, args) -> subprocess.Popen:
+    port = url.rsplit(":", 1)[1]
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        args.app,
+        "--host",
+        "127.0.0.1",
+        "--port",
+        port,
+        "--workers",
+        str(args.workers),
+        "--no-access-log",
+        "--log-level",
+        "warning",
+    ]
+    environment = {
+        **os.environ,
+        "SPOONACULAR_ENTRY_POINT": stub_url,
+        "SPOONACULAR_API_ENTRY_POINT": stub_url,
+    }
+
+    return subprocess.Popen(command, env=environment)
+
+
+def _wait_until_ready(
+    url: str, processes: list[subprocess.Popen], timeout: float = 60.0
+) -> None:
+    """
+    Waits until the app answers `GET /`, exiting if it or the stub server stops first.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if any(process.poll() is not None for process in processes):
+            sys.exit("The app or the stub server exited during startup.")
+        try:
+            if httpx.get(f"{url}/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    sys.exit(f"The app at {url} was not ready after {timeout:.0f} seconds.")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    main()
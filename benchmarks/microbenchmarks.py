@@ -0,0 +1,219 @@
+"""
+Microbenchmarks of the recommendation pipeline on fixture payloads: retrieval, the tabulators, `prep_recipe_data`
+(offline and through the stub server), `apply_clustering` with each engine and the route helpers. Reports per-call
+timings like pytest-benchmark, and can save results and compare against saved ones. Needs the same environment
+(`.env`) as the app, but no database. Run from the repository root:
+
+    python -m benchmarks.microbenchmarks --json before.json
+    python -m benchmarks.microbenchmarks --compare before.json --filter tabulat
+"""
+import argparse
+import io
+import json
+import math
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable
+from app.spoonacular.response import SpoonacularResponse
+from app.spoonacular.retrieval import ComplexRetrievalStrategy
+from app.spoonderful.config import settings
+from app.spoonderful.processing import tabulation as tab
+from app.spoonderful.processing.feature_space import feature_space
+from app.spoonderful.processing.pipeline import apply_clustering, select_features
+from app.spoonderful.processing.preprocess import (
+    prep_recipe_data,
+    tabulate_recipe_data,
+)
+from app.spoonderful.routes.recommendation import (
+    COLUMNS_TO_SHOW,
+    _make_recommendations,
+    _select_varied_recipes,
+)
+from . import fixtures
+from .stub_server import start_stub_server
+
+CLUSTERING_ENGINES = ("numpy", "sklearn", "online")
+
+
+@dataclass
+class Result:
+    """
+    Seconds per call of each round of a benchmark.
+    """
+
+    name: str
+    iterations: int
+    timings: list[float]
+
+    @property
+    def stats(self) -> dict[str, float]:
+        return {
+            "min": min(self.timings),
+            "max": max(self.timings),
+            "mean": statistics.fmean(self.timings),
+            "stddev": statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0,
+            "median": statistics.median(self.timings),
+        }
+
+
+def measure(
+    name: str, function: Callable[[], object], rounds: int, min_time: float
+) -> Result:
+    """
+    Times `rounds` rounds of `function` after a warm-up call. Fast functions are called several times per round so
+    that a round takes at least `min_time` seconds, as pytest-benchmark calibrates them.
+    """
+    started = time.perf_counter()
+    function()
+    single = time.perf_counter() - started
+    iterations = max(1, math.ceil(min_time / single)) if single > 0 else 1000
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        timings.append((time.perf_counter() - started) / iterations)
+
+    return Result(name, iterations, timings)
+
+
+def benchmarks(recipe_quantity: int, stub_url: str) -> dict[str, Callable]:
+    """
+    The benchmarked calls by name, on a complexSearch payload of `recipe_quantity` fixture recipes.
+    """
+    payload = fixtures.complex_search(recipe_quantity)
+    body = json.dumps(payload).encode()
+    strategy = ComplexRetrievalStrategy()
+    data = strategy.retrieve_data(payload)
+    df = tabulate_recipe_data(data)
+    features = select_features(df, COLUMNS_TO_SHOW)
+    top_five = df.head(5)
+    nutrition = [recipe["nutrition"] for recipe in data]
+    instructions = [recipe["analyzedInstructions"] for recipe in data]
+
+    def fetch_from_stub(query: str, number: int) -> SpoonacularResponse:
+        # Bypasses the cache and catalog that `get_recipes` would answer repeats from.
+        request = SpoonacularResponse._complex_search_request(query, number)
+        request["url"] = request["url"].replace(
+            SpoonacularResponse.ENTRY_POINT, stub_url
+        )
+
+        return SpoonacularResponse._make_request_and_check_response(**request)
+
+    def clustering(engine: str) -> Callable:
+        def cluster():
+            settings.clustering_engine = engine
+            return apply_clustering(features)
+
+        return cluster
+
+    return {
+        "ComplexRetrievalStrategy.retrieve_data": lambda: strategy.retrieve_data(
+            payload
+        ),
+        "ComplexRetrievalStrategy.parse_stream": lambda: strategy.parse_stream(
+            io.BytesIO(body)
+        ),
+        "CaloricBreakdownTabulator": lambda: tab.CaloricBreakdownTabulator().tabulate_data(
+            nutrition
+        ),
+        "NutrientDailyNeedsTabulator": lambda: tab.NutrientDailyNeedsTabulator().tabulate_data(
+            nutrition
+        ),
+        "InstructionsTabulator": lambda: tab.InstructionsTabulator().tabulate_data(
+            instructions
+        ),
+        "RecipeBatchTabulator": lambda: tab.RecipeBatchTabulator().tabulate_data(data),
+        "tabulate_recipe_data": lambda: tabulate_recipe_data(data),
+        "prep_recipe_data[offline]": lambda: prep_recipe_data(
+            "eggs,ham",
+            recipe_quantity,
+            response=lambda query, number: SpoonacularResponse(data=payload),
+        ),
+        "prep_recipe_data[stub]": lambda: prep_recipe_data(
+            "eggs,ham", recipe_quantity, response=fetch_from_stub
+        ),
+        **{
+            f"apply_clustering[{engine}]": clustering(engine)
+            for engine in CLUSTERING_ENGINES
+        },
+        "_select_varied_recipes": lambda: _select_varied_recipes(df),
+        "_make_recommendations": lambda: _make_recommendations(top_five),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--recipes", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--min-time", type=float, default=0.01, help="Shortest round in seconds."
+    )
+    parser.add_argument(
+        "--filter", default="", help="Only run benchmarks whose name contains this."
+    )
+    parser.add_argument("--json", help="Save the results to this file.")
+    parser.add_argument(
+        "--compare", help="Compare medians with results saved by --json."
+    )
+    args = parser.parse_args()
+
+    if settings.feature_space_enabled:
+        feature_space.reload()
+    clustering_engine = settings.clustering_engine
+    stub = start_stub_server()
+    try:
+        selected = {
+            name: function
+            for name, function in benchmarks(args.recipes, stub.url).items()
+            if args.filter.lower() in name.lower()
+        }
+        results = [
+            measure(name, function, args.rounds, args.min_time)
+            for name, function in selected.items()
+        ]
+    finally:
+        settings.clustering_engine = clustering_engine
+        stub.shutdown()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = {result["name"]: result for result in json.load(file)}
+    _print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump([{**asdict(result), **result.stats} for result in results], file)
+        print(f"Saved to {args.json}.")
+
+    sys.exit(0 if results else 1)
+
+
+def _print_table(results: list[Result], baseline: dict[str, dict]) -> None:
+    """
+    Prints the timings of each benchmark in milliseconds, with the change of the median against `baseline`.
+    """
+    width = max((len(result.name) for result in results), default=4)
+    columns = ("min", "median", "mean", "stddev", "max")
+    header = f"{'Name':<{width}}" + "".join(f"{column:>10}" for column in columns)
+    print(f"{header}{'ops/s':>12}{'calls':>8}" + ("   vs baseline" if baseline else ""))
+    for result in results:
+        stats = result.stats
+        line = f"{result.name:<{width}}" + "".join(
+            f"{stats[column] * 1000:>10.3f}" for column in columns
+        )
+        line += (
+            f"{1 / stats['mean']:>12.1f}{result.iterations * len(result.timings):>8}"
+        )
+        previous = baseline.get(result.name)
+        if previous is not None:
+            line += f"   {(stats['median'] / previous['median'] - 1) * 100:+7.1f}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Records real Spoonacular payloads into `benchmarks/recorded/` for the stub server and microbenchmarks to replay in
+place of synthetic ones. Spends RapidAPI quota: one complexSearch per `--query`, one informationBulk and, when the
+`spoon_key` environment variable is set, one tasteWidget call per recipe in `--taste`. Run from the repository root:
+
+    python -m benchmarks.record_fixtures --query eggs,ham,cheese --query rice,chicken,garlic
+"""
+import argparse
+import json
+import requests as rq
+from app.spoonacular.client import REQUEST_TIMEOUT
+from app.spoonacular.response import SpoonacularResponse
+from .fixtures import (
+    FIXTURES_DIR,
+    COMPLEX_SEARCH_FILE,
+    INFORMATION_FILE,
+    TASTE_WIDGET_FILE,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--query",
+        action="append",
+        required=True,
+        help="Comma-separated ingredients to search for. May be repeated.",
+    )
+    parser.add_argument("--number", type=int, default=100)
+    parser.add_argument(
+        "--information", type=int, default=50, help="Recipes to record information of."
+    )
+    parser.add_argument(
+        "--taste", type=int, default=0, help="Recipes to record the taste widget of."
+    )
+    args = parser.parse_args()
+
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    results = {}
+    for query in args.query:
+        body = _get(**SpoonacularResponse._complex_search_request(query, args.number))
+        for recipe in body["results"]:
+            results.setdefault(recipe["id"], recipe)
+        print(f"complexSearch {query!r}: {len(body['results'])} recipes.")
+    recipe_ids = list(results)
+    _write(COMPLEX_SEARCH_FILE, {"results": list(results.values())})
+
+    information = _get(
+        **SpoonacularResponse._information_bulk_request(recipe_ids[: args.information])
+    )
+    _write(INFORMATION_FILE, information)
+
+    tastes = {
+        str(recipe_id): _get(**SpoonacularResponse._taste_request(recipe_id))
+        for recipe_id in recipe_ids[: args.taste]
+    }
+    if tastes:
+        _write(TASTE_WIDGET_FILE, tastes)
+
+
+def _get(url: str, parameters: dict, headers: dict = None, parser=None) -> object:
+    """
+    Sends one request built by a `SpoonacularResponse._*_request` classmethod and returns the parsed JSON body.
+    """
+    response = rq.get(url, params=parameters, headers=headers, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+
+    return response.json()
+
+
+def _write(path, payload) -> None:
+    with open(path, "w") as file:
+        json.dump(payload, file)
+    print(f"Wrote {path}.")
+
+
+if __name__ == "__main__":
+    main()
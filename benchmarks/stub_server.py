@@ -0,0 +1,235 @@
+"""
+A local stand-in for Spoonacular that replays the payloads of `benchmarks.fixtures` on the endpoints the app calls:
+`recipes/complexSearch`, `recipes/informationBulk`, `recipes/{id}/information` and `recipes/{id}/tasteWidget.json`.
+Responses can be delayed and a fraction of them replaced with errors, and RapidAPI rate limit headers count down a
+quota. Point the app at it through its entry point settings. Run from the repository root:
+
+    python -m benchmarks.stub_server --port 8765 --latency-ms 150 --jitter-ms 50 --error-rate 0.01
+    SPOONACULAR_ENTRY_POINT=http://127.0.0.1:8765/ SPOONACULAR_API_ENTRY_POINT=http://127.0.0.1:8765/ uvicorn ...
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+from . import fixtures
+
+# complexSearch returns at most 100 recipes per request.
+MAX_NUMBER = 100
+
+
+class StubSpoonacular(ThreadingHTTPServer):
+    """
+    Serves the fixtures after `latency_ms` (normally distributed with `jitter_ms`). A fraction `error_rate` of
+    requests get one of `error_statuses` instead, and every request spends one of `quota` requests, after which
+    all requests get a 429 as RapidAPI does.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: tuple = (500, 429),
+        quota: int = 1_000_000,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(address, StubHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.quota = quota
+        self.remaining = quota
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def admit(self, endpoint: str) -> tuple[Optional[int], float, int]:
+        """
+        Counts a request and returns the error status to respond with (None to serve it), its delay in seconds and
+        the quota remaining after it.
+        """
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.remaining = max(self.remaining - 1, -1)
+            delay = max(self._random.gauss(self.latency_ms, self.jitter_ms), 0) / 1000
+            error = None
+            if self.remaining < 0:
+                error = 429
+            elif self._random.random() < self.error_rate:
+                error = self._random.choice(self.error_statuses)
+
+            return error, delay, max(self.remaining, 0)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {"requests": dict(self.requests), "remaining": self.remaining}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Routes GET requests to the fixtures. `GET /_stub/stats` returns the requests served per endpoint.
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like RapidAPI.
+    server: StubSpoonacular
+    ROUTES = (
+        (re.compile(r"/recipes/complexSearch$"), "complexSearch"),
+        (re.compile(r"/recipes/informationBulk$"), "informationBulk"),
+        (re.compile(r"/recipes/(\d+)/information$"), "information"),
+        (re.compile(r"/recipes/(\d+)/tasteWidget\.json$"), "tasteWidget"),
+    )
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/_stub/stats":
+            return self._respond(200, self.server.stats())
+
+        for pattern, endpoint in self.ROUTES:
+            match = pattern.search(url.path)
+            if match:
+                break
+        else:
+            return self._respond(404, {"message": f"No stub for {url.path}."})
+
+        error, delay, remaining = self.server.admit(endpoint)
+        time.sleep(delay)
+        headers = {
+            "X-Ratelimit-Requests-Limit": str(self.server.quota),
+            "X-Ratelimit-Requests-Remaining": str(remaining),
+        }
+        if error is not None:
+            if error == 429:
+                headers["Retry-After"] = "1"
+            return self._respond(error, {"message": "Injected error."}, headers)
+
+        parameters = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status, body = getattr(self, f"_{endpoint}")(parameters, *match.groups())
+        self._respond(status, body, headers)
+
+    @staticmethod
+    def _complexSearch(parameters: dict) -> tuple[int, bytes]:
+        number = min(int(parameters.get("number", 10)), MAX_NUMBER)
+        ingredients = ",".join(
+            sorted(
+                name.strip().lower()
+                for name in parameters.get("includeIngredients", "").split(",")
+            )
+        )
+
+        return 200, _complex_search_body(ingredients, number)
+
+    @staticmethod
+    def _informationBulk(parameters: dict) -> tuple[int, list]:
+        recipe_ids = [int(id_) for id_ in parameters.get("ids", "").split(",") if id_]
+        found = [fixtures.information(recipe_id) for recipe_id in recipe_ids]
+
+        return 200, [information for information in found if information is not None]
+
+    @staticmethod
+    def _information(parameters: dict, recipe_id: str) -> tuple[int, dict]:
+        information = fixtures.information(int(recipe_id))
+        if information is None:
+            return 404, {"status": "failure", "code": 404, "message": "Not found."}
+
+        return 200, information
+
+    @staticmethod
+    def _tasteWidget(parameters: dict, recipe_id: str) -> tuple[int, dict]:
+        return 200, fixtures.taste_widget(int(recipe_id))
+
+    def _respond(self, status: int, body, headers: dict = None) -> None:
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@lru_cache(maxsize=1024)
+def _complex_search_body(ingredients: str, number: int) -> bytes:
+    """
+    An encoded complexSearch body. Each ingredient list gets its own window of the recipes, so distinct searches
+    return different (overlapping) results.
+    """
+    pool_size = len(fixtures.recipes())
+    offset = zlib.crc32(ingredients.encode()) % pool_size
+
+    return json.dumps(fixtures.complex_search(number, offset)).encode()
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, **options):
+    """
+    Starts a `StubSpoonacular` on a background thread, on a free port by default. Stop it with `shutdown()`.
+    """
+    server = StubSpoonacular((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests failed."
+    )
+    parser.add_argument(
+        "--error-status",
+        type=int,
+        action="append",
+        help="Status codes of injected errors (default: 500 and 429).",
+    )
+    parser.add_argument("--quota", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = StubSpoonacular(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_status or (500, 429)),
+        quota=args.quota,
+        seed=args.seed,
+    )
+    print(
+        f"Stub Spoonacular serving {len(fixtures.recipes())} recipes at {server.url}",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served: {server.stats()}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
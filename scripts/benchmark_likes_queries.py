@@ -0,0 +1,153 @@
+"""
+Seeds a scratch schema of the configured PostgreSQL database with a large `likes` table and checks the plans of the
+vote queries: per-recipe aggregates should be index-only scans on the covering index, a user's votes are read
+through the primary key, and popularity should read `recipe_vote_counts` instead of aggregating `likes`. Exits with status 1 if a plan does not
+use the expected index. Run from the repository root:
+
+    python -m scripts.benchmark_likes_queries --rows 1000000
+"""
+import argparse
+import json
+import sys
+from sqlalchemy import create_engine, text
+from app.spoonderful.data import models
+from app.spoonderful.data.database import SQLALCHEMY_DATABASE
+
+SCHEMA = "likes_benchmark"
+
+# (name, SQL, index the plan should read with an index-only scan, or None to only report timings)
+QUERIES = [
+    (
+        "likes of one recipe, aggregated",
+        "SELECT count(*) FILTER (WHERE direction = 'LIKE'), count(*) FILTER (WHERE direction = 'DISLIKE') "
+        "FROM likes WHERE recipe_id = :recipe_id",
+        "ix_likes_recipe_id_direction",
+    ),
+    (
+        "users who liked a recipe",
+        "SELECT user_id FROM likes WHERE recipe_id = :recipe_id AND direction = 'LIKE'",
+        "ix_likes_recipe_id_direction",
+    ),
+    (
+        "votes of one user",
+        "SELECT recipe_id, direction FROM likes WHERE user_id = :user_id",
+        None,
+    ),
+    (
+        "likes of one recipe, from recipe_vote_counts",
+        "SELECT likes, dislikes FROM recipe_vote_counts WHERE recipe_id = :recipe_id",
+        None,
+    ),
+    (
+        "most liked recipes, aggregated",
+        "SELECT recipe_id, count(*) AS likes FROM likes WHERE direction = 'LIKE' "
+        "GROUP BY recipe_id ORDER BY likes DESC LIMIT 20",
+        None,
+    ),
+    (
+        "most liked recipes, from recipe_vote_counts",
+        "SELECT recipe_id, likes FROM recipe_vote_counts ORDER BY likes DESC LIMIT 20",
+        None,
+    ),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--recipes", type=int, default=200_000)
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the seeded schema afterwards."
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(SQLALCHEMY_DATABASE, isolation_level="AUTOCOMMIT")
+    with engine.connect() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        connection.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            _seed(connection, args.rows, args.users, args.recipes)
+            failures = _check_plans(connection)
+        finally:
+            if not args.keep:
+                connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+    sys.exit(1 if failures else 0)
+
+
+def _seed(connection, rows: int, users: int, recipes: int) -> None:
+    """
+    Creates the tables with the application's models and fills `likes` with about `rows` votes. Recipe popularity is
+    skewed so a few recipes get most votes, as in production.
+    """
+    models.Base.metadata.create_all(connection)
+    connection.execute(
+        text(
+            "INSERT INTO users (id, email, password) "
+            "SELECT i, 'user' || i || '@example.com', '' FROM generate_series(1, :users) i"
+        ),
+        {"users": users},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO likes (user_id, recipe_id, direction) "
+            "SELECT 1 + i % :users, 1 + floor(power(random(), 3) * :recipes)::int, "
+            "(CASE WHEN random() < 0.8 THEN 'LIKE' ELSE 'DISLIKE' END)::direction "
+            "FROM generate_series(1, :rows) i ON CONFLICT DO NOTHING"
+        ),
+        {"users": users, "recipes": recipes, "rows": rows},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO recipe_vote_counts (recipe_id, likes, dislikes) "
+            "SELECT recipe_id, count(*) FILTER (WHERE direction = 'LIKE'), "
+            "count(*) FILTER (WHERE direction = 'DISLIKE') FROM likes GROUP BY recipe_id"
+        )
+    )
+    # Index-only scans rely on the visibility map, which VACUUM sets.
+    connection.execute(text("VACUUM ANALYZE"))
+    seeded = connection.execute(text("SELECT count(*) FROM likes")).scalar()
+    print(f"Seeded {seeded} votes from {users} users on up to {recipes} recipes.")
+
+
+def _check_plans(connection) -> int:
+    """
+    Prints the plan and execution time of each query and returns how many did not use their expected index.
+    """
+    recipe_id = connection.execute(
+        text("SELECT recipe_id FROM recipe_vote_counts ORDER BY likes DESC LIMIT 1")
+    ).scalar()
+    parameters = {"recipe_id": recipe_id, "user_id": 1}
+    failures = 0
+    for name, query, expected_index in QUERIES:
+        result = connection.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), parameters
+        ).scalar()
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]
+        scans = list(_scans(plan["Plan"]))
+        ok = expected_index is None or ("Index Only Scan", expected_index) in scans
+        failures += not ok
+        summary = ", ".join(
+            f"{node} on {index}" if index else node for node, index in scans
+        )
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {name}: {plan['Execution Time']:.2f} ms ({summary})"
+        )
+
+    return failures
+
+
+def _scans(node: dict):
+    """
+    Yields the (node type, index name) of every scan in a JSON plan.
+    """
+    if "Scan" in node["Node Type"]:
+        yield node["Node Type"], node.get("Index Name")
+    for child in node.get("Plans", ()):
+        yield from _scans(child)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Import-time regression check for the API process. Imports `app.spoonderful.main` in fresh interpreters under
+`python -X importtime` and fails if the fastest import exceeds the budget, or if a module that should load lazily
+(pandas, scikit-learn, scipy) is imported at startup. Needs the same environment (`.env`) as the app, but no
+database. Run from the repository root:
+
+    python -m scripts.check_import_time --budget-ms 1000
+"""
+import argparse
+import subprocess
+import sys
+
+MODULE = "app.spoonderful.main"
+LAZY_MODULES = ("pandas", "sklearn", "scipy")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports shown.")
+    args = parser.parse_args()
+
+    timings = [_import_times() for _ in range(args.runs)]
+    total, modules = min(timings, key=lambda timing: timing[0])
+
+    print(f"Importing {MODULE} took {total / 1000:.0f} ms (best of {args.runs}).")
+    for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[
+        1 : args.top + 1
+    ]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    eager = sorted(
+        {
+            name
+            for name in modules
+            for lazy in LAZY_MODULES
+            if name == lazy or name.startswith(f"{lazy}.")
+        }
+    )
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should load lazily: {', '.join(eager)}")
+        failed = True
+    if total / 1000 > args.budget_ms:
+        print(f"FAIL: over the {args.budget_ms:.0f} ms budget.")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+def _import_times() -> tuple[float, dict[str, float]]:
+    """
+    Imports `MODULE` in a new interpreter and returns its cumulative import time and that of every module it
+    imported, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Could not import {MODULE}:\n{result.stderr}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = float(cumulative)
+
+    return modules[MODULE], modules
+
+
+if __name__ == "__main__":
+    main()
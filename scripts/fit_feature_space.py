@@ -0,0 +1,43 @@
+"""
+Fits the global feature space used by `/recipes/varied` over a sample of the local recipe catalog and publishes it to
+`settings.feature_space_path`. Running servers pick the new artifact up within
+`feature_space_reload_interval_seconds`. Run from the repository root:
+
+    python -m scripts.fit_feature_space --sample 20000
+"""
+import argparse
+import numpy as np
+from app.spoonacular.catalog import load_published_store
+from app.spoonacular.retrieval import ComplexRetrievalStrategy
+from app.spoonderful.config import settings
+from app.spoonderful.processing.feature_space import FeatureSpace
+from app.spoonderful.processing.pipeline import N_COMPONENTS, select_features
+from app.spoonderful.processing.preprocess import tabulate_recipe_data
+from app.spoonderful.routes.recommendation import COLUMNS_TO_SHOW
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--catalog", default=settings.catalog_path)
+    parser.add_argument("--output", default=settings.feature_space_path)
+    parser.add_argument("--sample", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=settings.clustering_seed)
+    args = parser.parse_args()
+
+    store = load_published_store(args.catalog)
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(len(store), min(args.sample, len(store)), replace=False)
+    # Ingredient counts depend on the search, so the sample has none and they do not shape the space.
+    recipes = [
+        {**store.recipe(row), "usedIngredientCount": 0, "missedIngredientCount": 0}
+        for row in rows
+    ]
+    data = ComplexRetrievalStrategy().retrieve_data({"results": recipes})
+    features = select_features(tabulate_recipe_data(data), COLUMNS_TO_SHOW)
+
+    FeatureSpace.fit(features, N_COMPONENTS).save(args.output)
+    print(f"Fitted {len(features.columns)} features over {len(features)} recipes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+
+# Settings without defaults, so the app modules import without a `.env`. Nothing here connects to the database.
+for name, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_PASSWORD": "password",
+    "DATABASE_NAME": "spoonderful",
+    "DATABASE_USERNAME": "spoonderful",
+    "SECRET_KEY": "secret",
+    "SIGNING_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_DURATION_MINUTES": "30",
+    "SPOONACULAR_KEY": "key",
+    "RDBMS": "postgresql",
+}.items():
+    os.environ.setdefault(name, value)
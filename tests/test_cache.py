@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import pytest
+from app.spoonacular import response
+from app.spoonacular.cache import MemoryCacheBackend, RedisCacheBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _redis_backend(server) -> RedisCacheBackend:
+    return RedisCacheBackend(
+        "redis://unused", max_bytes=1024, client=fakeredis.FakeRedis(server=server)
+    )
+
+
+def test_redis_backend_round_trip():
+    cache = _redis_backend(fakeredis.FakeServer())
+
+    assert cache.get("complexSearch:5:eggs") is None
+    cache.set("complexSearch:5:eggs", {"results": [{"id": 1}]}, ttl_seconds=60)
+    assert cache.get("complexSearch:5:eggs") == {"results": [{"id": 1}]}
+    cache.set("too-big", "x" * 2048, ttl_seconds=60)
+    assert cache.get("too-big") is None
+
+    cache.delete("complexSearch:5:eggs")
+    assert cache.get("complexSearch:5:eggs") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.errors) == (1, 3, 0)
+
+
+def test_redis_backend_fails_open_while_redis_is_down():
+    server = fakeredis.FakeServer()
+    cache = _redis_backend(server)
+    cache.set("information:1", {"id": 1}, ttl_seconds=60)
+
+    server.connected = False
+    assert cache.get("information:1") is None
+    cache.set("information:2", {"id": 2}, ttl_seconds=60)
+    cache.delete("information:1")
+    assert cache.stats().errors == 3
+
+    server.connected = True
+    assert cache.get("information:1") == {"id": 1}
+
+
+def test_async_client_reads_blocking_cache_off_the_event_loop(monkeypatch):
+    class RecordingCache(MemoryCacheBackend):
+        blocking = True
+        threads = []
+
+        def get(self, key):
+            self.threads.append(threading.current_thread())
+            return super().get(key)
+
+    cache = RecordingCache(max_entries=10, max_bytes=1024)
+    cache.set("information:7", {"id": 7}, ttl_seconds=60)
+    monkeypatch.setattr(response, "get_cache", lambda: cache)
+
+    cached = asyncio.run(response.AsyncSpoonacularResponse.get_recipe_from_id(7))
+
+    assert cached.data == {"id": 7}
+    assert cache.threads and threading.main_thread() not in cache.threads
@@ -0,0 +1,142 @@
+import os
+from app.spoonacular import response
+from app.spoonacular.catalog import CURRENT_VERSION_FILE, LOCK_FILE, RecipeCatalog
+from app.spoonderful.config import settings
+from app.spoonderful.processing.feature_space import FeatureSpace
+from benchmarks.fixtures import synthetic_recipe
+from scripts import fit_feature_space
+
+
+def _catalog(*recipe_ids: int) -> RecipeCatalog:
+    catalog = RecipeCatalog(max_recipes=100, segment_size=2)
+    catalog.ingest([synthetic_recipe(recipe_id) for recipe_id in recipe_ids])
+
+    return catalog
+
+
+def test_save_publishes_a_new_version_and_deletes_older_ones(tmp_path):
+    path = str(tmp_path / "catalog")
+    _catalog(1, 2, 3).save(path)
+    reader = RecipeCatalog(max_recipes=100, segment_size=2)
+    assert reader.load(path) == 3
+
+    _catalog(4, 5).save(path)
+
+    # The reader's mapped arrays outlive the deleted version.
+    assert reader.get(2)["id"] == 2
+    with open(os.path.join(path, CURRENT_VERSION_FILE), "r") as file:
+        version = file.read()
+    assert sorted(os.listdir(path)) == sorted(
+        [LOCK_FILE, CURRENT_VERSION_FILE, version]
+    )
+    loaded = RecipeCatalog(max_recipes=100, segment_size=2)
+    assert loaded.load(path) == 2
+    assert sorted(loaded.recipe_ids()) == [4, 5]
+
+
+def test_failed_save_keeps_the_published_version(tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog")
+    _catalog(1, 2).save(path)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    _catalog(3).save(path)
+    monkeypatch.undo()
+
+    loaded = RecipeCatalog(max_recipes=100, segment_size=2)
+    assert loaded.load(path) == 2
+    assert not [name for name in os.listdir(path) if name.endswith(".tmp")]
+
+
+def test_load_without_a_saved_catalog(tmp_path):
+    assert (
+        RecipeCatalog(max_recipes=100, segment_size=2).load(str(tmp_path / "none")) == 0
+    )
+
+
+def test_fit_feature_space_reads_a_saved_catalog(tmp_path, monkeypatch):
+    path, output = str(tmp_path / "catalog"), str(tmp_path / "space.npz")
+    _catalog(*range(1, 21)).save(path)
+    argv = ["fit_feature_space", "--catalog", path, "--output", output]
+    monkeypatch.setattr("sys.argv", argv + ["--sample", "10"])
+
+    fit_feature_space.main()
+
+    assert FeatureSpace.load(output).components.shape[0] == 2
+
+
+def _recipe(recipe_id: int, *names: str) -> dict:
+    recipe = synthetic_recipe(recipe_id)
+    template = recipe["nutrition"]["ingredients"][0]
+    recipe["nutrition"]["ingredients"] = [{**template, "name": name} for name in names]
+
+    return recipe
+
+
+def _search_catalog() -> RecipeCatalog:
+    catalog = RecipeCatalog(max_recipes=100, segment_size=2)
+    catalog.ingest(
+        [
+            _recipe(1, "eggs", "ham", "milk", "salt", "water"),
+            _recipe(2, "egg", "bacon"),
+            _recipe(3, "Egg", "Ham"),
+            _recipe(4, "tomato", "basil", "garlic"),
+        ]
+    )
+
+    return catalog
+
+
+def _found(catalog: RecipeCatalog, ingredients: str, max_missing: int) -> list:
+    return [
+        (recipe["id"], recipe["usedIngredientCount"], recipe["missedIngredientCount"])
+        for recipe in catalog.search(ingredients, 10, max_missing)
+    ]
+
+
+def test_search_ranks_by_fewest_missing_then_most_used_ingredients():
+    # Pantry items (salt, water) are not counted as missing, and "Eggs" matches "egg".
+    assert _found(_search_catalog(), "Eggs, ham", max_missing=2) == [
+        (3, 2, 0),
+        (1, 2, 1),
+        (2, 1, 1),
+    ]
+
+
+def test_search_drops_recipes_missing_more_than_max_missing():
+    assert _found(_search_catalog(), "eggs,ham", max_missing=0) == [(3, 2, 0)]
+    assert _found(_search_catalog(), "garlic", max_missing=1) == []
+
+
+def test_search_ignores_pantry_ingredients():
+    assert _found(_search_catalog(), "salt,water", max_missing=5) == []
+
+
+def test_search_results_survive_save_and_load(tmp_path):
+    path = str(tmp_path / "catalog")
+    _search_catalog().save(path)
+    loaded = RecipeCatalog(max_recipes=100, segment_size=2)
+    loaded.load(path)
+
+    assert _found(loaded, "eggs,ham", max_missing=2) == _found(
+        _search_catalog(), "eggs,ham", max_missing=2
+    )
+    assert loaded.get(4)["id"] == 4
+
+
+def test_searches_use_the_catalog_only_when_enabled(monkeypatch):
+    monkeypatch.setattr(response, "catalog", _search_catalog())
+    monkeypatch.setattr(settings, "catalog_min_results", 1)
+    search = response.SpoonacularResponse._search_locally
+    key = "complexSearch:uncached"
+
+    assert search(key, "eggs,ham", 5) is None
+
+    monkeypatch.setattr(settings, "catalog_search_enabled", True)
+    assert [recipe["id"] for recipe in search(key, "eggs,ham", 5).data["results"]] == [
+        3,
+        1,
+        2,
+    ]
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import pairwise_distances_argmin
+from app.spoonacular.retrieval import ComplexRetrievalStrategy
+from app.spoonderful.config import settings
+from app.spoonderful.processing import clustering, pipeline
+from app.spoonderful.processing.preprocess import tabulate_recipe_data
+from app.spoonderful.routes import recommendation
+from benchmarks import fixtures
+
+CENTERS = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+
+
+def _blobs(points_per_blob: int = 20) -> np.ndarray:
+    rng = np.random.default_rng(0)
+
+    return np.vstack(
+        [center + rng.normal(0, 0.5, (points_per_blob, 2)) for center in CENTERS]
+    )
+
+
+def _assert_centers_found(found: np.ndarray, atol: float) -> None:
+    distances = np.linalg.norm(CENTERS[:, np.newaxis] - found[np.newaxis], axis=2)
+    assert sorted(distances.argmin(axis=1).tolist()) == [0, 1, 2]
+    assert distances.min(axis=1).max() < atol
+
+
+def _features():
+    data = ComplexRetrievalStrategy().retrieve_data(fixtures.complex_search(40))
+
+    return pipeline.select_features(
+        tabulate_recipe_data(data), recommendation.COLUMNS_TO_SHOW
+    )
+
+
+def test_principal_components_match_sklearn():
+    X = clustering.standardize(np.random.default_rng(1).normal(size=(30, 6)))
+
+    expected = PCA(n_components=2, svd_solver="full").fit_transform(X)
+    np.testing.assert_allclose(
+        clustering.principal_components(X, 2), expected, atol=1e-8
+    )
+
+
+def test_kmeans_finds_separated_clusters():
+    X = _blobs()
+
+    fitted = clustering.kmeans(X, 3, np.random.default_rng(0))
+
+    _assert_centers_found(fitted.cluster_centers_, atol=0.5)
+    assert len(set(fitted.labels_[::20].tolist())) == 3
+    with pytest.raises(ValueError):
+        clustering.kmeans(X[:2], 3, np.random.default_rng(0))
+
+
+def test_closest_to_centers_matches_argmin_unless_distinct():
+    X = np.array([[0.0, 0.0], [5.0, 0.0], [9.0, 0.0]])
+    centers = np.array([[0.1, 0.0], [0.2, 0.0], [8.0, 0.0]])
+
+    assert clustering.closest_to_centers(centers, X).tolist() == [0, 0, 2]
+    assert pairwise_distances_argmin(centers, X).tolist() == [0, 0, 2]
+    assert clustering.closest_to_centers(centers, X, distinct=True).tolist() == [
+        0,
+        1,
+        2,
+    ]
+
+
+def test_online_kmeans_learns_centers_per_feature_space():
+    model = clustering.OnlineKMeans(3, seed=0, max_pending_rows=1000)
+    space, other_space = object(), object()
+    X = _blobs()
+
+    assert model.clustering(X, space) is None
+    assert model.observe(X, space) is True
+    assert model.observe(X, space) is False
+    model.update()
+
+    fitted = model.clustering(X, space)
+    assert fitted.global_centers
+    _assert_centers_found(fitted.cluster_centers_, atol=1)
+    assert model.clustering(X, other_space) is None
+
+
+@pytest.mark.parametrize(
+    "engine, expected_type",
+    [
+        ("numpy", clustering.Clustering),
+        ("sklearn", KMeans),
+        ("online", clustering.Clustering),
+    ],
+)
+def test_apply_clustering_dispatches_on_engine(monkeypatch, engine, expected_type):
+    monkeypatch.setattr(settings, "clustering_engine", engine)
+    # Without a feature space, "online" falls back to a per-request numpy fit.
+    monkeypatch.setattr(settings, "feature_space_enabled", False)
+
+    features = _features()
+    fitted, X = pipeline.apply_clustering(features)
+
+    assert isinstance(fitted, expected_type)
+    assert X.shape == (len(features), pipeline.N_COMPONENTS)
+    assert len(fitted.cluster_centers_) == pipeline.N_CLUSTERS
+    assert not getattr(fitted, "global_centers", False)
+
+
+def test_sklearn_engine_keeps_the_original_recipe_selection(monkeypatch):
+    monkeypatch.setattr(settings, "clustering_engine", "sklearn")
+    fitted, X = pipeline.apply_clustering(_features())
+
+    indices = recommendation._get_recommendation_indices_from_clusters(fitted, X)
+
+    assert (
+        indices.tolist()
+        == pairwise_distances_argmin(fitted.cluster_centers_, X).tolist()
+    )
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.spoonacular import response
+from app.spoonacular.coalesce import AsyncMicroBatcher, AsyncSingleFlight, SingleFlight
+from app.spoonacular.resilience import UpstreamError, UpstreamUnavailableError
+
+
+def _run_together(flight: SingleFlight, call, waiters: int) -> list:
+    """
+    Calls `flight.do` with one key from `waiters` threads started together. The leader holds the call briefly so
+    the others join it. Returns each thread's result or exception.
+    """
+    barrier = threading.Barrier(waiters)
+
+    def held_call():
+        time.sleep(0.1)
+        return call()
+
+    def do():
+        barrier.wait(5)
+        try:
+            return flight.do("key", held_call)
+        except Exception as error:
+            return error
+
+    with ThreadPoolExecutor(waiters) as executor:
+        futures = [executor.submit(do) for _ in range(waiters)]
+
+        return [future.result() for future in futures]
+
+
+def test_single_flight_shares_one_call_between_threads():
+    calls = []
+
+    def call():
+        calls.append(1)
+        return "result"
+
+    assert _run_together(SingleFlight(), call, waiters=4) == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_single_flight_raises_the_error_in_every_thread():
+    def call():
+        raise UpstreamError("down")
+
+    errors = _run_together(SingleFlight(), call, waiters=3)
+
+    assert [type(error) for error in errors] == [UpstreamError] * 3
+
+
+def test_async_single_flight_shares_one_call():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", call) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["result"] * 5
+    assert len(calls) == 1
+
+
+def test_async_single_flight_raises_the_error_for_every_caller():
+    flight = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise UpstreamError("down")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("key", call) for _ in range(3)), return_exceptions=True
+        )
+
+    assert [type(error) for error in asyncio.run(scenario())] == [UpstreamError] * 3
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        cancelled = asyncio.create_task(flight.do("key", call))
+        waiting = asyncio.create_task(flight.do("key", call))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await waiting
+
+    assert asyncio.run(scenario()) == "result"
+
+
+class Resolver:
+    """
+    Records the batches it resolves; a key exists if it is even.
+    """
+
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, keys):
+        self.batches.append(sorted(keys))
+        if self.error is not None:
+            raise self.error
+        return {key: key % 2 == 0 for key in keys}
+
+
+def test_micro_batcher_flushes_when_full():
+    resolve = Resolver()
+    batcher = AsyncMicroBatcher(resolve, max_delay=60, max_size=3)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(key) for key in (1, 2, 3))), 1
+        )
+
+    assert asyncio.run(scenario()) == [False, True, False]
+    assert resolve.batches == [[1, 2, 3]]
+
+
+def test_micro_batcher_flushes_after_max_delay():
+    resolve = Resolver()
+    batcher = AsyncMicroBatcher(resolve, max_delay=0.01, max_size=100)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(key) for key in (4, 5, 4)))
+
+    assert asyncio.run(scenario()) == [True, False, True]
+    assert resolve.batches == [[4, 5]]
+
+
+def test_micro_batcher_propagates_errors_to_every_waiter():
+    resolve = Resolver(error=UpstreamError("down"))
+    batcher = AsyncMicroBatcher(resolve, max_delay=0.01, max_size=100)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(batcher.submit(key) for key in (6, 7)), return_exceptions=True
+        )
+
+    errors = asyncio.run(scenario())
+    assert [type(error) for error in errors] == [UpstreamError, UpstreamError]
+    assert resolve.batches == [[6, 7]]
+
+
+def test_failed_bulk_check_fails_the_batch_without_fanning_out(monkeypatch):
+    single_checks = []
+
+    async def failed_bulk(recipe_ids):
+        return response.AsyncSpoonacularResponse(data=None)
+
+    async def single(recipe_id):
+        single_checks.append(recipe_id)
+
+    monkeypatch.setattr(
+        response.AsyncSpoonacularResponse, "get_recipes_from_ids", failed_bulk
+    )
+    monkeypatch.setattr(response.AsyncSpoonacularResponse, "get_recipe_from_id", single)
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(response.AsyncSpoonacularResponse._recipes_exist([1, 2, 3]))
+    assert single_checks == []
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import threading
+import pytest
+from fastapi import HTTPException
+from app.spoonderful.auth.hashing import PasswordHasher
+
+
+def test_broken_process_pool_is_replaced():
+    hasher = PasswordHasher(workers=1, max_pending=4, use_processes=True)
+
+    async def submit(func, *args):
+        return await hasher._submit(func, *args)
+
+    try:
+        # Each worker exits, breaking the pool on the first try and the retry.
+        with pytest.raises(HTTPException) as raised:
+            asyncio.run(submit(os._exit, 1))
+        assert raised.value.status_code == 503
+
+        assert asyncio.run(submit(pow, 2, 3)) == 8
+    finally:
+        hasher.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_hash_finishes():
+    hasher = PasswordHasher(workers=1, max_pending=1, use_processes=False)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        finish.wait(5)
+        return "hash"
+
+    async def scenario():
+        task = asyncio.create_task(hasher._submit(slow_hash))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        with pytest.raises(HTTPException):
+            await hasher._submit(str, 1)
+
+        finish.set()
+        while hasher._pending:
+            await asyncio.sleep(0.01)
+        return await hasher._submit(str, 1)
+
+    try:
+        assert asyncio.run(scenario()) == "1"
+    finally:
+        finish.set()
+        hasher.shutdown()
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+import numpy as np
+from app.spoonacular.retrieval import ComplexRetrievalStrategy
+from app.spoonderful.data.schemas import Direction
+from app.spoonderful.processing import personalization
+from app.spoonderful.processing.feature_space import FeatureSpace
+from app.spoonderful.processing.pipeline import select_features
+from app.spoonderful.processing.preprocess import tabulate_recipe_data
+from app.spoonderful.routes import recommendation
+from benchmarks import fixtures
+
+
+def test_rank_for_user_orders_recipes_by_similarity_to_votes(monkeypatch):
+    data = ComplexRetrievalStrategy().retrieve_data(fixtures.complex_search(40))
+    df = tabulate_recipe_data(data)
+    features = select_features(df, recommendation.COLUMNS_TO_SHOW)
+    space = FeatureSpace.fit(features, 2)
+    monkeypatch.setattr(
+        personalization, "feature_space", SimpleNamespace(get=lambda: space)
+    )
+    monkeypatch.setattr(
+        recommendation,
+        "personalizer",
+        personalization.Personalizer(max_recipes=1000),
+    )
+    ids = df["id"].tolist()
+    votes = [
+        SimpleNamespace(recipe_id=ids[0], direction=Direction.LIKE),
+        SimpleNamespace(recipe_id=ids[1], direction=Direction.DISLIKE),
+    ]
+
+    ranked = recommendation._rank_for_user(df, votes, keep=10)
+
+    X = space.standardize(features)
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    profile = X[0] - X[1]
+    similarity = dict(zip(ids, X @ (profile / np.linalg.norm(profile))))
+    del similarity[ids[1]]
+    expected = sorted(similarity, key=similarity.get, reverse=True)[:10]
+    assert ranked["id"].tolist() == expected
+    assert ranked["id"].iloc[0] == ids[0]
@@ -0,0 +1,69 @@
+import time
+import pytest
+from app.spoonacular.ratelimit import QuotaExhaustedError, QuotaTracker
+from app.spoonderful.config import settings
+
+
+def _tracker() -> QuotaTracker:
+    return QuotaTracker(low_fraction=0.1, reserve=5, probe_interval=60)
+
+
+def _headers(remaining, limit="1000", reset=None) -> dict:
+    headers = {
+        "X-Ratelimit-Requests-Limit": limit,
+        "X-Ratelimit-Requests-Remaining": remaining,
+    }
+    if reset is not None:
+        headers["X-Ratelimit-Requests-Reset"] = reset
+
+    return headers
+
+
+def test_update_parses_the_requests_headers():
+    tracker = _tracker()
+
+    tracker.update(
+        {**_headers("800", reset="3600"), "X-Ratelimit-Tinyrequests-Remaining": "1"}
+    )
+
+    state = tracker.snapshot()
+    assert list(state) == ["requests"]
+    assert (state["requests"]["limit"], state["requests"]["remaining"]) == (1000, 800)
+    assert state["requests"]["reset_at"] == pytest.approx(time.time() + 3600, abs=5)
+    assert not state["requests"]["low"]
+
+
+def test_unparsable_headers_keep_the_known_quota():
+    tracker = _tracker()
+    tracker.update(_headers("800"))
+
+    tracker.update(_headers("many", limit="lots"))
+    tracker.update({})
+
+    assert tracker.snapshot()["requests"]["remaining"] == 800
+
+
+def test_recipe_quantity_is_downgraded_while_quota_is_low():
+    tracker = _tracker()
+    assert tracker.recipe_quantity(100) == 100
+
+    tracker.update(_headers("100"))
+    assert tracker.is_low()
+    assert tracker.recipe_quantity(100) == settings.quota_degraded_recipe_quantity
+    assert tracker.recipe_quantity(3) == 3
+
+
+def test_check_sheds_requests_until_the_quota_resets():
+    tracker = _tracker()
+    tracker.update(_headers("6"))
+    tracker.check()
+
+    tracker.update(_headers("5", reset="30"))
+    with pytest.raises(QuotaExhaustedError) as raised:
+        tracker.check()
+    assert raised.value.retry_after == pytest.approx(30, abs=5)
+
+    tracker.update(_headers("0", reset="0"))
+    tracker.check()  # The reset has passed, so one probe request goes through.
+    with pytest.raises(QuotaExhaustedError):
+        tracker.check()
@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.spoonacular.resilience import (
+    CircuitBreaker,
+    ResilientCaller,
+    RetryPolicy,
+    UpstreamUnavailableError,
+)
+
+URL = "https://upstream.test/recipes"
+OK = SimpleNamespace(status_code=200, headers={})
+THROTTLED = SimpleNamespace(status_code=429, headers={})
+
+
+class TransportError(Exception):
+    pass
+
+
+def _caller() -> ResilientCaller:
+    """
+    A caller that does not retry, whose breaker opens after one failure and lets a trial call through right away.
+    """
+    return ResilientCaller(
+        RetryPolicy(max_attempts=1, base_delay=0, max_delay=0),
+        failure_threshold=1,
+        recovery_timeout=0,
+    )
+
+
+def _half_open_caller() -> ResilientCaller:
+    """
+    A `_caller` whose breaker for `URL` is open.
+    """
+    caller = _caller()
+
+    def fail():
+        raise TransportError()
+
+    with pytest.raises(UpstreamUnavailableError):
+        caller.call(URL, fail, (TransportError,))
+    assert caller.breaker(URL).state == CircuitBreaker.OPEN
+
+    return caller
+
+
+def test_other_exception_in_half_open_trial_releases_the_trial():
+    caller = _half_open_caller()
+
+    def broken_body():
+        raise ValueError("chunked encoding error")
+
+    with pytest.raises(ValueError):
+        caller.call(URL, broken_body, (TransportError,))
+    assert caller.breaker(URL).state == CircuitBreaker.OPEN
+
+    assert caller.call(URL, lambda: OK, (TransportError,)) is OK
+    assert caller.breaker(URL).state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_half_open_trial_releases_the_trial():
+    caller = _half_open_caller()
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    async def ok():
+        return OK
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(caller.call_async(URL, cancelled, (TransportError,)))
+    assert caller.breaker(URL).state == CircuitBreaker.OPEN
+
+    assert asyncio.run(caller.call_async(URL, ok, (TransportError,))) is OK
+    assert caller.breaker(URL).state == CircuitBreaker.CLOSED
+
+
+def test_cancellations_and_local_errors_do_not_open_a_closed_breaker():
+    caller = _caller()
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    def broken():
+        raise KeyError("bug")
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(caller.call_async(URL, cancelled, (TransportError,)))
+    with pytest.raises(KeyError):
+        caller.call(URL, broken, (TransportError,))
+
+    assert caller.breaker(URL).snapshot() == {
+        "state": CircuitBreaker.CLOSED,
+        "consecutive_failures": 0,
+    }
+
+
+def test_rate_limited_half_open_trial_does_not_close_the_breaker():
+    caller = _half_open_caller()
+
+    with pytest.raises(UpstreamUnavailableError):
+        caller.call(URL, lambda: THROTTLED, (TransportError,))
+    assert caller.breaker(URL).state == CircuitBreaker.OPEN
+
+    assert caller.call(URL, lambda: OK, (TransportError,)) is OK
+    assert caller.breaker(URL).state == CircuitBreaker.CLOSED
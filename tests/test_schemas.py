@@ -0,0 +1,13 @@
+import pydantic
+import pytest
+from app.spoonderful.data import schemas
+
+
+@pytest.mark.parametrize("recipe_id", [-1, 2**31, 2**63])
+def test_vote_rejects_recipe_ids_outside_the_column_range(recipe_id):
+    with pytest.raises(pydantic.ValidationError):
+        schemas.VoteBatchItem(recipe_id=recipe_id, direction=1)
+
+
+def test_vote_accepts_recipe_ids_in_range():
+    assert schemas.Vote(recipe_id=2**31 - 1, direction=0).recipe_id == 2**31 - 1
@@ -0,0 +1,65 @@
+import pytest
+import requests as rq
+from app.spoonacular import response
+from app.spoonacular.ratelimit import QuotaExhaustedError
+from app.spoonacular.resilience import (
+    CircuitOpenError,
+    ResilientCaller,
+    RetryPolicy,
+    UpstreamUnavailableError,
+)
+from app.spoonderful import metrics
+
+URL = f"{response.SpoonacularResponse.ENTRY_POINT}/recipes/7/information"
+ENDPOINT = "recipes/{id}/information"
+
+
+def _calls(status: str) -> float:
+    return metrics.UPSTREAM_RESPONSES._values.get((ENDPOINT, status), 0)
+
+
+class DownSession:
+    def get(self, url, **kwargs):
+        raise rq.ConnectionError("connection refused")
+
+
+class NoQuota:
+    def check(self, bucket="requests"):
+        raise QuotaExhaustedError(bucket, 60)
+
+
+class EnoughQuota:
+    def check(self, bucket="requests"):
+        pass
+
+
+def test_calls_without_a_response_are_counted(monkeypatch):
+    monkeypatch.setattr(response, "get_session", lambda: DownSession())
+    monkeypatch.setattr(response, "quota", EnoughQuota())
+    monkeypatch.setattr(
+        response,
+        "upstream",
+        ResilientCaller(
+            RetryPolicy(max_attempts=1, base_delay=0, max_delay=0),
+            failure_threshold=1,
+            recovery_timeout=60,
+        ),
+    )
+    before = {
+        status: _calls(status)
+        for status in ("connection_error", "circuit_open", "quota_exhausted")
+    }
+
+    with pytest.raises(UpstreamUnavailableError):
+        response.SpoonacularResponse._send_request(URL, "")
+    with pytest.raises(CircuitOpenError):
+        response.SpoonacularResponse._send_request(URL, "")
+    monkeypatch.setattr(response, "quota", NoQuota())
+    with pytest.raises(QuotaExhaustedError):
+        response.SpoonacularResponse._send_request(URL, "")
+
+    assert {status: _calls(status) - before[status] for status in before} == {
+        "connection_error": 1,
+        "circuit_open": 1,
+        "quota_exhausted": 1,
+    }
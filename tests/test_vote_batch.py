@@ -0,0 +1,109 @@
+import asyncio
+import os
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.spoonderful.data import models, schemas
+from app.spoonderful.data.database import ThreadpoolSession
+from app.spoonderful.routes import vote
+
+# The vote routes need PostgreSQL. Tables are created and dropped in this database, so it should be a scratch one.
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="Set TEST_DATABASE_URL to a scratch PostgreSQL database."
+)
+INVALID_RECIPE_ID = 6
+
+
+@pytest.fixture
+def session(monkeypatch):
+    async def check_recipe_id(recipe_id):
+        return recipe_id != INVALID_RECIPE_ID
+
+    monkeypatch.setattr(vote, "_check_recipe_id", check_recipe_id)
+    engine = create_engine(DATABASE_URL)
+    models.Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def _user(session: Session) -> SimpleNamespace:
+    user = models.User(email="voter@example.com", password="hash")
+    session.add(user)
+    session.commit()
+
+    return SimpleNamespace(id=user.id)
+
+
+def _batch(session: Session, user, *votes: tuple) -> dict[int, str]:
+    batch = schemas.VoteBatch(
+        votes=[
+            {"recipe_id": recipe_id, "direction": direction, "op": op}
+            for recipe_id, direction, op in votes
+        ]
+    )
+    response = asyncio.run(
+        vote.batch_vote_on_recipes(batch, ThreadpoolSession(session), user)
+    )
+
+    return {result.recipe_id: result.status for result in response["results"]}
+
+
+def test_batch_applies_mixed_votes_and_keeps_counts(session):
+    user = _user(session)
+    assert _batch(session, user, (1, 1, "set"), (2, 1, "set"), (3, 0, "set")) == {
+        1: "added",
+        2: "added",
+        3: "added",
+    }
+
+    results = _batch(
+        session,
+        user,
+        (1, 1, "set"),
+        (2, 0, "set"),
+        (3, 0, "remove"),
+        (4, 1, "remove"),
+        (5, 1, "set"),
+        (INVALID_RECIPE_ID, 1, "set"),
+    )
+
+    assert results == {
+        1: "unchanged",
+        2: "changed",
+        3: "removed",
+        4: "not_found",
+        5: "added",
+        INVALID_RECIPE_ID: "invalid_recipe",
+    }
+    votes = session.execute(
+        select(models.Vote.recipe_id, models.Vote.direction).where(
+            models.Vote.user_id == user.id
+        )
+    ).all()
+    assert sorted(votes) == [(1, 1), (2, 0), (5, 1)]
+    counts = session.execute(
+        select(
+            models.RecipeVoteCount.recipe_id,
+            models.RecipeVoteCount.likes,
+            models.RecipeVoteCount.dislikes,
+        )
+    ).all()
+    assert sorted(counts) == [(1, 1, 0), (2, 0, 1), (3, 0, 0), (5, 1, 0)]
+
+
+def test_batch_rejects_duplicate_recipe_ids(session):
+    user = _user(session)
+
+    with pytest.raises(HTTPException) as raised:
+        _batch(session, user, (1, 1, "set"), (1, 0, "remove"))
+
+    assert raised.value.status_code == 422
+    assert session.execute(select(models.Vote)).first() is None